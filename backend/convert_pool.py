@@ -0,0 +1,282 @@
+"""
+Pool persistente de workers de conversión DOCX → PDF (backend docx2pdf del CV Generator).
+Los workers (convert_worker.py) se arrancan una vez y atienden muchos jobs: no se paga el
+arranque de un intérprete por CV. Cada job:
+- espera un worker libre en una cola acotada (CONVERT_QUEUE_SIZE; si está llena → RuntimeError),
+- verifica que el worker esté vivo; solo le hace ping si estuvo ocioso más de
+  IDLE_CHECK_SECONDS o si su último job falló (el resto de los jobs no paga el round-trip),
+- tiene un deadline (CONVERT_TIMEOUT); si se vence, el worker se mata y se reemplaza.
+Los workers se reciclan después de CONVERT_MAX_JOBS jobs o si se caen. El reemplazo se
+arranca antes de matar al viejo; si no arranca, el pool se achica en vez de devolver a la
+cola un worker muerto.
+metrics() expone profundidad de cola y tiempos de conversión.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / "convert_worker.py"
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_JOBS = 50
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_TIMEOUT = 60.0
+STARTUP_TIMEOUT = 30.0
+PING_TIMEOUT = 5.0
+IDLE_CHECK_SECONDS = 30.0
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class WorkerTimeout(Exception):
+    pass
+
+
+class _Worker:
+    """Un proceso convert_worker.py con un thread que lee sus respuestas."""
+
+    def __init__(self):
+        self.jobs = 0
+        self.last_used = time.monotonic()
+        self.suspect = False  # su último job falló: se verifica antes del próximo
+        self.proc = subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self._replies: queue.Queue = queue.Queue()
+        threading.Thread(target=self._read_replies, daemon=True).start()
+        try:
+            ready = self._wait_reply(STARTUP_TIMEOUT)
+        except (WorkerTimeout, RuntimeError):
+            self.kill()
+            raise RuntimeError("El worker de conversión no arrancó")
+        if not ready.get("ok"):
+            self.kill()
+            raise RuntimeError(ready.get("error") or "El worker de conversión no arrancó")
+
+    def _read_replies(self) -> None:
+        for line in self.proc.stdout:
+            try:
+                self._replies.put(json.loads(line))
+            except ValueError:
+                continue
+        self._replies.put(None)  # EOF: el proceso terminó
+
+    def _wait_reply(self, timeout: float) -> dict:
+        try:
+            reply = self._replies.get(timeout=timeout)
+        except queue.Empty:
+            raise WorkerTimeout()
+        if reply is None:
+            raise RuntimeError("El worker de conversión terminó inesperadamente")
+        return reply
+
+    def request(self, payload: dict, timeout: float) -> dict:
+        self.proc.stdin.write(json.dumps(payload) + "\n")
+        self.proc.stdin.flush()
+        return self._wait_reply(timeout)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def needs_check(self) -> bool:
+        """True si hay que hacerle ping antes de usarlo: ocioso hace rato, o falló su último job."""
+        return self.suspect or time.monotonic() - self.last_used >= IDLE_CHECK_SECONDS
+
+    def healthy(self) -> bool:
+        if not self.alive:
+            return False
+        try:
+            ok = bool(self.request({"op": "ping"}, PING_TIMEOUT).get("ok"))
+        except (WorkerTimeout, RuntimeError, OSError):
+            return False
+        if ok:
+            self.last_used = time.monotonic()
+            self.suspect = False
+        return ok
+
+    def kill(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class ConverterPool:
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        max_jobs_per_worker: int = DEFAULT_MAX_JOBS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        job_timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self.queue_size = max(0, queue_size)
+        self.job_timeout = job_timeout
+        self._idle: queue.Queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.size + self.queue_size)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._busy = 0
+        self._durations: deque = deque(maxlen=200)
+        self._counters = {
+            "jobs": 0, "failures": 0, "timeouts": 0, "rejected": 0, "recycled": 0, "spawn_failures": 0,
+        }
+        self._closed = False
+        for _ in range(self.size):
+            self._idle.put(_Worker())
+
+    def _replace(self, worker: _Worker, keep_on_failure: bool = False) -> _Worker | None:
+        """Arranca un worker nuevo y recién entonces mata a worker.
+        Si el nuevo no arranca: con keep_on_failure se sigue usando worker (si está vivo); si no,
+        worker se mata igual, el pool pierde un lugar y se devuelve None (no vuelve nada a la cola)."""
+        try:
+            fresh = _Worker()
+        except (RuntimeError, OSError):
+            with self._lock:
+                self._counters["spawn_failures"] += 1
+            if keep_on_failure and worker.alive:
+                return worker
+            worker.kill()
+            with self._lock:
+                self.size -= 1
+            return None
+        worker.kill()
+        with self._lock:
+            self._counters["recycled"] += 1
+        return fresh
+
+    def convert(self, docx_path: Path, pdf_path: Path, timeout: float | None = None) -> float:
+        """Convierte docx_path → pdf_path. Devuelve la duración en segundos."""
+        if self._closed:
+            raise RuntimeError("El pool de conversión está cerrado")
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters["rejected"] += 1
+            raise RuntimeError("Cola de conversión a PDF llena. Probá de nuevo en unos segundos.")
+        deadline = timeout or self.job_timeout
+        try:
+            if self.size <= 0:
+                raise RuntimeError("No hay workers de conversión disponibles")
+            with self._lock:
+                self._waiting += 1
+            try:
+                worker = self._idle.get(timeout=deadline)
+            except queue.Empty:
+                raise RuntimeError("Timeout esperando un worker de conversión libre")
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+
+            with self._lock:
+                self._busy += 1
+            try:
+                if not worker.alive or (worker.needs_check() and not worker.healthy()):
+                    worker = self._replace(worker)
+                    if worker is None:
+                        raise RuntimeError("No se pudo arrancar un worker de conversión")
+                start = time.perf_counter()
+                try:
+                    reply = worker.request(
+                        {"op": "convert", "src": str(docx_path), "dst": str(pdf_path)}, deadline
+                    )
+                except WorkerTimeout:
+                    with self._lock:
+                        self._counters["timeouts"] += 1
+                    worker = self._replace(worker)
+                    raise RuntimeError(f"docx2pdf superó el deadline de {deadline:.0f}s")
+                except (RuntimeError, OSError):
+                    with self._lock:
+                        self._counters["failures"] += 1
+                    worker = self._replace(worker)
+                    raise RuntimeError("El worker de conversión se cayó durante el job")
+                elapsed = time.perf_counter() - start
+                worker.jobs += 1
+                worker.last_used = time.monotonic()
+                with self._lock:
+                    self._counters["jobs"] += 1
+                    self._durations.append(elapsed)
+                if not reply.get("ok"):
+                    worker.suspect = True
+                    with self._lock:
+                        self._counters["failures"] += 1
+                    raise RuntimeError(f"docx2pdf failed: {reply.get('error', '')}")
+                if worker.jobs >= self.max_jobs_per_worker:
+                    worker = self._replace(worker, keep_on_failure=True)
+                return elapsed
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                if worker is not None:
+                    self._idle.put(worker)
+        finally:
+            self._slots.release()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            durations = sorted(self._durations)
+            return {
+                "workers": self.size,
+                "busy": self._busy,
+                "queue_depth": self._waiting,
+                "queue_capacity": self.queue_size,
+                **self._counters,
+                "avg_ms": round(1000 * sum(durations) / len(durations), 1) if durations else None,
+                "p95_ms": round(1000 * durations[int(0.95 * (len(durations) - 1))], 1) if durations else None,
+            }
+
+    def shutdown(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
+
+
+_pool: ConverterPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_converter_pool() -> ConverterPool:
+    """Pool del proceso (se crea y arranca sus workers en el primer uso)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConverterPool(
+                size=_env_number("CONVERT_POOL_SIZE", DEFAULT_POOL_SIZE),
+                max_jobs_per_worker=_env_number("CONVERT_MAX_JOBS", DEFAULT_MAX_JOBS),
+                queue_size=_env_number("CONVERT_QUEUE_SIZE", DEFAULT_QUEUE_SIZE),
+                job_timeout=_env_number("CONVERT_TIMEOUT", DEFAULT_TIMEOUT, cast=float),
+            )
+        return _pool
+
+
+def converter_pool_metrics() -> dict | None:
+    """Métricas del pool, o None si todavía no se creó."""
+    return _pool.metrics() if _pool is not None else None
+
+
+def shutdown_converter_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,47 @@
+"""
+Worker de conversión DOCX → PDF de larga vida. Lo lanza y administra convert_pool.
+docx2pdf se importa una sola vez por proceso, no una vez por CV.
+
+Protocolo (una línea JSON por mensaje):
+- stdin:  {"op": "ping"} | {"op": "convert", "src": "...docx", "dst": "...pdf"}
+- stdout: {"ok": true} | {"ok": false, "error": "..."}
+Al arrancar escribe {"ok": true, "ready": true} (o el error de import) antes de leer jobs.
+"""
+import json
+import sys
+
+
+def _reply(out, **payload) -> None:
+    out.write(json.dumps(payload) + "\n")
+    out.flush()
+
+
+def main() -> None:
+    out = sys.stdout
+    # docx2pdf imprime progreso por stdout: lo mandamos a stderr para no romper el protocolo
+    sys.stdout = sys.stderr
+    try:
+        from docx2pdf import convert
+    except Exception as e:
+        _reply(out, ok=False, error=f"No se pudo importar docx2pdf: {e}")
+        return
+    _reply(out, ok=True, ready=True)
+
+    for line in sys.stdin:
+        try:
+            job = json.loads(line)
+        except ValueError:
+            _reply(out, ok=False, error="Job inválido")
+            continue
+        if job.get("op") == "ping":
+            _reply(out, ok=True)
+            continue
+        try:
+            convert(job["src"], job["dst"])
+            _reply(out, ok=True)
+        except Exception as e:
+            _reply(out, ok=False, error=str(e) or e.__class__.__name__)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,27 @@
 """
 Lógica de enriquecimiento de perfil: completa facts, capabilities, technologies,
 leadershipSignals, relevanceTags por experiencia y constraints/strategy a nivel perfil.
-Usado por el CLI enrich.py y por POST /api/cv/enrich.
+Usado por el CLI enrich.py y por POST /api/cv/enrich y /api/cv/parse-and-enrich.
+Las experiencias se enriquecen en paralelo (AsyncOpenAI + semáforo); el fan-out se
+configura con ENRICH_CONCURRENCY o el parámetro concurrency.
+
+Re-enriquecimiento incremental: metadata.enrichment guarda el hash de la entrada de cada
+experiencia enriquecida (raw, immutable, context) y el de la entrada de constraints/strategy.
+Al volver a enriquecer solo se llama al LLM para las experiencias cuyo hash no está (editadas
+o nuevas) y para strategy si su entrada cambió.
 """
+import asyncio
+import hashlib
 import json
 import os
 from copy import deepcopy
+from typing import AsyncIterator
 
-from openai import OpenAI
+from .llm_cache import acached_completion
+from .llm_clients import close_async_client
+from .llm_router import RoutedClient, get_async_task_client, get_route, task_available
+from .prompt_compaction import payload_json
+from .structured_output import aparse_structured, cv_validator, json_response_format
 
 EXP_ENRICH_SYSTEM = """Sos un asistente que enriquece perfiles profesionales. Recibís el "raw" de una experiencia laboral y el contexto del rol (immutable, context). Tu tarea es devolver ÚNICAMENTE un JSON con los campos que se indican, inferidos del texto. No inventes nada que no esté en el raw o en el contexto.
 
@@ -31,6 +45,9 @@ Reglas:
 
 Respondé ÚNICAMENTE con un JSON válido con exactamente dos claves: constraints, strategy. Sin markdown, sin explicaciones."""
 
+DEFAULT_ENRICH_CONCURRENCY = 4
+ENRICH_KEYS = ("facts", "capabilities", "technologies", "leadershipSignals", "relevanceTags")
+
 FIXED_CONSTRAINTS = {
     "cannotModify": ["dates", "companies", "officialTitle", "technologies", "educationDegrees"],
     "canReframe": ["achievements", "summary", "bulletOrdering", "skillHighlighting", "capabilityEmphasis", "headline"],
@@ -72,10 +89,59 @@ def _needs_experience_enrich(exp):
     )
 
 
-def _merge_exp(exp: dict, enriched: dict) -> None:
-    for key in ("facts", "capabilities", "technologies", "leadershipSignals", "relevanceTags"):
+def _input_hash(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _experience_input(exp: dict) -> dict:
+    """Lo que recibe el LLM para enriquecer una experiencia."""
+    return {
+        "raw": exp.get("raw") or "",
+        "immutable": exp.get("immutable") or {},
+        "context": exp.get("context") or {},
+    }
+
+
+def experience_hash(exp: dict) -> str:
+    """Hash de la entrada de enriquecimiento de la experiencia: cambia si se edita raw/immutable/context."""
+    return _input_hash(_experience_input(exp))
+
+
+def _strategy_input(profile: dict) -> dict:
+    """Resumen del perfil que recibe el LLM para constraints/strategy."""
+    return {
+        "personal": profile.get("personal"),
+        "narrative": profile.get("narrative"),
+        "experience": [
+            {"immutable": e.get("immutable"), "raw": (e.get("raw") or "")[:800]}
+            for e in profile.get("experience", [])
+        ],
+        "education": profile.get("education"),
+        "skills": profile.get("skills"),
+        "constraints": profile.get("constraints"),
+        "strategy": profile.get("strategy"),
+    }
+
+
+def strategy_hash(profile: dict) -> str:
+    """Hash de la entrada de constraints/strategy, sin las secciones que esa llamada completa."""
+    summary = _strategy_input(profile)
+    del summary["constraints"], summary["strategy"]
+    return _input_hash(summary)
+
+
+def _merge_exp(exp: dict, enriched: dict, replace: bool = False) -> None:
+    """
+    Completa los campos vacíos de la experiencia con los enriquecidos. replace=True (la entrada
+    cambió desde el último enriquecimiento) reemplaza los campos derivados del raw anterior.
+    """
+    for key in ENRICH_KEYS:
         if key not in enriched:
             continue
+        if replace:
+            exp[key] = enriched[key]
+            continue
         if _is_empty(exp.get(key)) and not _is_empty(enriched[key]):
             exp[key] = enriched[key]
         elif key == "leadershipSignals" and isinstance(enriched.get(key), dict):
@@ -86,52 +152,54 @@ def _merge_exp(exp: dict, enriched: dict) -> None:
             exp[key] = current
 
 
-def _enrich_experience(client: OpenAI, exp: dict, model: str) -> dict:
-    raw = exp.get("raw") or ""
-    immutable = exp.get("immutable") or {}
-    context = exp.get("context") or {}
-    payload = {"raw": raw, "immutable": immutable, "context": context}
-    response = client.chat.completions.create(
+def _enrich_concurrency(value: int | None = None) -> int:
+    """Cantidad máxima de llamadas simultáneas al LLM (parámetro > ENRICH_CONCURRENCY > default)."""
+    if value is None:
+        try:
+            value = int(os.environ.get("ENRICH_CONCURRENCY", DEFAULT_ENRICH_CONCURRENCY))
+        except ValueError:
+            value = DEFAULT_ENRICH_CONCURRENCY
+    return max(1, value)
+
+
+async def _enrich_experience(
+    client: RoutedClient, exp: dict, model: str, use_cache: bool = True
+) -> dict:
+    payload = _experience_input(exp)
+    text = await acached_completion(
+        client,
+        use_cache=use_cache,
         model=model,
         messages=[
             {"role": "system", "content": EXP_ENRICH_SYSTEM},
-            {"role": "user", "content": json.dumps(payload, ensure_ascii=False, indent=0)},
+            {"role": "user", "content": payload_json("enrich", payload)},
         ],
         max_tokens=4000,
         temperature=0.1,
+        **json_response_format(),
     )
-    text = (response.choices[0].message.content or "").strip()
-    if text.startswith("```"):
-        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-    return json.loads(text)
+    validator = cv_validator().item("experience").select(*ENRICH_KEYS)
+    return await aparse_structured(text, validator, use_cache=use_cache)
 
 
-def _enrich_constraints_strategy(client: OpenAI, profile: dict, model: str) -> dict:
-    summary = {
-        "personal": profile.get("personal"),
-        "narrative": profile.get("narrative"),
-        "experience": [
-            {"immutable": e.get("immutable"), "raw": (e.get("raw") or "")[:800]}
-            for e in profile.get("experience", [])
-        ],
-        "education": profile.get("education"),
-        "skills": profile.get("skills"),
-        "constraints": profile.get("constraints"),
-        "strategy": profile.get("strategy"),
-    }
-    response = client.chat.completions.create(
+async def _enrich_constraints_strategy(
+    client: RoutedClient, profile: dict, model: str, use_cache: bool = True
+) -> dict:
+    summary = _strategy_input(profile)
+    text = await acached_completion(
+        client,
+        use_cache=use_cache,
         model=model,
         messages=[
             {"role": "system", "content": CONSTRAINTS_STRATEGY_SYSTEM},
-            {"role": "user", "content": json.dumps(summary, ensure_ascii=False, indent=0)},
+            {"role": "user", "content": payload_json("enrich", summary)},
         ],
         max_tokens=1500,
         temperature=0.1,
+        **json_response_format(),
     )
-    text = (response.choices[0].message.content or "").strip()
-    if text.startswith("```"):
-        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-    data = json.loads(text)
+    validator = cv_validator().select("constraints", "strategy")
+    data = await aparse_structured(text, validator, use_cache=use_cache)
     data["constraints"] = FIXED_CONSTRAINTS
     return data
 
@@ -158,41 +226,142 @@ def normalize_profile(profile: dict) -> None:
                 ls["mentored"] = 0
 
 
-def enrich_profile(profile: dict, model: str | None = None) -> dict:
+async def _iter_enrich_experiences(
+    client: RoutedClient, experience: list, indices: list, model: str, concurrency: int, use_cache: bool = True
+) -> AsyncIterator[tuple[int, dict | None]]:
+    """
+    Enriquece en paralelo las experiencias de `indices`, con a lo sumo `concurrency`
+    llamadas en vuelo. Emite (índice, enriched) a medida que terminan;
+    enriched es None si la llamada falló.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(i: int, exp: dict) -> tuple[int, dict | None]:
+        async with semaphore:
+            try:
+                return i, await _enrich_experience(client, exp, model, use_cache=use_cache)
+            except Exception:
+                return i, None  # mantener el bloque tal cual si falla
+
+    tasks = [asyncio.create_task(run(i, experience[i])) for i in indices]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def iter_enrich_profile(
+    profile: dict,
+    model: str | None = None,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+) -> AsyncIterator[tuple[str, dict]]:
     """
-    Enriquece el perfil: por cada experiencia con campos vacíos llama a GPT-4o,
-    luego completa constraints y strategy. Devuelve un nuevo dict (no muta el input).
-    Requiere OPENAI_API_KEY en el entorno.
+    Enriquece el perfil emitiendo eventos de progreso (para SSE):
+    - ("experience", {"index", "ok", "experience", "skipped"}) por cada experiencia: primero las
+      que no cambiaron desde el último enriquecimiento (skipped=True, sin LLM), después las
+      enriquecidas en orden de llegada;
+    - ("strategy", {"ok", "strategy", "skipped"}) al completar constraints/strategy;
+    - ("done", perfil enriquecido) al final, con metadata.enrichment actualizado.
+    Sin metadata.enrichment (perfil recién parseado) se enriquecen las experiencias con campos
+    vacíos. Cada merge toca solo su experiencia, así que el resultado no depende del orden de llegada.
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
+    if not task_available("enrich"):
         raise RuntimeError("OPENAI_API_KEY no configurada. Necesaria para enriquecer.")
 
-    model = model or os.environ.get("OPENAI_MODEL", "gpt-4o")
+    model = model or get_route("enrich").model
     result = deepcopy(profile)
     experience = result.get("experience") or []
+    metadata = result.setdefault("metadata", {})
+    previous = metadata.get("enrichment") if isinstance(metadata.get("enrichment"), dict) else {}
+    known = set(previous.get("experience") or [])
+    hashes = [experience_hash(exp) for exp in experience]
 
     if not experience:
         result["constraints"] = FIXED_CONSTRAINTS
         result["strategy"] = result.get("strategy") or {}
-        return result
+        yield "done", result
+        return
 
-    client = OpenAI(api_key=api_key)
-    for i, exp in enumerate(result["experience"]):
-        if not _needs_experience_enrich(exp):
-            continue
+    if known:
+        pending = [i for i, h in enumerate(hashes) if h not in known]
+    else:
+        pending = [i for i, exp in enumerate(experience) if _needs_experience_enrich(exp)]
+    up_to_date = {i for i in range(len(experience)) if i not in pending}
+    for i in sorted(up_to_date):
+        yield "experience", {"index": i, "ok": True, "experience": experience[i], "skipped": True}
+
+    client = get_async_task_client("enrich")
+    if pending:
+        async for i, enriched in _iter_enrich_experiences(
+            client, experience, pending, model, _enrich_concurrency(concurrency), use_cache=use_cache
+        ):
+            if enriched is not None:
+                _merge_exp(experience[i], enriched, replace=bool(known))
+                up_to_date.add(i)
+            yield "experience", {
+                "index": i, "ok": enriched is not None, "experience": experience[i], "skipped": False
+            }
+
+    # Solo se guardan los hashes de experiencias al día: una que falló se reintenta la próxima vez
+    enrichment = {"experience": [hashes[i] for i in sorted(up_to_date)], "strategy": None}
+    current_strategy = strategy_hash(result)
+    if previous.get("strategy") == current_strategy and not _is_empty(result.get("strategy")):
+        enrichment["strategy"] = current_strategy
+        yield "strategy", {"ok": True, "strategy": result["strategy"], "skipped": True}
+    else:
         try:
-            enriched = _enrich_experience(client, exp, model)
-            _merge_exp(result["experience"][i], enriched)
+            cs = await _enrich_constraints_strategy(client, result, model, use_cache=use_cache)
+            result["constraints"] = cs["constraints"]
+            result["strategy"] = cs.get("strategy") or result.get("strategy") or {}
+            enrichment["strategy"] = current_strategy
+            yield "strategy", {"ok": True, "strategy": result["strategy"], "skipped": False}
         except Exception:
-            pass  # mantener el bloque tal cual si falla
-
-    try:
-        cs = _enrich_constraints_strategy(client, result, model)
-        result["constraints"] = cs["constraints"]
-        result["strategy"] = cs.get("strategy") or result.get("strategy") or {}
-    except Exception:
-        pass
+            yield "strategy", {"ok": False, "strategy": result.get("strategy") or {}, "skipped": False}
     result["constraints"] = FIXED_CONSTRAINTS
+    metadata["enrichment"] = enrichment
     normalize_profile(result)
-    return result
+    yield "done", result
+
+
+async def enrich_profile_async(
+    profile: dict,
+    model: str | None = None,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Enriquece el perfil: todas las experiencias con campos vacíos se enriquecen en paralelo
+    (a lo sumo `concurrency` llamadas simultáneas), luego completa constraints y strategy.
+    Devuelve un nuevo dict (no muta el input). Requiere OPENAI_API_KEY en el entorno.
+    use_cache=False saltea el cache de respuestas del LLM.
+    """
+    async for event, payload in iter_enrich_profile(
+        profile, model=model, concurrency=concurrency, use_cache=use_cache
+    ):
+        if event == "done":
+            return payload
+    raise RuntimeError("El enriquecimiento terminó sin resultado.")
+
+
+def enrich_profile(
+    profile: dict,
+    model: str | None = None,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Versión sincrónica de enrich_profile_async (CLI y rutas sync).
+    No usar desde dentro de un event loop: ahí llamar a enrich_profile_async.
+    """
+    async def run() -> dict:
+        try:
+            return await enrich_profile_async(
+                profile, model=model, concurrency=concurrency, use_cache=use_cache
+            )
+        finally:
+            await close_async_client()
+
+    return asyncio.run(run())
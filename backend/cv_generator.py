@@ -2,30 +2,33 @@
 Tool 2 — CV Generator: JSON (perfil) + Job Description → CV personalizado en PDF y DOCX.
 El LLM reordena/reframe según JD respetando constraints.cannotModify. No inventa datos.
 """
+import asyncio
 import json
 import os
 from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 
-from openai import OpenAI
-from docx import Document
-from docx.shared import Pt, Cm, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import nsdecls
-from docx.oxml import parse_xml
-import subprocess
+from .llm_cache import acached_completion
+from .llm_clients import close_async_client
+from .llm_router import get_async_task_client, get_route, task_available
+from .profile_context import profile_messages
+from .prompt_compaction import jd_excerpt
+from .structured_output import Validator, aparse_structured, json_response_format
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "generated_cvs"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Colors matching the reference CV template
-CLR_DARK = RGBColor(0x40, 0x40, 0x40)
-CLR_BODY = RGBColor(0x59, 0x59, 0x59)
-CLR_LINK = RGBColor(0x11, 0x55, 0xCC)
+# Colors matching the reference CV template (hex RGB; python-docx se importa recién al renderizar)
+CLR_DARK = "404040"
+CLR_BODY = "595959"
+CLR_LINK = "1155CC"
 
-ROLE_INDENT = Cm(0.6)
-DESC_INDENT = Cm(0.8)
+PDF_BACKENDS = ("native", "docx2pdf")
+
+# Sangrías en cm
+ROLE_INDENT = 0.6
+DESC_INDENT = 0.8
 
 CANNOT_MODIFY = [
     "dates (start, end de cada experiencia)",
@@ -118,19 +121,27 @@ Recordatorio importante:
 - Empezá tu respuesta directamente con {{ y terminá con }} para que sea un JSON puro sin texto extra.
 """
 
+# Forma del JSON que pide SYSTEM_PROMPT; skills y languages pueden venir como lista o string
+CV_CONTENT_VALIDATOR = Validator.from_template({
+    "headline": "",
+    "experience": [
+        {"company": "", "officialTitle": "", "start": "YYYY-MM", "end": "YYYY-MM", "location": "", "description": ""}
+    ],
+    "education": [{"degree": "", "institution": "", "year": None, "location": "", "note": ""}],
+    "skills_technical": None,
+    "skills_soft": None,
+    "languages": None,
+})
+
 LANGUAGE_LABELS = {
     "es": {"experience": "EXPERIENCIA", "education": "EDUCACIÓN", "skills": "SKILLS"},
     "en": {"experience": "EXPERIENCE", "education": "EDUCATION", "skills": "SKILLS"},
 }
 
 
-def generate_cv_content(profile: dict, jd_text: str, language: str = "es") -> dict:
-    """
-    Llama al LLM con perfil + JD y devuelve la estructura lista para renderizar.
-    language: "es" (español) o "en" (inglés). Todo el contenido generado va en ese idioma.
-    """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
+def _cv_content_params(profile: dict, jd_text: str, language: str) -> dict:
+    """Params de chat.completions para generar el contenido del CV."""
+    if not task_available("generate"):
         raise RuntimeError("OPENAI_API_KEY no configurada. Necesaria para el CV Generator.")
 
     lang = "en" if language == "en" else "es"
@@ -140,27 +151,41 @@ def generate_cv_content(profile: dict, jd_text: str, language: str = "es") -> di
         else "Generá todo el CV en español. Todo el texto (headline, descripciones de experiencia, skills_technical, skills_soft, languages) debe estar en español."
     )
 
-    client = OpenAI(api_key=api_key)
-    model = os.environ.get("OPENAI_MODEL", "gpt-5.2")
-    jd_chunk = jd_text[:15000].strip() if jd_text else ""
-    profile_str = json.dumps(profile, ensure_ascii=False, indent=0)[:25000]
+    model = get_route("generate").model
+    jd_chunk = jd_excerpt(jd_text) if jd_text else ""
 
-    response = client.chat.completions.create(
+    # Perfil base primero: mismo prefijo que el match para este perfil (cache de prompts del
+    # proveedor); el detalle elegido por la JD va después de las instrucciones
+    profile_msg, extras = profile_messages(profile, jd_chunk, "generate")
+    return dict(
         model=model,
         messages=[
+            profile_msg,
             {"role": "system", "content": SYSTEM_PROMPT},
+            *extras,
             {
                 "role": "user",
-                "content": f"Perfil (JSON):\n{profile_str}\n\n---\nJob Description:\n{jd_chunk}\n\n---\n{lang_instruction}\n\nDevolvé el JSON del CV adaptado.",
+                "content": f"Job Description:\n{jd_chunk}\n\n---\n{lang_instruction}\n\nDevolvé el JSON del CV adaptado.",
             },
         ],
         max_completion_tokens=6000,
         temperature=0.2,
+        **json_response_format(),
     )
-    raw = (response.choices[0].message.content or "").strip()
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-    return json.loads(raw)
+
+
+async def generate_cv_content_async(
+    profile: dict, jd_text: str, language: str = "es", use_cache: bool = True
+) -> dict:
+    """
+    Llama al LLM con perfil + JD y devuelve la estructura lista para renderizar.
+    language: "es" (español) o "en" (inglés). Todo el contenido generado va en ese idioma.
+    use_cache=False saltea el cache del LLM (fuerza una generación nueva).
+    """
+    params = _cv_content_params(profile, jd_text, language)
+    client = get_async_task_client("generate")
+    raw = await acached_completion(client, use_cache=use_cache, **params)
+    return await aparse_structured(raw, CV_CONTENT_VALIDATOR, use_cache=use_cache)
 
 
 def _escape(s: str) -> str:
@@ -239,6 +264,9 @@ def _get_description(exp: dict) -> str:
 
 def _add_bottom_border(paragraph, color="404040", size="6"):
     """Add a horizontal line below a paragraph (section separator)."""
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+
     pPr = paragraph._element.get_or_add_pPr()
     pBdr = parse_xml(
         f'<w:pBdr {nsdecls("w")}>'
@@ -251,18 +279,24 @@ def _add_bottom_border(paragraph, color="404040", size="6"):
 # ─────────────────────────────── DOCX ──────────────────────────────
 
 def _add_run(paragraph, text, font_name="Tahoma", size_pt=10, bold=True, color=None):
-    """Helper to add a styled run to a paragraph."""
+    """Helper to add a styled run to a paragraph. color: hex RGB ("404040")."""
+    from docx.shared import Pt, RGBColor
+
     run = paragraph.add_run(text)
     run.font.name = font_name
     run.font.size = Pt(size_pt)
     run.bold = bold
     if color:
-        run.font.color.rgb = color
+        run.font.color.rgb = RGBColor.from_string(color)
     return run
 
 
 def write_docx(cv_content: dict, profile: dict, output_path: Path, language: str = "es") -> None:
     """Escribe el CV en DOCX replicando el estilo del template de referencia."""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Cm, Pt
+
     doc = Document()
 
     section = doc.sections[0]
@@ -353,7 +387,7 @@ def write_docx(cv_content: dict, profile: dict, output_path: Path, language: str
             p_role.paragraph_format.space_before = Pt(2)
             p_role.paragraph_format.space_after = Pt(0)
             p_role.paragraph_format.line_spacing = 1.0
-            p_role.paragraph_format.left_indent = ROLE_INDENT
+            p_role.paragraph_format.left_indent = Cm(ROLE_INDENT)
             _add_run(p_role, "● ", font_name="Arial", size_pt=10, color=CLR_BODY)
             _add_run(p_role, f"{role.get('officialTitle', '')} | {start_fmt} – {end_fmt}:", size_pt=10, color=CLR_BODY)
 
@@ -365,7 +399,7 @@ def write_docx(cv_content: dict, profile: dict, output_path: Path, language: str
                 p_desc.paragraph_format.space_before = Pt(0.5)
                 p_desc.paragraph_format.space_after = Pt(0)
                 p_desc.paragraph_format.line_spacing = 1.07
-                p_desc.paragraph_format.left_indent = DESC_INDENT
+                p_desc.paragraph_format.left_indent = Cm(DESC_INDENT)
                 _add_run(p_desc, desc, size_pt=10, color=CLR_BODY)
 
     # ── EDUCATION ──
@@ -441,33 +475,273 @@ def write_docx(cv_content: dict, profile: dict, output_path: Path, language: str
     doc.save(str(output_path))
 
 
-def _docx_to_pdf(docx_path: Path, pdf_path: Path) -> None:
-    """Convert DOCX to PDF by calling docx2pdf in a subprocess (avoids COM/DLL issues inside uvicorn)."""
-    import sys
-    result = subprocess.run(
-        [sys.executable, "-c",
-         f"from docx2pdf import convert; convert(r'{docx_path}', r'{pdf_path}')"],
-        capture_output=True, text=True, timeout=60,
+# ─────────────────────────────── PDF ───────────────────────────────
+# Render nativo con ReportLab: mismo layout que write_docx, sin Word ni subprocess.
+# Tahoma no está disponible en Linux; por defecto se usa Helvetica-Bold (fuente core del PDF).
+# CV_PDF_FONT_PATH permite registrar un TTF (ej. tahomabd.ttf) para replicar la fuente exacta.
+
+PDF_BULLET_FONT = "ZapfDingbats"  # las fuentes core no tienen "●"; ZapfDingbats sí
+_pdf_font_name: str | None = None
+
+
+def _pdf_font() -> str:
+    """Fuente de los runs del PDF (todos los runs del template van en bold)."""
+    global _pdf_font_name
+    if _pdf_font_name is None:
+        font_path = os.environ.get("CV_PDF_FONT_PATH")
+        if font_path and Path(font_path).is_file():
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            pdfmetrics.registerFont(TTFont("CVFont", font_path))
+            _pdf_font_name = "CVFont"
+        else:
+            _pdf_font_name = "Helvetica-Bold"
+    return _pdf_font_name
+
+
+def _pdf_run(text: str, size_pt: float, color: str, font_name: str | None = None) -> str:
+    """Run de texto con estilo, en el markup de Paragraph de ReportLab."""
+    return f'<font name="{font_name or _pdf_font()}" size="{size_pt}" color="#{color}">{_escape(text)}</font>'
+
+
+def _pdf_paragraph(
+    runs: list[str],
+    size_pt: float,
+    space_before: float = 0,
+    line_spacing: float = 1.0,
+    align: str = "left",
+    left_indent=0,
+):
+    """Paragraph de ReportLab con los equivalentes de paragraph_format de python-docx."""
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import Paragraph
+
+    alignment = {"left": TA_LEFT, "center": TA_CENTER, "justify": TA_JUSTIFY}[align]
+    style = ParagraphStyle(
+        "cv",
+        fontName=_pdf_font(),
+        fontSize=size_pt,
+        leading=size_pt * 1.2 * line_spacing,
+        spaceBefore=space_before,
+        spaceAfter=0,
+        alignment=alignment,
+        leftIndent=left_indent,
+    )
+    return Paragraph("".join(runs), style)
+
+
+def _pdf_section_heading(label: str, size_pt: float) -> list:
+    """Título de sección con la línea inferior (equivalente a _add_bottom_border)."""
+    from reportlab.lib import colors
+    from reportlab.platypus import HRFlowable
+
+    return [
+        _pdf_paragraph([_pdf_run(label, size_pt, CLR_DARK)], size_pt, space_before=8),
+        HRFlowable(
+            width="100%",
+            thickness=0.75,
+            color=colors.HexColor(f"#{CLR_DARK}"),
+            spaceBefore=1,
+            spaceAfter=0,
+        ),
+    ]
+
+
+def write_pdf(cv_content: dict, profile: dict, output_path: Path, language: str = "es") -> None:
+    """Escribe el CV directamente en PDF (ReportLab) con el mismo layout que write_docx."""
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    story = []
+    personal = profile.get("personal", {})
+    name = f"{personal.get('firstName', '')} {personal.get('lastName', '')}".strip()
+    story.append(_pdf_paragraph([_pdf_run(name, 17, CLR_DARK)], 17, align="center"))
+
+    contact_parts = list(filter(None, [personal.get("location"), personal.get("phone"), personal.get("email")]))
+    if contact_parts:
+        runs = []
+        for i, part in enumerate(contact_parts):
+            if i > 0:
+                runs.append(_pdf_run(" | ", 10, CLR_BODY))
+            runs.append(_pdf_run(part, 10, CLR_LINK if "@" in part else CLR_BODY))
+        story.append(_pdf_paragraph(runs, 10, space_before=3, align="center"))
+
+    links = personal.get("links", {})
+    link_values = [v for v in links.values() if v]
+    if link_values:
+        runs = []
+        for i, link in enumerate(link_values):
+            if i > 0:
+                runs.append(_pdf_run(" | ", 10, CLR_BODY))
+            runs.append(_pdf_run(link, 10, CLR_LINK))
+        story.append(_pdf_paragraph(runs, 10, space_before=1, align="center"))
+
+    if cv_content.get("headline"):
+        story.append(_pdf_paragraph(
+            [_pdf_run(cv_content["headline"], 10, CLR_BODY)],
+            10, space_before=3, line_spacing=1.07, align="justify",
+        ))
+
+    labels = LANGUAGE_LABELS.get(language, LANGUAGE_LABELS["es"])
+
+    # ── EXPERIENCE ──
+    story.extend(_pdf_section_heading(labels["experience"], 12))
+    bullet = (
+        _pdf_run("●", 7, CLR_BODY, font_name=PDF_BULLET_FONT)
+        if _pdf_font() == "Helvetica-Bold"
+        else _pdf_run("●", 10, CLR_BODY)
+    )
+    for company, year_range, roles in _group_experiences(cv_content.get("experience", [])):
+        company_text = f"{company} – {year_range}" if year_range else company
+        story.append(_pdf_paragraph(
+            [_pdf_run(company_text, 11, CLR_DARK)], 11, space_before=6, line_spacing=1.07,
+        ))
+        for role in roles:
+            start_fmt = _format_date(role.get("start", ""), language)
+            end_fmt = _format_date(role.get("end", ""), language)
+            story.append(_pdf_paragraph(
+                [bullet, _pdf_run(f" {role.get('officialTitle', '')} | {start_fmt} – {end_fmt}:", 10, CLR_BODY)],
+                10, space_before=2, left_indent=ROLE_INDENT * cm,
+            ))
+            desc = _get_description(role)
+            if desc:
+                story.append(_pdf_paragraph(
+                    [_pdf_run(desc, 10, CLR_BODY)],
+                    10, space_before=0.5, line_spacing=1.07, align="justify", left_indent=DESC_INDENT * cm,
+                ))
+
+    # ── EDUCATION ──
+    story.extend(_pdf_section_heading(labels["education"], 11))
+    for ed in cv_content.get("education", []):
+        degree = ed.get("degree", "")
+        institution = ed.get("institution", "")
+        location = ed.get("location", "")
+        year = ed.get("year", "")
+        note = ed.get("note", "")
+        runs = [_pdf_run(degree, 11, CLR_DARK)]
+        if institution:
+            loc_str = f" - {location}" if location else ""
+            runs.append(_pdf_run(f", {institution}{loc_str}; {year}", 10, CLR_DARK))
+        elif year:
+            runs.append(_pdf_run(f" ({year})", 10, CLR_DARK))
+        if note:
+            runs.append(_pdf_run(f" ({note})", 10, CLR_DARK))
+        story.append(_pdf_paragraph(runs, 11, space_before=2))
+
+    # ── SKILLS (includes Languages) ──
+    story.extend(_pdf_section_heading(labels["skills"], 11))
+    soft = cv_content.get("skills_soft") or ""
+    if isinstance(soft, list):
+        soft = ", ".join(soft)
+    tech = cv_content.get("skills_technical") or ""
+    if isinstance(tech, list):
+        tech = ", ".join(tech)
+    lang_text = str(cv_content.get("languages", "")) if cv_content.get("languages") else ""
+
+    if soft:
+        soft_label = "People & Leadership" if language == "en" else "Personas & Liderazgo"
+        story.append(_pdf_paragraph(
+            [_pdf_run(f"{soft_label}: ", 9, CLR_BODY), _pdf_run(soft, 9, CLR_BODY)],
+            9, space_before=2, line_spacing=1.07,
+        ))
+    if tech:
+        tech_label = "Technical" if language == "en" else "Técnicas"
+        story.append(_pdf_paragraph(
+            [_pdf_run(f"{tech_label}: ", 9, CLR_BODY), _pdf_run(tech, 9, CLR_BODY)],
+            9, space_before=2,
+        ))
+    if lang_text:
+        lang_label = "Languages" if language == "en" else "Idiomas"
+        story.append(_pdf_paragraph(
+            [_pdf_run(f"{lang_label}: ", 9, CLR_BODY), _pdf_run(lang_text, 9, CLR_BODY)],
+            9, space_before=2,
+        ))
+
+    doc = SimpleDocTemplate(
+        str(output_path),
+        pagesize=(21.59 * cm, 30.48 * cm),
+        leftMargin=1.31 * cm,
+        rightMargin=1.21 * cm,
+        topMargin=1.36 * cm,
+        bottomMargin=1.17 * cm,
+        title=name,
+        author=name,
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"docx2pdf failed: {result.stderr.strip()}")
+    doc.build(story)
+
+
+def _docx_to_pdf(docx_path: Path, pdf_path: Path) -> None:
+    """Convert DOCX to PDF with docx2pdf via the persistent worker pool (avoids COM/DLL issues inside uvicorn)."""
+    from .convert_pool import get_converter_pool
+
+    get_converter_pool().convert(docx_path, pdf_path)
     if not pdf_path.exists():
         raise RuntimeError("PDF was not created by docx2pdf")
 
 
-def generate_cv_pdf_and_docx(
-    profile: dict, jd_text: str, language: str = "es", base_name: str | None = None
+def _pdf_backend(pdf_backend: str | None) -> str:
+    backend = (pdf_backend or os.environ.get("CV_PDF_BACKEND") or "native").strip().lower()
+    if backend not in PDF_BACKENDS:
+        raise RuntimeError(f"CV_PDF_BACKEND inválido: {backend}. Use: {', '.join(PDF_BACKENDS)}")
+    return backend
+
+
+def render_cv_files(
+    cv_content: dict, profile: dict, language: str, base_name: str | None, backend: str
 ) -> tuple[str, str]:
-    """
-    Genera el CV adaptado: DOCX via python-docx, luego convierte a PDF via Word (docx2pdf).
-    Devuelve (pdf_filename, docx_filename).
-    """
-    lang = "en" if language == "en" else "es"
-    cv_content = generate_cv_content(profile, jd_text, language=lang)
+    """Escribe DOCX y PDF del contenido ya generado (CPU/disco, sin LLM). Devuelve (pdf, docx)."""
     stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base = base_name or f"cv_{stamp}"
     docx_path = OUTPUT_DIR / f"{base}.docx"
     pdf_path = OUTPUT_DIR / f"{base}.pdf"
-    write_docx(cv_content, profile, docx_path, language=lang)
-    _docx_to_pdf(docx_path, pdf_path)
+    write_docx(cv_content, profile, docx_path, language=language)
+    if backend == "docx2pdf":
+        _docx_to_pdf(docx_path, pdf_path)
+    else:
+        write_pdf(cv_content, profile, pdf_path, language=language)
     return f"{base}.pdf", f"{base}.docx"
+
+
+async def generate_cv_pdf_and_docx_async(
+    profile: dict,
+    jd_text: str,
+    language: str = "es",
+    base_name: str | None = None,
+    use_cache: bool = True,
+    pdf_backend: str | None = None,
+) -> tuple[str, str]:
+    """
+    Genera el CV adaptado: DOCX via python-docx y PDF según pdf_backend (o CV_PDF_BACKEND):
+    "native" (default) lo renderiza directo con ReportLab; "docx2pdf" convierte el DOCX via Word.
+    La llamada al LLM es async y el render corre en un thread para no bloquear el event loop.
+    Devuelve (pdf_filename, docx_filename).
+    """
+    lang = "en" if language == "en" else "es"
+    backend = _pdf_backend(pdf_backend)
+    cv_content = await generate_cv_content_async(profile, jd_text, language=lang, use_cache=use_cache)
+    return await asyncio.to_thread(render_cv_files, cv_content, profile, lang, base_name, backend)
+
+
+def generate_cv_pdf_and_docx(
+    profile: dict,
+    jd_text: str,
+    language: str = "es",
+    base_name: str | None = None,
+    use_cache: bool = True,
+    pdf_backend: str | None = None,
+) -> tuple[str, str]:
+    """
+    Versión sincrónica de generate_cv_pdf_and_docx_async (CLI y scripts).
+    No usar desde dentro de un event loop: ahí llamar a generate_cv_pdf_and_docx_async.
+    """
+    async def run() -> tuple[str, str]:
+        try:
+            return await generate_cv_pdf_and_docx_async(
+                profile, jd_text, language, base_name, use_cache, pdf_backend
+            )
+        finally:
+            await close_async_client()
+
+    return asyncio.run(run())
@@ -2,19 +2,27 @@
 Tool 1 — CV Parser: texto de CV → JSON estructurado.
 Usa LLM para mapear el texto al schema. No inventa datos; campos inciertos en "" o null.
 Por cada experiencia, raw = texto original de ese rol. experience ordenado más reciente primero.
+
+Parseo por secciones (default; CV_PARSE_SECTIONS=0 lo desactiva): cv_sections parte el texto
+localmente en encabezado, un bloque por rol y el resto (educación, skills, idiomas, ...), y
+cada parte se parsea con su propia llamada al LLM, en paralelo (CV_PARSE_CONCURRENCY). La
+latencia queda atada a la sección más larga y no hay tope de largo del CV: raw es el bloque
+literal del rol. Si no se encuentra la sección de experiencia con fechas, se usa una sola
+llamada con el CV completo (recortado a MAX_SINGLE_CALL_CHARS).
 """
-import json
+import asyncio
+import copy
 import os
-from pathlib import Path
-
-from openai import OpenAI
+from datetime import date
 
-ROOT = Path(__file__).resolve().parent.parent
-SCHEMA_PATH = ROOT / "data" / "cv_schema_v1.json"
+from .cv_sections import split_sections
+from .llm_cache import acached_completion
+from .llm_clients import close_async_client
+from .llm_router import get_async_task_client, get_route, task_available
+from .structured_output import aparse_structured, cv_schema, cv_validator, json_response_format
 
-# Carga del schema para incluir en el prompt
-with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-    SCHEMA_REF = json.dumps(json.load(f), indent=2, ensure_ascii=False)
+MAX_SINGLE_CALL_CHARS = 40000
+DEFAULT_PARSE_CONCURRENCY = 8
 
 
 SYSTEM_PROMPT = f"""Sos un parser de CVs. Tu única tarea es convertir el texto de un CV en un JSON válido que respete exactamente esta estructura.
@@ -48,22 +56,51 @@ Reglas críticas:
 6. Respondé ÚNICAMENTE con el JSON. Sin markdown, sin explicaciones, sin ```json. Empezá por {{ y terminá por }}.
 """
 
+_NO_INVENT = """Si no podés inferir un campo con certeza, dejalo en "" (string vacío), [] (array vacío), 0 o null. NUNCA inventes datos.
+Respondé ÚNICAMENTE con el JSON. Sin markdown, sin explicaciones, sin ```json. Empezá por { y terminá por }."""
 
-def parse_cv_to_json(cv_text: str) -> dict:
-    """
-    Recibe el texto completo del CV y devuelve el JSON estructurado.
-    Requiere OPENAI_API_KEY en el entorno.
-    """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
+HEADER_PROMPT = """Sos un parser de CVs. Recibís el encabezado de un CV (datos de contacto y, si la hay, la presentación o resumen). Devolvé un JSON con exactamente dos claves:
+- personal: firstName, lastName, email, phone, location, links (linkedin, github, portfolio)
+- narrative: headline, coreIdentity, careerGoal, avoidFraming (array). Si hay presentación o resumen, extraé lo relevante y repartilo en headline/coreIdentity/careerGoal; si no hay, dejá los campos vacíos.
+""" + _NO_INVENT
+
+ROLE_PROMPT = """Sos un parser de CVs. Recibís el texto de UN rol de la experiencia laboral de un CV. Devolvé un JSON con exactamente estas claves:
+- immutable: company, officialTitle, start (YYYY-MM), end (YYYY-MM o "present"), location
+- context: industry, companySize, teamSize (número), reportsTo, stakeholders (array)
+- facts: array de { what, metric (número o null), scope, myRole: "owner"|"contributor"|"support" }
+- capabilities: array de { name, evidence: array de strings }
+- technologies: array de { name, yearsInThisRole, usedInProduction (bool), depth: "architecture"|"implementation"|"basic", contexts: array }
+- leadershipSignals: { mentored (número), ledProjects, hiringInvolvement, crossFunctional (bool) }
+- relevanceTags: array de strings
+""" + _NO_INVENT
+
+REST_PROMPT = """Sos un parser de CVs. Recibís las secciones de un CV que no son experiencia laboral (educación, skills, idiomas, certificaciones, otras). Devolvé un JSON con exactamente estas claves:
+- education: array de { degree, institution, year, notes }
+- skills: { technical: array de { name, level: "básico"|"intermedio"|"avanzado", yearsTotal, usedInProduction, lastUsed (YYYY) }, soft: array de strings }
+- languages: array de { language, level }
+- certifications: array de { name, issuer, year, url }
+Para skills técnicas: si el CV no indica explícitamente el nivel, dejá "level" en null; lo mismo para "lastUsed" y "yearsTotal" sin evidencia concreta.
+""" + _NO_INVENT
+
+REST_SECTIONS = (
+    ("education", "Educación"),
+    ("skills", "Skills"),
+    ("languages", "Idiomas"),
+    ("certifications", "Certificaciones"),
+    ("other", "Otras secciones"),
+)
+EXPERIENCE_KEYS = ("facts", "capabilities", "technologies", "leadershipSignals", "relevanceTags")
+PRESENT_VALUES = ("present", "presente", "actual", "actualidad", "current")
+
+
+def _parse_params(cv_text: str) -> dict:
+    if not task_available("parse"):
         raise RuntimeError("OPENAI_API_KEY no configurada. Necesaria para el CV Parser.")
 
-    client = OpenAI(api_key=api_key)
-    model = os.environ.get("OPENAI_MODEL", "gpt-4o")
+    model = get_route("parse").model
     # Limitar tamaño para no pasarnos de contexto
-    chunk = (cv_text[:40000] + "...") if len(cv_text) > 40000 else cv_text
-
-    response = client.chat.completions.create(
+    chunk = (cv_text[:MAX_SINGLE_CALL_CHARS] + "...") if len(cv_text) > MAX_SINGLE_CALL_CHARS else cv_text
+    return dict(
         model=model,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
@@ -71,9 +108,116 @@ def parse_cv_to_json(cv_text: str) -> dict:
         ],
         max_tokens=16000,
         temperature=0.1,
+        **json_response_format(),
     )
-    raw_content = (response.choices[0].message.content or "").strip()
-    # Quitar posibles bloques markdown
-    if raw_content.startswith("```"):
-        raw_content = raw_content.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-    return json.loads(raw_content)
+
+
+def _sections_enabled() -> bool:
+    return os.environ.get("CV_PARSE_SECTIONS", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _parse_concurrency() -> int:
+    try:
+        return max(1, int(os.environ.get("CV_PARSE_CONCURRENCY", DEFAULT_PARSE_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_PARSE_CONCURRENCY
+
+
+def _recency(exp: dict) -> tuple:
+    """Clave de orden más reciente primero: fin (present arriba) y después inicio."""
+    immutable = exp.get("immutable") or {}
+    end = str(immutable.get("end") or "")
+    if end.strip().lower() in PRESENT_VALUES:
+        end = "9999-99"
+    return end, str(immutable.get("start") or "")
+
+
+async def _parse_sections_async(cv_text: str, sections: dict, use_cache: bool) -> dict:
+    """Una llamada por parte (encabezado, cada rol, resto) en paralelo, y merge al schema."""
+    model = get_route("parse").model
+    client = get_async_task_client("parse")
+    semaphore = asyncio.Semaphore(_parse_concurrency())
+
+    profile_validator = cv_validator()
+    validators = {
+        HEADER_PROMPT: profile_validator.select("personal", "narrative"),
+        ROLE_PROMPT: profile_validator.item("experience").select("immutable", "context", *EXPERIENCE_KEYS),
+        REST_PROMPT: profile_validator.select("education", "skills", "languages", "certifications"),
+    }
+
+    async def call(system: str, text: str, max_tokens: int) -> dict:
+        async with semaphore:
+            raw_content = await acached_completion(
+                client,
+                use_cache=use_cache,
+                model=model,
+                messages=[{"role": "system", "content": system}, {"role": "user", "content": text}],
+                max_tokens=max_tokens,
+                temperature=0.1,
+                **json_response_format(),
+            )
+            return await aparse_structured(raw_content, validators[system], use_cache=use_cache)
+
+    header = "\n\n".join(t for t in (sections["header"], sections["summary"]) if t) or cv_text[:1500]
+    rest = "\n\n".join(f"{label}:\n{sections[key]}" for key, label in REST_SECTIONS if sections[key])
+    roles = sections["experience"]
+
+    async def no_rest() -> dict:
+        return {}
+
+    header_data, rest_data, *role_data = await asyncio.gather(
+        call(HEADER_PROMPT, header, 2000),
+        call(REST_PROMPT, rest, 6000) if rest else no_rest(),
+        *(call(ROLE_PROMPT, block, 4000) for block in roles),
+    )
+
+    experience = []
+    for block, data in zip(roles, role_data):
+        exp = {"immutable": data.get("immutable") or {}, "context": data.get("context") or {}, "raw": block}
+        exp.update({key: data[key] for key in EXPERIENCE_KEYS if key in data})
+        experience.append(exp)
+    experience.sort(key=_recency, reverse=True)  # estable: sin fechas se respeta el orden del CV
+
+    return {
+        "metadata": {"version": "1.0", "lastUpdated": date.today().isoformat(), "owner": ""},
+        "personal": header_data.get("personal") or {},
+        "narrative": header_data.get("narrative") or {},
+        "experience": experience,
+        "education": rest_data.get("education") or [],
+        "skills": rest_data.get("skills") or {"technical": [], "soft": []},
+        "languages": rest_data.get("languages") or [],
+        "certifications": rest_data.get("certifications") or [],
+        "constraints": copy.deepcopy(cv_schema()["constraints"]),
+        "strategy": {"targetRoles": [], "avoidRoles": [], "seniority": "", "workMode": "", "industries": []},
+    }
+
+
+async def parse_cv_to_json_async(cv_text: str, use_cache: bool = True) -> dict:
+    """
+    Recibe el texto completo del CV y devuelve el JSON estructurado: por secciones en paralelo
+    si se detecta la experiencia por roles, si no con una sola llamada.
+    Requiere OPENAI_API_KEY en el entorno. use_cache=False saltea el cache del LLM.
+    """
+    if not task_available("parse"):
+        raise RuntimeError("OPENAI_API_KEY no configurada. Necesaria para el CV Parser.")
+    sections = split_sections(cv_text) if _sections_enabled() else None
+    if sections and sections["experience"]:
+        return await _parse_sections_async(cv_text, sections, use_cache)
+    params = _parse_params(cv_text)
+    client = get_async_task_client("parse")
+    raw_content = await acached_completion(client, use_cache=use_cache, **params)
+    return await aparse_structured(raw_content, cv_validator(), use_cache=use_cache)
+
+
+def parse_cv_to_json(cv_text: str, use_cache: bool = True) -> dict:
+    """
+    Versión sincrónica de parse_cv_to_json_async (CLI y scripts).
+    No usar desde dentro de un event loop: ahí llamar a parse_cv_to_json_async.
+    """
+    async def run() -> dict:
+        try:
+            return await parse_cv_to_json_async(cv_text, use_cache=use_cache)
+        finally:
+            await close_async_client()
+
+    return asyncio.run(run())
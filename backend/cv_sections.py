@@ -0,0 +1,143 @@
+"""
+Segmentación local (sin LLM) del texto de un CV en secciones y roles.
+
+Primera pasada del parser por secciones: detecta los títulos de sección habituales en
+español e inglés (Experiencia, Educación, Skills, Idiomas, ...) y parte la sección de
+experiencia en un bloque por rol usando las líneas con rango de fechas ("03/2019 - Presente",
+"Ene 2018 – Dic 2020", "2015 - 2017"). Las líneas cortas justo antes del rango (cargo,
+empresa) quedan en el bloque de ese rol. El bloque de cada rol es texto literal del CV.
+"""
+import re
+import unicodedata
+from typing import Dict, List
+
+SECTION_TITLES = {
+    "summary": (
+        "perfil", "perfil profesional", "resumen", "resumen profesional", "sobre mi", "acerca de mi",
+        "presentacion", "objetivo", "objetivo profesional", "summary", "professional summary",
+        "profile", "about", "about me", "objective",
+    ),
+    "experience": (
+        "experiencia", "experiencia laboral", "experiencia profesional", "trayectoria",
+        "trayectoria profesional", "historial laboral", "experience", "work experience",
+        "professional experience", "employment", "employment history", "work history", "career history",
+    ),
+    "education": (
+        "educacion", "formacion", "formacion academica", "estudios", "education",
+        "academic background", "education and training",
+    ),
+    "skills": (
+        "skills", "habilidades", "competencias", "conocimientos", "aptitudes", "tecnologias",
+        "herramientas", "stack", "tech stack", "technical skills", "habilidades tecnicas",
+        "conocimientos tecnicos", "skills tecnicos", "core skills", "competencies",
+    ),
+    "languages": ("idiomas", "languages", "lenguajes"),
+    "certifications": (
+        "certificaciones", "certificados", "cursos", "cursos y certificaciones", "certifications",
+        "courses", "licenses and certifications", "licenses & certifications",
+    ),
+    "other": (
+        "proyectos", "projects", "voluntariado", "volunteering", "intereses", "interests",
+        "publicaciones", "publications", "premios", "awards", "referencias", "references",
+    ),
+}
+_TITLE_TO_SECTION = {title: section for section, titles in SECTION_TITLES.items() for title in titles}
+MAX_TITLE_CHARS = 45
+MAX_ROLE_HEADER_LINES = 2
+MAX_ROLE_HEADER_CHARS = 90
+MAX_DATE_LINE_CHARS = 120
+
+_MONTH = (
+    r"(?:ene|feb|mar|abr|may|jun|jul|ago|sep|set|oct|nov|dic|jan|apr|aug|dec)[a-z]*\.?"
+)
+_YEAR = r"(?:19|20)\d{2}"
+_DATE = rf"(?:{_MONTH}\s*(?:de\s+)?{_YEAR}|\d{{1,2}}[/.-]{_YEAR}|{_YEAR}[/.-]\d{{1,2}}|{_YEAR})"
+_PRESENT = r"(?:presente|present|actualidad|actual|hoy|current|now|la fecha|today)"
+DATE_RANGE = re.compile(
+    rf"\b{_DATE}\s*(?:-|–|—|a|al|hasta|to|until)\s*(?:{_DATE}|{_PRESENT})\b", re.I
+)
+_BULLET = re.compile(r"^[\-•*·▪◦●►]")
+
+
+def _fold(line: str) -> str:
+    """Minúsculas sin tildes ni puntuación de borde, para comparar títulos."""
+    text = unicodedata.normalize("NFKD", line).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", text).strip(" \t:-–—|#*•").lower()
+
+
+def section_of(line: str) -> str | None:
+    """Sección que abre la línea si es un título conocido (p. ej. "EXPERIENCIA LABORAL:"), o None."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > MAX_TITLE_CHARS:
+        return None
+    return _TITLE_TO_SECTION.get(_fold(stripped))
+
+
+def _is_role_header(line: str) -> bool:
+    stripped = line.strip()
+    return (
+        bool(stripped)
+        and len(stripped) <= MAX_ROLE_HEADER_CHARS
+        and not _BULLET.match(stripped)
+        and not stripped.endswith(".")
+    )
+
+
+def _is_date_line(line: str) -> bool:
+    """Línea que abre un rol: corta, sin viñeta y con un rango de fechas (no un bullet que cita años)."""
+    stripped = line.strip()
+    return (
+        len(stripped) <= MAX_DATE_LINE_CHARS
+        and not _BULLET.match(stripped)
+        and bool(DATE_RANGE.search(stripped))
+    )
+
+
+def split_roles(text: str) -> List[str]:
+    """Bloques de texto de la sección de experiencia, uno por rol (lista vacía si no hay fechas)."""
+    lines = text.split("\n")
+    dates = [i for i, line in enumerate(lines) if _is_date_line(line)]
+    if not dates:
+        return []
+    starts = []
+    floor = 0
+    for d in dates:
+        if starts and d <= floor:
+            continue
+        start, taken, i = d, 0, d - 1
+        # Cargo y empresa suelen ir en las líneas cortas inmediatamente anteriores a las fechas
+        while i >= floor and taken < MAX_ROLE_HEADER_LINES:
+            if not lines[i].strip():
+                i -= 1
+                continue
+            if not _is_role_header(lines[i]) or _is_date_line(lines[i]):
+                break
+            start, taken, i = i, taken + 1, i - 1
+        starts.append(start if starts else 0)
+        floor = d + 1
+    bounds = starts + [len(lines)]
+    blocks = ["\n".join(lines[a:b]).strip() for a, b in zip(bounds, bounds[1:])]
+    return [b for b in blocks if b]
+
+
+def split_sections(text: str) -> Dict[str, object]:
+    """
+    {"header": texto antes del primer título, "summary", "experience": [bloque por rol],
+    "education", "skills", "languages", "certifications", "other"} (strings, "" si no hay).
+    experience queda vacío si no se encontró la sección o no tiene rangos de fechas.
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.split("\n"):
+        section = section_of(line)
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    result: Dict[str, object] = {
+        name: "\n".join(sections.get(name, [])).strip()
+        for name in ("header", "summary", "education", "skills", "languages", "certifications", "other")
+    }
+    result["experience"] = split_roles("\n".join(sections.get("experience", [])))
+    return result
@@ -1,15 +1,29 @@
 """
 Extracción de texto desde CV en PDF, DOCX o TXT.
 El resultado es siempre texto plano para pasar al LLM.
+
+Cada extractor acepta una ruta, los bytes del archivo o un file-like binario: los uploads se
+extraen directo desde memoria, sin escribir un archivo temporal.
 """
+import io
 from pathlib import Path
+from typing import BinaryIO, Union
+
+Source = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+def _as_stream(source: Source):
+    """Ruta o file-like tal cual; los bytes se envuelven en BytesIO (sin copiar a disco)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
 
 
-def extract_from_pdf(file_path: Path) -> str:
+def extract_from_pdf(source: Source) -> str:
     """Extrae texto de un PDF con pdfplumber."""
     import pdfplumber
     parts = []
-    with pdfplumber.open(file_path) as pdf:
+    with pdfplumber.open(_as_stream(source)) as pdf:
         for page in pdf.pages:
             text = page.extract_text()
             if text:
@@ -17,30 +31,37 @@ def extract_from_pdf(file_path: Path) -> str:
     return "\n\n".join(parts).strip() if parts else ""
 
 
-def extract_from_docx(file_path: Path) -> str:
+def extract_from_docx(source: Source) -> str:
     """Extrae texto de un DOCX con python-docx."""
     from docx import Document
-    doc = Document(file_path)
+    doc = Document(_as_stream(source))
     return "\n\n".join(p.text for p in doc.paragraphs if p.text.strip()).replace("\n\n\n", "\n\n").strip()
 
 
-def extract_from_txt(file_path: Path) -> str:
-    """Lee contenido de un archivo de texto plano."""
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        return f.read().strip()
+def extract_from_txt(source: Source) -> str:
+    """Lee contenido de texto plano (UTF-8, caracteres inválidos reemplazados)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source).decode("utf-8", errors="replace").strip()
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    data = source.read()
+    if isinstance(data, bytes):
+        data = data.decode("utf-8", errors="replace")
+    return data.strip()
 
 
-def extract_cv_text(file_path: Path) -> str:
+def extract_cv_text(source: Source, filename: str | None = None) -> str:
     """
     Extrae texto del CV según la extensión del archivo.
-    Acepta .pdf, .docx, .txt.
+    Acepta .pdf, .docx, .txt. Con bytes o un file-like, la extensión sale de filename.
     """
-    path = Path(file_path)
-    suffix = path.suffix.lower()
+    name = filename if filename is not None else source if isinstance(source, (str, Path)) else ""
+    suffix = Path(name).suffix.lower()
     if suffix == ".pdf":
-        return extract_from_pdf(path)
+        return extract_from_pdf(source)
     if suffix == ".docx":
-        return extract_from_docx(path)
+        return extract_from_docx(source)
     if suffix == ".txt":
-        return extract_from_txt(path)
-    raise ValueError(f"Formato no soportado: {suffix}. Use .pdf, .docx o .txt")
\ No newline at end of file
+        return extract_from_txt(source)
+    raise ValueError(f"Formato no soportado: {suffix}. Use .pdf, .docx o .txt")
@@ -0,0 +1,256 @@
+"""
+Extracción del contenido principal de una página de oferta (reemplaza los tres regex de
+fetch_job_content, que mandaban menús, banners de cookies y footers al LLM como tokens).
+
+- Parser incremental (html.parser de la stdlib): el HTML se alimenta en bloques y el parseo
+  se corta apenas se cierra un contenedor principal (<main>, <article> o un id/class tipo
+  "job-description") con texto suficiente.
+- Se descartan script/style/nav/footer/aside/form/... y los elementos cuyo id/class delatan
+  boilerplate (cookie, banner, menu, share, related...).
+- Scoring estilo readability: cada párrafo con texto suma puntos (largo, comas) a su padre y la
+  mitad a su abuelo; el puntaje se ajusta por tag, por id/class y por densidad de links.
+  Se devuelve el mejor contenedor más los hermanos con puntaje comparable, y el <h1>.
+Si no hay un contenedor claro se devuelve todo el texto que no es boilerplate.
+
+html_to_text() es la conversión plana, sin scoring ni descarte de boilerplate, para fragmentos
+que ya son todo contenido (la descripción HTML de un JobPosting JSON-LD).
+"""
+import re
+from html.parser import HTMLParser
+from typing import List
+
+MAX_CHARS = 50000
+FEED_CHUNK = 16384
+EARLY_STOP_CHARS = 1500  # texto mínimo de un contenedor principal para cortar el parseo
+MIN_MAIN_CHARS = 250  # si el mejor candidato tiene menos, se usa el texto completo
+MIN_PARAGRAPH_CHARS = 25
+
+SKIP_TAGS = frozenset(
+    "script style noscript template svg canvas iframe nav footer aside form button select "
+    "textarea dialog menu".split()
+)
+VOID_TAGS = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+BLOCK_TAGS = frozenset(
+    "address article blockquote dd div dl dt figcaption figure h1 h2 h3 h4 h5 h6 header hgroup "
+    "li main ol p pre section table tbody td th thead tr ul".split()
+)
+# Sin texto legible: se descartan también en html_to_text
+NON_TEXT_TAGS = frozenset("script style noscript template svg canvas iframe".split())
+UNSKIPPABLE_TAGS = frozenset(("html", "body", "main", "article"))
+PARAGRAPH_TAGS = frozenset("p li td pre dd dt blockquote".split())
+MAIN_TAGS = frozenset(("main", "article"))
+TAG_SCORES = {
+    "div": 5, "article": 10, "main": 10, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+    "ol": -3, "ul": -3, "dl": -3, "header": -3, "h1": -5, "h2": -5, "h3": -5, "h4": -5, "th": -5,
+}
+
+_BOILERPLATE_HINT = re.compile(
+    r"cookie|consent|banner|gdpr|nav|menu|breadcrumb|footer|sidebar|share|social|related|"
+    r"similar|recommend|newsletter|subscribe|modal|popup|promo|advert|sponsor|login|signup",
+    re.I,
+)
+_CONTENT_HINT = re.compile(
+    r"job|posting|vacan|description|descripcion|details|requirements|responsibilit|"
+    r"content|article|main|body|entry|post",
+    re.I,
+)
+_SPACES = re.compile(r"[ \t\r\f\v\u00a0]+")
+
+
+class _Node:
+    __slots__ = ("tag", "parent", "children", "skip", "hint", "text_len", "link_len", "score")
+
+    def __init__(self, tag: str, parent: "_Node | None", skip: bool, hint: int):
+        self.tag = tag
+        self.parent = parent
+        self.children: list = []
+        self.skip = skip
+        self.hint = hint
+        self.text_len = 0
+        self.link_len = 0
+        self.score = 0.0
+
+
+def _hint(attrs: list) -> int:
+    """+1 si id/class sugieren contenido de la oferta, -1 si sugieren boilerplate."""
+    names = " ".join(v for k, v in attrs if k in ("id", "class", "role") and v)
+    if not names:
+        return 0
+    boilerplate = bool(_BOILERPLATE_HINT.search(names))
+    content = bool(_CONTENT_HINT.search(names))
+    if boilerplate != content:
+        return 1 if content else -1
+    return 0
+
+
+class _MainContentParser(HTMLParser):
+    def __init__(self, skip_boilerplate: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.skip_boilerplate = skip_boilerplate
+        self.root = _Node("root", None, False, 0)
+        self.nodes: List[_Node] = [self.root]  # en orden de documento: padres antes que hijos
+        self.stack: List[_Node] = [self.root]
+        self.title_parts: List[str] = []
+        self.in_h1 = False
+        self.done = False
+
+    @property
+    def current(self) -> _Node:
+        return self.stack[-1]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self.current.children.append("\n")
+            return
+        # <p> y <li> se cierran implícitamente al abrir otro igual
+        if tag in ("p", "li") and self.current.tag == tag:
+            self._close(tag)
+        parent = self.current
+        if self.skip_boilerplate:
+            hint = _hint(attrs)
+            skip = parent.skip or tag in SKIP_TAGS or (hint < 0 and tag not in UNSKIPPABLE_TAGS)
+        else:
+            hint, skip = 0, parent.skip or tag in NON_TEXT_TAGS
+        node = _Node(tag, parent, skip, hint)
+        parent.children.append(node)
+        self.nodes.append(node)
+        self.stack.append(node)
+        if tag == "h1" and not self.title_parts and not skip:
+            self.in_h1 = True
+
+    def handle_endtag(self, tag):
+        if tag == "h1":
+            self.in_h1 = False
+        node = self._close(tag)
+        if node is None or node.skip:
+            return
+        if tag in MAIN_TAGS or (node.hint > 0 and tag in ("div", "section")):
+            if _text_len(node) >= EARLY_STOP_CHARS:
+                self.done = True
+
+    def _close(self, tag: str) -> "_Node | None":
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                node = self.stack[i]
+                del self.stack[i:]
+                return node
+        return None
+
+    def handle_data(self, data):
+        if self.current.skip:
+            return
+        self.current.children.append(data)
+        if self.in_h1:
+            self.title_parts.append(data)
+
+
+def _text_len(node: _Node) -> int:
+    total = 0
+    pending = [node]
+    while pending:
+        n = pending.pop()
+        for child in n.children:
+            if isinstance(child, str):
+                total += len(child.strip())
+            elif not child.skip:
+                pending.append(child)
+    return total
+
+
+def _text(node: _Node) -> str:
+    """Texto del subárbol: un bloque por línea, espacios colapsados."""
+    parts: List[str] = []
+    pending: list = [node]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        if item.skip:
+            continue
+        if item.tag in BLOCK_TAGS:
+            parts.append("\n")
+        pending.append("\n" if item.tag in BLOCK_TAGS else "")
+        pending.extend(reversed(item.children))
+    lines = (_SPACES.sub(" ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _score(nodes: List[_Node]) -> None:
+    # Largo de texto y de links por nodo, de abajo hacia arriba (los hijos vienen después)
+    for node in reversed(nodes):
+        if node.skip:
+            continue
+        own = sum(len(c.strip()) for c in node.children if isinstance(c, str))
+        node.text_len += own
+        if node.tag == "a":
+            node.link_len = node.text_len
+        if node.parent is not None:
+            node.parent.text_len += node.text_len
+            node.parent.link_len += node.link_len
+
+    for node in nodes:
+        if node.skip or node.parent is None:
+            continue
+        own = sum(len(c.strip()) for c in node.children if isinstance(c, str))
+        is_paragraph = node.tag in PARAGRAPH_TAGS or (node.tag == "div" and own >= MIN_PARAGRAPH_CHARS)
+        if not is_paragraph or node.text_len < MIN_PARAGRAPH_CHARS:
+            continue
+        commas = sum(c.count(",") for c in node.children if isinstance(c, str))
+        points = 1 + commas + min(node.text_len // 100, 3)
+        parent = node.parent
+        parent.score += points
+        if parent.parent is not None:
+            parent.parent.score += points / 2
+
+    for node in nodes:
+        if node.score:
+            node.score += TAG_SCORES.get(node.tag, 0) + 25 * node.hint
+            link_density = node.link_len / node.text_len if node.text_len else 0
+            node.score *= 1 - link_density
+
+
+def _select(root: _Node, nodes: List[_Node]) -> List[_Node]:
+    candidates = [n for n in nodes if n.score > 0 and not n.skip and n is not root]
+    if not candidates:
+        return [root]
+    top = max(candidates, key=lambda n: n.score)
+    if top.text_len < MIN_MAIN_CHARS:
+        return [root]
+    if top.parent is None:
+        return [top]
+    # Hermanos con puntaje comparable (la oferta a veces está partida en varias secciones)
+    threshold = max(10.0, top.score * 0.2)
+    return [
+        sibling
+        for sibling in top.parent.children
+        if isinstance(sibling, _Node) and not sibling.skip
+        and (sibling is top or sibling.score >= threshold)
+    ]
+
+
+def extract_main_text(html: str, max_chars: int = MAX_CHARS) -> str:
+    """Texto del contenido principal del HTML, un bloque por línea, con tope de max_chars."""
+    parser = _MainContentParser()
+    for start in range(0, len(html), FEED_CHUNK):
+        parser.feed(html[start:start + FEED_CHUNK])
+        if parser.done:
+            break
+    else:
+        parser.close()
+
+    _score(parser.nodes)
+    text = "\n".join(t for t in (_text(n) for n in _select(parser.root, parser.nodes)) if t)
+    title = _SPACES.sub(" ", "".join(parser.title_parts)).strip()
+    if title and not text.startswith(title):
+        text = f"{title}\n{text}"
+    return text[:max_chars]
+
+
+def html_to_text(html: str, max_chars: int = MAX_CHARS) -> str:
+    """Todo el texto del fragmento HTML, un bloque por línea: no elige contenedor ni descarta nada."""
+    parser = _MainContentParser(skip_boilerplate=False)
+    parser.feed(html)
+    parser.close()
+    return _text(parser.root)[:max_chars]
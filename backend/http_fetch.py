@@ -0,0 +1,283 @@
+"""
+Fetch HTTP de páginas de ofertas: cliente async compartido, cache de páginas y reintentos.
+
+- Un httpx.AsyncClient por event loop (en el server, uno solo): keep-alive, HTTP/2 si está
+  instalado el paquete h2, tope global de conexiones (HTTP_MAX_CONNECTIONS) y por host
+  (HTTP_PER_HOST_CONNECTIONS).
+- Cache de páginas en SQLite (backend/.cache/page_cache.sqlite3, PAGE_CACHE_PATH): una página
+  fresca se sirve sin red; si no, se revalida con If-None-Match / If-Modified-Since y un 304
+  reutiliza el cuerpo guardado. La frescura sale del Cache-Control de la respuesta (max-age;
+  no-cache = revalidar siempre; no-store = no se guarda) y, si no lo trae, de
+  PAGE_CACHE_MAX_AGE segundos. PAGE_CACHE=0 lo desactiva.
+- Reintentos con backoff exponencial (HTTP_FETCH_RETRIES) ante errores de red, 429 y 5xx,
+  respetando Retry-After.
+"""
+import asyncio
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+DEFAULT_PAGE_CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "page_cache.sqlite3"
+DEFAULT_MAX_AGE = 600
+DEFAULT_PAGE_ENTRIES = 1000
+DEFAULT_RETRIES = 2
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_PER_HOST_CONNECTIONS = 4
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+MAX_RETRY_AFTER = 10.0
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*\"?(\d+)", re.I)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def freshness(headers: httpx.Headers, default: float) -> float | None:
+    """Segundos que la respuesta puede servirse sin revalidar según Cache-Control; None = no-store."""
+    cache_control = headers.get("Cache-Control", "")
+    directives = {d.split("=", 1)[0].strip().lower() for d in cache_control.split(",")}
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    return float(match.group(1)) if match else default
+
+
+class PageCache:
+    """Páginas por URL con sus validadores (ETag / Last-Modified), acotado por entradas."""
+
+    def __init__(self, path: Path, max_age: int = DEFAULT_MAX_AGE, max_entries: int = DEFAULT_PAGE_ENTRIES):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._counters = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stores": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+                " fetched REAL NOT NULL, max_age REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+            if "max_age" not in columns:  # cache creado antes de guardar la frescura por página
+                self._conn.execute("ALTER TABLE pages ADD COLUMN max_age REAL")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> dict | None:
+        """{"body", "etag", "last_modified", "fresh"} o None."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT body, etag, last_modified, fetched, max_age FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched, max_age = row
+        return {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": time.time() - fetched < (self.max_age if max_age is None else max_age),
+        }
+
+    def set(
+        self,
+        url: str,
+        body: str,
+        etag: str | None,
+        last_modified: str | None,
+        max_age: float | None = None,
+    ) -> None:
+        """Guarda la página; max_age None usa el PAGE_CACHE_MAX_AGE del cache."""
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO pages (url, body, etag, last_modified, fetched, max_age)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time(), max_age),
+            )
+            db.execute(
+                "DELETE FROM pages WHERE url IN ("
+                " SELECT url FROM pages ORDER BY fetched DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+            self._counters["stores"] += 1
+
+    def touch(self, url: str, max_age: float | None = None) -> None:
+        """Tras un 304: la copia guardada vuelve a estar fresca, con la frescura del 304."""
+        with self._lock:
+            db = self._db()
+            db.execute("UPDATE pages SET fetched = ?, max_age = ? WHERE url = ?", (time.time(), max_age, url))
+            db.commit()
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            db.commit()
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._db().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return {**self._counters, "size": size, "max_age": self.max_age}
+
+
+_page_cache: PageCache | None = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache | None:
+    """Cache de páginas del proceso. None si PAGE_CACHE=0."""
+    global _page_cache
+    if os.environ.get("PAGE_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            path = os.environ.get("PAGE_CACHE_PATH", "").strip()
+            _page_cache = PageCache(
+                Path(path) if path else DEFAULT_PAGE_CACHE_PATH,
+                max_age=_env_int("PAGE_CACHE_MAX_AGE", DEFAULT_MAX_AGE),
+                max_entries=_env_int("PAGE_CACHE_ENTRIES", DEFAULT_PAGE_ENTRIES),
+            )
+        return _page_cache
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _LoopClient:
+    """Cliente compartido y semáforos por host, atados a un event loop."""
+
+    def __init__(self):
+        max_connections = _env_int("HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+        self.per_host = max(1, _env_int("HTTP_PER_HOST_CONNECTIONS", DEFAULT_PER_HOST_CONNECTIONS))
+        self.client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=_http2_available(),
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    def host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClient]" = weakref.WeakKeyDictionary()
+
+
+def _loop_client() -> _LoopClient:
+    loop = asyncio.get_running_loop()
+    state = _clients.get(loop)
+    if state is None or state.client.is_closed:
+        state = _clients[loop] = _LoopClient()
+    return state
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente del event loop actual (shutdown del server o fin de un asyncio.run)."""
+    state = _clients.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.client.aclose()
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.strip().isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    return BACKOFF_BASE * (2 ** attempt) * (0.5 + random.random())
+
+
+async def _get_with_retries(state: _LoopClient, url: str, headers: dict, timeout: float) -> httpx.Response:
+    retries = max(0, _env_int("HTTP_FETCH_RETRIES", DEFAULT_RETRIES))
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            async with state.host_limit(url):
+                response = await state.client.get(url, headers=headers, timeout=timeout)
+            if response.status_code not in RETRY_STATUS or attempt == retries:
+                return response
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        await asyncio.sleep(_retry_delay(attempt, response))
+    raise AssertionError("unreachable")
+
+
+async def fetch_page(url: str, timeout: float = 30.0, use_cache: bool = True) -> str:
+    """
+    HTML de la URL pasando por el cache de páginas. Levanta httpx.HTTPStatusError si la
+    respuesta final no es 2xx/304 y httpx.TransportError si la red falla tras los reintentos.
+    """
+    cache = get_page_cache() if use_cache else None
+    # SQLite fuera del event loop
+    cached = await asyncio.to_thread(cache.get, url) if cache is not None else None
+    if cached is not None and cached["fresh"]:
+        cache.count("fresh_hits")
+        return cached["body"]
+
+    headers = {}
+    if cached is not None:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = await _get_with_retries(_loop_client(), url, headers, timeout)
+    if cache is not None:
+        max_age = freshness(response.headers, cache.max_age)
+    if response.status_code == 304 and cached is not None:
+        cache.count("revalidated")
+        if max_age is None:
+            await asyncio.to_thread(cache.delete, url)
+        else:
+            await asyncio.to_thread(cache.touch, url, max_age)
+        return cached["body"]
+    response.raise_for_status()
+    body = response.text
+    if cache is not None:
+        cache.count("misses")
+        if max_age is None:
+            await asyncio.to_thread(cache.delete, url)
+        else:
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+            await asyncio.to_thread(cache.set, url, body, etag, last_modified, max_age)
+    return body
@@ -0,0 +1,197 @@
+"""
+Store de JDs por hash de contenido y por sesión (reemplaza el global _last_jd_raw_text).
+
+- Cada JD se guarda bajo jd_id = hash del texto crudo, con los artefactos que se van
+  calculando (summary, match, source_url, ...). Guardar el mismo texto dos veces no pisa nada:
+  put() solo sobrescribe campos con valores no nulos (pegar el texto no borra la URL de origen).
+  El paso 3 (/api/adapt) reutiliza el summary y el match en vez de volver a pedirlos al LLM;
+  el match vale solo para el perfil con el que se calculó (profile_key).
+- Cada sesión (header X-Session-Id, una por pestaña del browser) recuerda su último jd_id,
+  así dos usuarios o dos pestañas no se pisan.
+- Backend en memoria (LRU, default) o SQLite si JD_STORE_PATH está definido: compartido
+  entre procesos (uvicorn --workers N) y persistente entre reinicios.
+Ambos se acotan a JD_STORE_MAX_ENTRIES JDs y sesiones (se desalojan las menos usadas).
+En SQLite cada leer-modificar-escribir corre en una transacción BEGIN IMMEDIATE, para que
+dos workers que actualizan el mismo JD (summary y match) no se pisen los campos.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict
+
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_SESSION = "default"
+
+
+def jd_hash(raw_text: str) -> str:
+    """jd_id estable para un texto de JD."""
+    return hashlib.sha256(raw_text.encode("utf-8")).hexdigest()[:32]
+
+
+def _merge(record: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplica a record los campos con valor: un put() sin source_url/posting no los borra."""
+    record.update({key: value for key, value in fields.items() if value is not None})
+    return record
+
+
+def profile_key(profile: Dict[str, Any]) -> str:
+    """Hash del perfil (JSON canónico) con el que se calculó un artefacto, como el match."""
+    canonical = json.dumps(profile, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class MemoryJDStore:
+    """Store en memoria del proceso, con LRU para JDs y para sesiones."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._jds: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._sessions: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, raw_text: str, session_id: str | None = None, **fields) -> str:
+        jd_id = jd_hash(raw_text)
+        with self._lock:
+            record = self._jds.get(jd_id) or {"jd_id": jd_id, "raw_text": raw_text, "created": time.time()}
+            _merge(record, fields)
+            self._jds[jd_id] = record
+            self._jds.move_to_end(jd_id)
+            while len(self._jds) > self.max_entries:
+                self._jds.popitem(last=False)
+            self._set_session(session_id, jd_id)
+        return jd_id
+
+    def _set_session(self, session_id: str | None, jd_id: str) -> None:
+        session_id = session_id or DEFAULT_SESSION
+        self._sessions[session_id] = jd_id
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_entries:
+            self._sessions.popitem(last=False)
+
+    def get(self, jd_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            record = self._jds.get(jd_id)
+            if record is None:
+                return None
+            self._jds.move_to_end(jd_id)
+            return dict(record)
+
+    def update(self, jd_id: str, **fields) -> None:
+        with self._lock:
+            record = self._jds.get(jd_id)
+            if record is not None:
+                record.update(fields)
+
+    def last_for_session(self, session_id: str | None) -> Dict[str, Any] | None:
+        with self._lock:
+            jd_id = self._sessions.get(session_id or DEFAULT_SESSION)
+        return self.get(jd_id) if jd_id else None
+
+
+class SQLiteJDStore:
+    """Store en SQLite: compartido entre workers y persistente entre reinicios."""
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jds (jd_id TEXT PRIMARY KEY, data TEXT NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jd_sessions (session_id TEXT PRIMARY KEY, jd_id TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @contextmanager
+    def _transaction(self):
+        """Toma el lock de escritura antes de leer: el read-modify-write es atómico entre procesos."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        for table, column in (("jds", "accessed"), ("jd_sessions", "updated")):
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN ("
+                f" SELECT rowid FROM {table} ORDER BY {column} DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _load(self, jd_id: str) -> Dict[str, Any] | None:
+        row = self._conn.execute("SELECT data FROM jds WHERE jd_id = ?", (jd_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save(self, record: Dict[str, Any], now: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jds (jd_id, data, accessed) VALUES (?, ?, ?)",
+            (record["jd_id"], json.dumps(record, ensure_ascii=False), now),
+        )
+
+    def put(self, raw_text: str, session_id: str | None = None, **fields) -> str:
+        jd_id = jd_hash(raw_text)
+        now = time.time()
+        with self._transaction():
+            record = self._load(jd_id) or {"jd_id": jd_id, "raw_text": raw_text, "created": now}
+            self._save(_merge(record, fields), now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jd_sessions (session_id, jd_id, updated) VALUES (?, ?, ?)",
+                (session_id or DEFAULT_SESSION, jd_id, now),
+            )
+            self._evict()
+        return jd_id
+
+    def get(self, jd_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            record = self._load(jd_id)
+            if record is not None:
+                self._conn.execute("UPDATE jds SET accessed = ? WHERE jd_id = ?", (time.time(), jd_id))
+                self._conn.commit()
+            return record
+
+    def update(self, jd_id: str, **fields) -> None:
+        with self._transaction():
+            record = self._load(jd_id)
+            if record is None:
+                return
+            record.update(fields)
+            self._save(record, time.time())
+
+    def last_for_session(self, session_id: str | None) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT jd_id FROM jd_sessions WHERE session_id = ?", (session_id or DEFAULT_SESSION,)
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+
+_store: MemoryJDStore | SQLiteJDStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_jd_store() -> MemoryJDStore | SQLiteJDStore:
+    """Store del proceso: SQLite si JD_STORE_PATH está definido, si no en memoria."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            try:
+                max_entries = int(os.environ.get("JD_STORE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+            except ValueError:
+                max_entries = DEFAULT_MAX_ENTRIES
+            path = os.environ.get("JD_STORE_PATH", "").strip()
+            _store = SQLiteJDStore(Path(path), max_entries) if path else MemoryJDStore(max_entries)
+        return _store
@@ -0,0 +1,185 @@
+"""
+JobPosting estructurado (schema.org JSON-LD) embebido en la página de la oferta.
+
+La mayoría de los ATS (Greenhouse, Lever, Workday, ...) publican un bloque
+<script type="application/ld+json"> con @type JobPosting. Si está, se arma una JD
+estructurada (título, empresa, descripción, requisitos, ubicación, modalidad) y un resumen
+determinístico que reemplaza la llamada al LLM de summarize_jd.
+"""
+import html as html_lib
+import json
+import re
+from typing import Any, Dict, List
+
+from .html_extract import html_to_text
+
+MIN_DESCRIPTION_CHARS = 200
+SUMMARY_DESCRIPTION_CHARS = 1200
+
+_LD_JSON = re.compile(
+    r"<script[^>]*type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>", re.I | re.S
+)
+
+EMPLOYMENT_TYPES = {
+    "FULL_TIME": "Tiempo completo",
+    "PART_TIME": "Medio tiempo",
+    "CONTRACTOR": "Contrato",
+    "TEMPORARY": "Temporal",
+    "INTERN": "Pasantía",
+    "VOLUNTEER": "Voluntariado",
+    "PER_DIEM": "Por día",
+}
+REQUIREMENT_FIELDS = ("qualifications", "skills", "experienceRequirements", "educationRequirements")
+
+
+def _iter_objects(data: Any):
+    """Objetos JSON-LD, recorriendo listas y @graph."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_objects(data["@graph"])
+
+
+def _is_job_posting(obj: Dict[str, Any]) -> bool:
+    types = obj.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return "JobPosting" in types
+
+
+def _text(value: Any) -> str:
+    """Texto plano de un campo que puede venir con HTML (escapado o no), lista u objeto."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "\n".join(t for t in (_text(v) for v in value) if t)
+    if isinstance(value, dict):
+        return _text(value.get("name") or value.get("description") or value.get("value"))
+    text = html_lib.unescape(str(value))
+    if "<" in text:
+        # La descripción ya es todo contenido: conversión plana, sin el scoring de página
+        return html_to_text(text)
+    return text.strip()
+
+
+def _lines(value: Any) -> List[str]:
+    return [line.strip(" -•*\t") for line in _text(value).split("\n") if line.strip(" -•*\t")]
+
+
+def _location(posting: Dict[str, Any]) -> str:
+    places = []
+    locations = posting.get("jobLocation") or []
+    for loc in locations if isinstance(locations, list) else [locations]:
+        address = loc.get("address") if isinstance(loc, dict) else None
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [_text(p) for p in parts if p]
+            if parts:
+                places.append(", ".join(dict.fromkeys(parts)))
+        elif isinstance(address, str) and address.strip():
+            places.append(address.strip())
+    remote = str(posting.get("jobLocationType", "")).upper() == "TELECOMMUTE"
+    if remote:
+        places.insert(0, "Remoto")
+    return " / ".join(dict.fromkeys(places))
+
+
+def _employment_type(value: Any) -> str:
+    values = value if isinstance(value, list) else [value]
+    labels = [EMPLOYMENT_TYPES.get(str(v).upper().replace("-", "_"), str(v)) for v in values if v]
+    return ", ".join(labels)
+
+
+def _salary(value: Any) -> str:
+    if not isinstance(value, dict):
+        return ""
+    amount = value.get("value")
+    currency = value.get("currency") or ""
+    if isinstance(amount, dict):
+        low, high = amount.get("minValue"), amount.get("maxValue")
+        unit = amount.get("unitText") or ""
+        if low and high:
+            return f"{currency} {low} - {high} {unit}".strip()
+        amount = amount.get("value") or low or high
+        currency = f"{currency} " if currency else ""
+        return f"{currency}{amount} {unit}".strip() if amount else ""
+    return f"{currency} {amount}".strip() if amount else ""
+
+
+def extract_job_posting(html: str) -> Dict[str, Any] | None:
+    """
+    JobPosting del HTML como JD estructurada:
+    {"title", "company", "description", "requirements", "responsibilities", "location",
+    "employment_type", "salary", "date_posted"}. None si no hay un JobPosting utilizable.
+    """
+    for block in _LD_JSON.findall(html or ""):
+        try:
+            data = json.loads(block.strip(), strict=False)
+        except ValueError:
+            continue
+        for obj in _iter_objects(data):
+            if not _is_job_posting(obj):
+                continue
+            title = _text(obj.get("title"))
+            description = _text(obj.get("description"))
+            if not title or len(description) < MIN_DESCRIPTION_CHARS:
+                continue
+            requirements = []
+            for field in REQUIREMENT_FIELDS:
+                requirements.extend(_lines(obj.get(field)))
+            return {
+                "title": title,
+                "company": _text(obj.get("hiringOrganization")),
+                "description": description,
+                "requirements": list(dict.fromkeys(requirements)),
+                "responsibilities": _lines(obj.get("responsibilities")),
+                "location": _location(obj),
+                "employment_type": _employment_type(obj.get("employmentType")),
+                "salary": _salary(obj.get("baseSalary")),
+                "date_posted": _text(obj.get("datePosted")),
+            }
+    return None
+
+
+def posting_to_text(posting: Dict[str, Any]) -> str:
+    """Texto crudo de la JD (lo que consumen match y generator) a partir del JobPosting."""
+    header = [posting["title"]]
+    for label, key in (
+        ("Empresa", "company"),
+        ("Ubicación", "location"),
+        ("Modalidad", "employment_type"),
+        ("Salario", "salary"),
+    ):
+        if posting.get(key):
+            header.append(f"{label}: {posting[key]}")
+    sections = ["\n".join(header), posting["description"]]
+    if posting.get("responsibilities"):
+        sections.append("Responsabilidades:\n" + "\n".join(f"- {r}" for r in posting["responsibilities"]))
+    if posting.get("requirements"):
+        sections.append("Requisitos:\n" + "\n".join(f"- {r}" for r in posting["requirements"]))
+    return "\n\n".join(sections)
+
+
+def summarize_posting(posting: Dict[str, Any]) -> str:
+    """Resumen determinístico (sin LLM) con el mismo contenido que pide SUMMARY_SYSTEM_PROMPT."""
+    role = posting["title"] + (f" — {posting['company']}" if posting.get("company") else "")
+    lines = [f"Rol: {role}"]
+    if posting.get("location"):
+        lines.append(f"Ubicación: {posting['location']}")
+    if posting.get("employment_type"):
+        lines.append(f"Modalidad: {posting['employment_type']}")
+    if posting.get("salary"):
+        lines.append(f"Salario: {posting['salary']}")
+    if posting.get("requirements"):
+        lines.append("Requisitos:")
+        lines.extend(f"- {r}" for r in posting["requirements"])
+    if posting.get("responsibilities"):
+        lines.append("Responsabilidades:")
+        lines.extend(f"- {r}" for r in posting["responsibilities"])
+    description = posting["description"]
+    if len(description) > SUMMARY_DESCRIPTION_CHARS:
+        description = description[:SUMMARY_DESCRIPTION_CHARS].rsplit(" ", 1)[0] + "…"
+    lines.append(f"Descripción: {description}")
+    return "\n".join(lines)
@@ -0,0 +1,327 @@
+"""
+Cache de respuestas del LLM direccionado por contenido, compartido por todas las tools.
+La clave es un hash de (modelo, mensajes, parámetros de sampling): la misma JD o el mismo
+CV vuelven a responder sin pagar latencia ni tokens.
+
+Dos niveles:
+- memoria: LRU acotado por cantidad de entradas (LLM_CACHE_MEMORY_ENTRIES) y por tamaño
+  total de las respuestas (LLM_CACHE_MEMORY_MB).
+- disco: SQLite en backend/.cache/llm_cache.sqlite3 (LLM_CACHE_PATH), acotado por
+  LLM_CACHE_DISK_ENTRIES y LLM_CACHE_DISK_MB; se desalojan primero las entradas usadas hace
+  más tiempo, hasta que entran los dos límites (unos pocos CVs generados enormes no hacen
+  crecer el archivo ni la RAM sin techo).
+Ambos niveles respetan LLM_CACHE_TTL (segundos). LLM_CACHE=0 desactiva el cache.
+Solo se cachean las llamadas deterministas (temperature <= 0.1): una generación con sampling
+(el CV a 0.2, el resumen sin temperature = 1 del proveedor) se pide de nuevo cada vez, salvo que
+el que llama lo pida con cache_sampled=True.
+Una lectura nunca escribe en SQLite: el último acceso de cada hit de disco queda pendiente en
+memoria y se graba junto con el próximo set(), antes de desalojar (un commit menos por hit).
+Cada llamada puede saltearlo con use_cache=False. Las funciones async leen y escriben SQLite en un
+thread, fuera del event loop.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "llm_cache.sqlite3"
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 5000
+DEFAULT_MEMORY_MB = 64
+DEFAULT_DISK_MB = 256
+# Hasta esta temperature la respuesta se considera determinista y se cachea
+MAX_CACHED_TEMPERATURE = 0.1
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bytes(name: str, default_mb: int) -> int:
+    """Variable en MB (acepta decimales) convertida a bytes."""
+    try:
+        return int(float(os.environ.get(name, default_mb)) * 1024 * 1024)
+    except ValueError:
+        return default_mb * 1024 * 1024
+
+
+def _value_size(value: str) -> int:
+    return len(value.encode("utf-8"))
+
+
+def cache_key(params: dict) -> str:
+    """Hash estable de los parámetros del request (modelo, mensajes, sampling)."""
+    canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _client_key(client, params: dict) -> str:
+    """cache_key más el proveedor del cliente si no es OpenAI (llm_router.RoutedClient)."""
+    namespace = getattr(client, "cache_namespace", "")
+    return cache_key({**params, "_provider": namespace} if namespace else params)
+
+
+def cacheable(params: dict) -> bool:
+    """Request determinista: temperature <= MAX_CACHED_TEMPERATURE (sin temperature, el proveedor usa 1)."""
+    temperature = params.get("temperature")
+    return temperature is not None and temperature <= MAX_CACHED_TEMPERATURE
+
+
+class LLMCache:
+    """Cache de dos niveles (LRU en memoria + SQLite) con TTL, topes en entradas y bytes y contadores."""
+
+    def __init__(
+        self,
+        path: Path | None = DEFAULT_CACHE_PATH,
+        ttl: int = DEFAULT_TTL,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        disk_entries: int = DEFAULT_DISK_ENTRIES,
+        memory_bytes: int = DEFAULT_MEMORY_MB * 1024 * 1024,
+        disk_bytes: int = DEFAULT_DISK_MB * 1024 * 1024,
+    ):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._memory_size = 0  # bytes de las respuestas en memoria
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._touched: dict[str, float] = {}  # accessed pendiente de grabar, por clave
+        self._counters = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "bypass": 0, "sampled": 0, "stores": 0
+        }
+
+    def _db(self) -> sqlite3.Connection | None:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl > 0 and now - created > self.ttl
+
+    def _forget(self, key: str) -> None:
+        _, value = self._memory.pop(key)
+        self._memory_size -= _value_size(value)
+
+    def _remember(self, key: str, created: float, value: str) -> None:
+        if key in self._memory:
+            self._forget(key)
+        self._memory[key] = (created, value)
+        self._memory_size += _value_size(value)
+        while self._memory and (
+            len(self._memory) > self.memory_entries or self._memory_size > self.memory_bytes
+        ):
+            self._forget(next(iter(self._memory)))
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[1]
+                self._forget(key)
+
+            db = self._db()
+            if db is not None:
+                row = db.execute(
+                    "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    # Vencida: la borra el próximo set()
+                    if not self._expired(created, now):
+                        self._touched[key] = now
+                        self._remember(key, created, value)
+                        self._counters["disk_hits"] += 1
+                        return value
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._counters["stores"] += 1
+            db = self._db()
+            if db is None:
+                return
+            if self._touched:
+                db.executemany(
+                    "UPDATE llm_cache SET accessed = ? WHERE key = ?",
+                    [(accessed, k) for k, accessed in self._touched.items()],
+                )
+                self._touched.clear()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            if self.ttl > 0:
+                db.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.disk_entries,),
+            )
+            # Tope en bytes: de la más reciente a la más vieja, se borra desde la que lo supera
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM (SELECT key, SUM(length(CAST(value AS BLOB)))"
+                " OVER (ORDER BY accessed DESC, rowid DESC) AS total FROM llm_cache) WHERE total > ?)",
+                (self.disk_bytes,),
+            )
+            db.commit()
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._counters["bypass"] += 1
+
+    def record_sampled(self) -> None:
+        with self._lock:
+            self._counters["sampled"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            self._touched.clear()
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            db = self._db()
+            disk_size, disk_bytes = (0, 0) if db is None else db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(CAST(value AS BLOB))), 0) FROM llm_cache"
+            ).fetchone()
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_size": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_size": disk_size,
+                "disk_bytes": disk_bytes,
+                "ttl": self.ttl,
+            }
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache | None:
+    """Cache del proceso, configurado por entorno. None si LLM_CACHE=0."""
+    global _cache
+    if os.environ.get("LLM_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = os.environ.get("LLM_CACHE_PATH")
+            if path is None:
+                disk_path = DEFAULT_CACHE_PATH
+            else:
+                disk_path = Path(path) if path.strip() else None  # "" = solo memoria
+            _cache = LLMCache(
+                path=disk_path,
+                ttl=_env_int("LLM_CACHE_TTL", DEFAULT_TTL),
+                memory_entries=_env_int("LLM_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES),
+                disk_entries=_env_int("LLM_CACHE_DISK_ENTRIES", DEFAULT_DISK_ENTRIES),
+                memory_bytes=_env_bytes("LLM_CACHE_MEMORY_MB", DEFAULT_MEMORY_MB),
+                disk_bytes=_env_bytes("LLM_CACHE_DISK_MB", DEFAULT_DISK_MB),
+            )
+        return _cache
+
+
+def _response_text(response) -> str:
+    return (response.choices[0].message.content or "").strip()
+
+
+def _call_cache(params: dict, use_cache: bool, cache_sampled: bool) -> LLMCache | None:
+    """Cache a usar en esta llamada: None si está apagado, si use_cache=False o si hay sampling."""
+    cache = get_cache()
+    if cache is None:
+        return None
+    if not use_cache:
+        cache.record_bypass()
+        return None
+    if not (cache_sampled or cacheable(params)):
+        cache.record_sampled()
+        return None
+    return cache
+
+
+async def acached_completion(client, *, use_cache: bool = True, cache_sampled: bool = False, **params) -> str:
+    """
+    await client.chat.completions.create(**params) pasando por el cache.
+    Devuelve el texto de la respuesta (strip). use_cache=False fuerza la llamada al modelo;
+    cache_sampled=True cachea aunque la temperature sea mayor a MAX_CACHED_TEMPERATURE.
+    """
+    cache = _call_cache(params, use_cache, cache_sampled)
+    if cache is None:
+        return _response_text(await client.chat.completions.create(**params))
+    key = _client_key(client, params)
+    hit = await asyncio.to_thread(cache.get, key)
+    if hit is not None:
+        return hit
+    text = _response_text(await client.chat.completions.create(**params))
+    if text:
+        await asyncio.to_thread(cache.set, key, text)
+    return text
+
+
+async def astream_completion(
+    client, *, use_cache: bool = True, cache_sampled: bool = False, **params
+) -> AsyncIterator[str]:
+    """
+    Versión streaming de acached_completion: emite los fragmentos de texto a medida que llegan.
+    Comparte entradas con acached_completion (la clave no incluye stream); un hit se emite entero.
+    El texto completo se guarda en el cache al terminar el stream.
+    """
+    cache = _call_cache(params, use_cache, cache_sampled)
+    key = _client_key(client, params)
+    if cache is not None:
+        hit = await asyncio.to_thread(cache.get, key)
+        if hit is not None:
+            yield hit
+            return
+
+    parts = []
+    async for chunk in await client.chat.completions.create(stream=True, **params):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+    text = "".join(parts).strip()
+    if cache is not None and text:
+        await asyncio.to_thread(cache.set, key, text)
@@ -0,0 +1,190 @@
+"""
+Clientes OpenAI compartidos por proveedor: uno sync por proceso y uno AsyncOpenAI por event loop.
+
+Construir un cliente cuesta ~25 ms de CPU (contexto SSL + pool httpx nuevo) y se hacía
+en cada request, dentro del event loop: con cientos de requests concurrentes eso solo
+serializaba segundos. Un cliente compartido reutiliza conexiones (keep-alive) entre requests.
+
+- Proveedores: "openai" (OPENAI_API_KEY, OPENAI_BASE_URL) y "local", cualquier servidor
+  compatible con la API de OpenAI (Ollama, vLLM, llama.cpp) en LLM_LOCAL_BASE_URL. Qué
+  proveedor y modelo usa cada tarea lo decide llm_router.
+- Pool: LLM_MAX_CONNECTIONS conexiones por cliente; las ociosas se mantienen abiertas
+  LLM_KEEPALIVE_SECONDS (httpx las cierra a los 5 s por defecto, y entre requests de un mismo
+  usuario suele pasar más que eso).
+- init_clients() / close_clients() los crean y cierran en el lifespan del server.
+- warm_up() (LLM_WARMUP=1) importa los módulos pesados, compila el schema y abre una
+  conexión al proveedor antes del primer request, para que no pague ese costo un usuario.
+"""
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+import weakref
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_KEEPALIVE_SECONDS = 60.0
+DEFAULT_WARMUP_TIMEOUT = 10.0
+DEFAULT_LOCAL_BASE_URL = "http://localhost:11434/v1"  # Ollama
+CLIENT_PROVIDERS = ("openai", "local")
+# Módulos que el primer request de cada ruta importaría (parseo, generación, render)
+WARMUP_MODULES = (
+    "backend.cv_parser",
+    "backend.cv_enrich",
+    "backend.cv_generator",
+    "backend.match_analyzer",
+    "backend.extractors",
+    "pdfplumber",
+    "docx",
+    "reportlab.platypus",
+)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+_sync_clients: dict = {}
+_sync_client_lock = threading.Lock()
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _limits() -> httpx.Limits:
+    max_connections = max(1, _env_number("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS))
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=_env_number("LLM_KEEPALIVE_SECONDS", DEFAULT_KEEPALIVE_SECONDS, float),
+    )
+
+
+def _client_options(provider: str) -> dict:
+    """api_key/base_url del proveedor. RuntimeError si falta OPENAI_API_KEY."""
+    if provider == "local":
+        return {
+            "api_key": os.environ.get("LLM_LOCAL_API_KEY") or "local",
+            "base_url": os.environ.get("LLM_LOCAL_BASE_URL") or DEFAULT_LOCAL_BASE_URL,
+        }
+    if provider != "openai":
+        raise ValueError(f"Proveedor LLM desconocido: {provider}")
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY no configurada.")
+    return {"api_key": api_key}
+
+
+def _enabled(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _stale(entry, options: dict) -> bool:
+    """El cliente guardado no sirve si se cerró o cambió la key / base URL en el entorno."""
+    return entry is None or entry[0] != options or entry[1].is_closed()
+
+
+def get_sync_client(provider: str = "openai") -> OpenAI:
+    """OpenAI del proceso (rutas sync y CLI). RuntimeError si falta OPENAI_API_KEY."""
+    options = _client_options(provider)
+    with _sync_client_lock:
+        entry = _sync_clients.get(provider)
+        if _stale(entry, options):
+            client = OpenAI(**options, http_client=DefaultHttpxClient(limits=_limits()))
+            entry = _sync_clients[provider] = (options, client)
+        return entry[1]
+
+
+def get_async_client(provider: str = "openai") -> AsyncOpenAI:
+    """AsyncOpenAI del event loop actual. RuntimeError si falta OPENAI_API_KEY."""
+    options = _client_options(provider)
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    entry = clients.get(provider)
+    if _stale(entry, options):
+        client = AsyncOpenAI(**options, http_client=DefaultAsyncHttpxClient(limits=_limits()))
+        entry = clients[provider] = (options, client)
+    return entry[1]
+
+
+def _used_providers() -> list:
+    """Proveedores con cliente (no el stub) que usa alguna tarea y están configurados."""
+    from .llm_router import routes
+
+    providers = {route.provider for route in routes().values()}
+    if not os.environ.get("OPENAI_API_KEY"):
+        providers.discard("openai")
+    return [p for p in CLIENT_PROVIDERS if p in providers]
+
+
+def init_clients() -> None:
+    """Crea los clientes en el arranque del server (sin key no hace nada: fallan en el request)."""
+    for provider in _used_providers():
+        get_async_client(provider)
+        get_sync_client(provider)
+
+
+async def warm_up() -> dict:
+    """
+    Importa WARMUP_MODULES, compila el validador del perfil y abre una conexión al proveedor
+    (GET /models). Devuelve los tiempos por paso; un paso que falla se loguea y no corta el arranque.
+    """
+    timings = {}
+
+    def _imports() -> None:
+        from .structured_output import cv_validator
+
+        for name in WARMUP_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logger.warning("Warm-up: no se pudo importar %s: %s", name, e)
+        cv_validator()
+
+    start = time.perf_counter()
+    await asyncio.to_thread(_imports)
+    timings["imports_s"] = round(time.perf_counter() - start, 3)
+
+    for provider in _used_providers():
+        start = time.perf_counter()
+        try:
+            # Deja una conexión (TLS incluido) en el pool del cliente compartido
+            await get_async_client(provider).with_options(max_retries=0).models.list()
+            timings[f"connect_{provider}_s"] = round(time.perf_counter() - start, 3)
+        except Exception as e:
+            logger.warning("Warm-up: no se pudo conectar al proveedor LLM %s: %s", provider, e)
+    return timings
+
+
+async def startup_warm_up() -> None:
+    """warm_up() si LLM_WARMUP=1, acotado por LLM_WARMUP_TIMEOUT segundos."""
+    if not _enabled("LLM_WARMUP"):
+        return
+    timeout = _env_number("LLM_WARMUP_TIMEOUT", DEFAULT_WARMUP_TIMEOUT, float)
+    try:
+        timings = await asyncio.wait_for(warm_up(), timeout)
+        logger.info("Warm-up LLM: %s", timings)
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up LLM: superó %.1f s, se sigue sin completar", timeout)
+
+
+async def close_async_client() -> None:
+    """Cierra los clientes del event loop actual (shutdown del server o fin de un asyncio.run)."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for _options, client in clients.values():
+        await client.close()
+
+
+async def close_clients() -> None:
+    """Cierra los clientes async del loop actual y los sync del proceso (shutdown del server)."""
+    await close_async_client()
+    with _sync_client_lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for _options, client in clients:
+        client.close()
@@ -0,0 +1,340 @@
+"""
+Router de LLM: qué proveedor y modelo atiende cada tarea, y métricas por ruta.
+
+Tareas: parse (CV → JSON), enrich, summarize (resumen de JD), match, generate (CV adaptado)
+y repair (reparación de JSON de structured_output). Cada una se configura con
+LLM_ROUTE_<TAREA>=proveedor:modelo (ej. LLM_ROUTE_SUMMARIZE=local:llama3.1:8b); solo el
+proveedor usa su modelo por defecto y solo el modelo usa LLM_PROVIDER. Proveedores:
+- "openai": la API de OpenAI (OPENAI_API_KEY). Sin LLM_ROUTE_* los modelos son los de siempre:
+  OPENAI_MODEL para parse/enrich/match/generate y OPENAI_SUMMARY_MODEL para summarize/repair.
+- "local": un servidor compatible con la API de OpenAI (Ollama, vLLM, llama.cpp) en
+  LLM_LOCAL_BASE_URL; modelo por defecto LLM_LOCAL_MODEL.
+- "stub": respuestas deterministas sin red ni tokens (tests, demos, load tests). Cada tarea
+  devuelve un JSON mínimo válido o, en summarize, el comienzo del texto; LLM_STUB_REPLIES
+  apunta a un JSON {tarea: respuesta} para fijar otras.
+
+Los clientes que devuelve el router miden cada llamada al proveedor (latencia, tokens y
+errores) por tarea; los hits del cache de respuestas no llegan al proveedor y no cuentan.
+cached_tokens (usage.prompt_tokens_details) mide cuánto del prompt sirvió el cache de
+prefijos del proveedor: cached_pct es la tasa de acierto sobre los tokens de entrada.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, NamedTuple
+
+from .llm_clients import get_async_client, get_sync_client
+
+TASKS = ("parse", "enrich", "summarize", "match", "generate", "repair")
+PROVIDERS = ("openai", "local", "stub")
+# Modelo de OpenAI por tarea: (variable de entorno, default)
+OPENAI_MODELS = {
+    "parse": ("OPENAI_MODEL", "gpt-4o"),
+    "enrich": ("OPENAI_MODEL", "gpt-4o"),
+    "match": ("OPENAI_MODEL", "gpt-4o"),
+    "generate": ("OPENAI_MODEL", "gpt-5.2"),
+    "summarize": ("OPENAI_SUMMARY_MODEL", "gpt-4o"),
+    "repair": ("OPENAI_SUMMARY_MODEL", "gpt-4o-mini"),
+}
+DEFAULT_LOCAL_MODEL = "llama3.1"
+STUB_MODEL = "stub"
+STUB_SUMMARY_CHARS = 600
+STUB_REPLIES = {
+    "parse": {},
+    "enrich": {},
+    "match": {
+        "score": 50,
+        "seniority_detected": "match",
+        "reasons_for": [],
+        "reasons_against": [],
+        "recommendation": "postularse_con_reservas",
+    },
+    "generate": {
+        "headline": "",
+        "experience": [],
+        "education": [],
+        "skills_technical": [],
+        "skills_soft": [],
+        "languages": [],
+    },
+    "repair": {"fragments": []},
+}
+
+
+class Route(NamedTuple):
+    task: str
+    provider: str
+    model: str
+
+    @property
+    def label(self) -> str:
+        """provider:model (solo el modelo para openai, como en las claves de cache previas)."""
+        return self.model if self.provider == "openai" else f"{self.provider}:{self.model}"
+
+
+def _default_provider() -> str:
+    provider = os.environ.get("LLM_PROVIDER", "openai").strip().lower() or "openai"
+    if provider not in PROVIDERS:
+        raise ValueError(f"LLM_PROVIDER desconocido: {provider}. Use {', '.join(PROVIDERS)}")
+    return provider
+
+
+def _default_model(task: str, provider: str) -> str:
+    if provider == "stub":
+        return STUB_MODEL
+    if provider == "local":
+        return os.environ.get("LLM_LOCAL_MODEL") or DEFAULT_LOCAL_MODEL
+    env, default = OPENAI_MODELS[task]
+    return os.environ.get(env, default)
+
+
+def get_route(task: str) -> Route:
+    """Proveedor y modelo de la tarea según LLM_ROUTE_<TAREA> / LLM_PROVIDER."""
+    if task not in TASKS:
+        raise ValueError(f"Tarea LLM desconocida: {task}")
+    spec = os.environ.get(f"LLM_ROUTE_{task.upper()}", "").strip()
+    provider, _, model = spec.partition(":")
+    if provider.lower() not in PROVIDERS:
+        # Solo el modelo (los de Ollama llevan ":" en el tag, ej. llama3.1:8b)
+        provider, model = _default_provider(), spec
+    provider = provider.lower()
+    return Route(task, provider, model.strip() or _default_model(task, provider))
+
+
+def routes() -> Dict[str, Route]:
+    return {task: get_route(task) for task in TASKS}
+
+
+def task_available(task: str) -> bool:
+    """False si la tarea va a OpenAI y falta OPENAI_API_KEY (local y stub no necesitan key)."""
+    return get_route(task).provider != "openai" or bool(os.environ.get("OPENAI_API_KEY"))
+
+
+# --- Métricas por ruta ---
+
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, dict] = {}
+
+
+def _record(route: Route, seconds: float, usage=None, error: bool = False) -> None:
+    with _metrics_lock:
+        m = _metrics.setdefault(route.task, {})
+        m = m.setdefault(route.label, {
+            "provider": route.provider,
+            "model": route.model,
+            "calls": 0,
+            "errors": 0,
+            "total_s": 0.0,
+            "max_s": 0.0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "cache_hit_calls": 0,
+            "completion_tokens": 0,
+        })
+        m["calls"] += 1
+        m["errors"] += int(error)
+        m["total_s"] += seconds
+        m["max_s"] = max(m["max_s"], seconds)
+        if usage is not None:
+            m["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+            m["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", 0) or 0
+            m["cached_tokens"] += cached
+            m["cache_hit_calls"] += int(cached > 0)
+
+
+def router_stats() -> dict:
+    """Rutas configuradas y, por tarea y modelo: llamadas, errores, latencia, tokens y prefijos cacheados."""
+    with _metrics_lock:
+        metrics = {
+            task: {
+                label: {
+                    **m,
+                    "total_s": round(m["total_s"], 3),
+                    "max_s": round(m["max_s"], 3),
+                    "avg_s": round(m["total_s"] / m["calls"], 3) if m["calls"] else None,
+                    "cached_pct": round(100 * m["cached_tokens"] / m["prompt_tokens"], 1)
+                    if m["prompt_tokens"] else None,
+                }
+                for label, m in by_model.items()
+            }
+            for task, by_model in _metrics.items()
+        }
+    return {"routes": {task: route._asdict() for task, route in routes().items()}, "metrics": metrics}
+
+
+def reset_router_stats() -> None:
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# --- Backend stub ---
+
+
+def _stub_replies() -> dict:
+    path = os.environ.get("LLM_STUB_REPLIES", "").strip()
+    if not path:
+        return STUB_REPLIES
+    with open(path, "r", encoding="utf-8") as f:
+        return {**STUB_REPLIES, **json.load(f)}
+
+
+def _stub_text(task: str, params: dict) -> str:
+    """Respuesta determinista: la fija de la tarea o, en summarize, el comienzo del texto."""
+    reply = _stub_replies().get(task)
+    if reply is not None:
+        return reply if isinstance(reply, str) else json.dumps(reply, ensure_ascii=False)
+    users = [m.get("content") or "" for m in params.get("messages") or [] if m.get("role") == "user"]
+    user = users[-1] if users else ""
+    _, _, body = user.partition("\n\n")
+    return (body or user)[:STUB_SUMMARY_CHARS].strip()
+
+
+def _stub_response(task: str, params: dict) -> SimpleNamespace:
+    text = _stub_text(task, params)
+    prompt = json.dumps(params.get("messages") or [], ensure_ascii=False)
+    usage = SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(text) // 4)
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+    return SimpleNamespace(
+        id=f"stub-{digest}",
+        model=STUB_MODEL,
+        choices=[
+            SimpleNamespace(
+                index=0, message=SimpleNamespace(role="assistant", content=text), finish_reason="stop"
+            )
+        ],
+        usage=usage,
+    )
+
+
+def _stub_chunks(response: SimpleNamespace) -> list:
+    text = response.choices[0].message.content
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=text[i : i + 40]))])
+        for i in range(0, len(text), 40)
+    ]
+    # Último chunk sin choices con el uso de tokens, como OpenAI con stream_options.include_usage
+    return chunks + [SimpleNamespace(choices=[], usage=response.usage)]
+
+
+class _StubCompletions:
+    def __init__(self, task: str):
+        self.task = task
+
+    def create(self, stream: bool = False, **params):
+        response = _stub_response(self.task, params)
+        return iter(_stub_chunks(response)) if stream else response
+
+
+class _AsyncStubCompletions(_StubCompletions):
+    async def create(self, stream: bool = False, **params):
+        response = _stub_response(self.task, params)
+        if not stream:
+            return response
+
+        async def chunks():
+            for chunk in _stub_chunks(response):
+                yield chunk
+
+        return chunks()
+
+
+# --- Clientes por tarea ---
+
+
+def _stream_params(route: Route, params: dict) -> dict:
+    # OpenAI manda el uso de tokens del stream solo si se pide (en un último chunk sin choices)
+    if params.get("stream") and route.provider == "openai" and "stream_options" not in params:
+        return {**params, "stream_options": {"include_usage": True}}
+    return params
+
+
+class _RoutedCompletions:
+    """chat.completions.create del proveedor de la ruta, midiendo latencia, tokens y errores."""
+
+    def __init__(self, route: Route, completions):
+        self.route = route
+        self._completions = completions
+
+    def create(self, **params):
+        start = time.perf_counter()
+        try:
+            result = self._completions.create(**_stream_params(self.route, params))
+        except Exception:
+            _record(self.route, time.perf_counter() - start, error=True)
+            raise
+        if not params.get("stream"):
+            _record(self.route, time.perf_counter() - start, result.usage)
+            return result
+        return self._measure_stream(result, start)
+
+    def _measure_stream(self, stream, start: float):
+        usage, error = None, True
+        try:
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+            error = False
+        finally:
+            _record(self.route, time.perf_counter() - start, usage, error=error)
+
+
+class _AsyncRoutedCompletions(_RoutedCompletions):
+    async def create(self, **params):
+        start = time.perf_counter()
+        try:
+            result = await self._completions.create(**_stream_params(self.route, params))
+        except Exception:
+            _record(self.route, time.perf_counter() - start, error=True)
+            raise
+        if not params.get("stream"):
+            _record(self.route, time.perf_counter() - start, result.usage)
+            return result
+        return self._measure_stream(result, start)
+
+    async def _measure_stream(self, stream, start: float):
+        usage, error = None, True
+        try:
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+            error = False
+        finally:
+            _record(self.route, time.perf_counter() - start, usage, error=error)
+
+
+class RoutedClient:
+    """
+    Cliente de una tarea con la interfaz que usan llm_cache y structured_output
+    (chat.completions.create). cache_namespace separa en el cache de respuestas los modelos
+    de otros proveedores que se llamen igual que uno de OpenAI.
+    """
+
+    def __init__(self, route: Route, completions: _RoutedCompletions):
+        self.route = route
+        self.cache_namespace = "" if route.provider == "openai" else route.provider
+        self.chat = SimpleNamespace(completions=completions)
+
+
+def get_task_client(task: str) -> RoutedClient:
+    """Cliente sync de la tarea. RuntimeError si va a OpenAI y falta OPENAI_API_KEY."""
+    route = get_route(task)
+    if route.provider == "stub":
+        inner = _StubCompletions(task)
+    else:
+        inner = get_sync_client(route.provider).chat.completions
+    return RoutedClient(route, _RoutedCompletions(route, inner))
+
+
+def get_async_task_client(task: str) -> RoutedClient:
+    """Cliente async de la tarea (event loop actual). RuntimeError si falta OPENAI_API_KEY."""
+    route = get_route(task)
+    if route.provider == "stub":
+        inner = _AsyncStubCompletions(task)
+    else:
+        inner = get_async_client(route.provider).chat.completions
+    return RoutedClient(route, _AsyncRoutedCompletions(route, inner))
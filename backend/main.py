@@ -1,26 +1,49 @@
 """
 API: perfil CV, adapt por URL, CV Parser (archivo → JSON) y CV Generator (JSON + JD → PDF/DOCX).
 """
+import asyncio
 import json
-import tempfile
+import os
+import time
+from contextlib import asynccontextmanager
 from datetime import date, datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, Header, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 load_dotenv()
 
-# Ruta al repo (asumiendo que se corre desde raíz: uvicorn backend.main:app)
-ROOT = Path(__file__).resolve().parent.parent
-PROFILE_PATH = ROOT / "data" / "profile.json"
 CV_OUTPUT_DIR = Path(__file__).resolve().parent / "generated_cvs"
 CV_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title="CV Factory")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Con el backend docx2pdf, los workers de conversión se arrancan antes del primer request
+    if os.environ.get("CV_PDF_BACKEND", "native").strip().lower() == "docx2pdf":
+        from .convert_pool import get_converter_pool
+
+        get_converter_pool()
+    from .llm_clients import close_clients, init_clients, startup_warm_up
+
+    # Clientes LLM compartidos por todo el proceso; con LLM_WARMUP=1 el primer request ya
+    # encuentra los módulos importados y una conexión abierta
+    init_clients()
+    await startup_warm_up()
+    yield
+    from .convert_pool import shutdown_converter_pool
+    from .http_fetch import close_http_client
+
+    shutdown_converter_pool()
+    await close_http_client()
+    await close_clients()
+
+
+app = FastAPI(title="CV Factory", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
@@ -29,12 +52,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Último JD obtenido por /api/jd/summary (para paso 3: generar CV sin reenviar URL)
-_last_jd_raw_text: str | None = None
+# Los JDs obtenidos en /api/jd/summary se guardan en jd_store (por jd_id y por sesión),
+# así el paso 3 puede generar el CV sin reenviar la URL. La sesión viaja en X-Session-Id.
 
 
 class AdaptRequest(BaseModel):
-    job_url: str | None = None  # si no se envía, se usa el último JD obtenido en /api/jd/summary
+    job_url: str | None = None  # si no se envía, se usa jd_id o el último JD de la sesión
+    jd_id: str | None = None  # devuelto por /api/jd/summary
     language: str = "es"  # "es" | "en" — idioma del CV generado
 
 
@@ -55,16 +79,53 @@ class EnrichRequest(BaseModel):
 
 class MatchRequest(BaseModel):
     profile: dict
-    jd: str | None = None  # si no se envía, se usa el último JD cargado en /api/jd/summary
+    jd: str | None = None  # si no se envía, se usa jd_id o el último JD de la sesión
+    jd_id: str | None = None  # devuelto por /api/jd/summary
+    min_local_score: float | None = None  # corte del pre-match local (default PREMATCH_MIN_SCORE)
 
 
-@app.get("/api/profile")
-def get_profile():
-    """Devuelve el CV parametrizado (solo lectura desde JSON)."""
-    if not PROFILE_PATH.exists():
+class BatchMatchItem(BaseModel):
+    id: str | None = None  # identificador libre del cliente, se devuelve en cada resultado
+    jd_text: str | None = None
+    job_url: str | None = None  # se usa si no se envía jd_text
+
+
+class BatchMatchRequest(BaseModel):
+    profile: dict
+    items: list[BatchMatchItem]
+    concurrency: int | None = None  # por defecto MATCH_BATCH_CONCURRENCY (4)
+    min_local_score: float | None = None  # JDs con score local menor se descartan sin LLM
+
+
+MATCH_BATCH_MAX_ITEMS = int(os.environ.get("MATCH_BATCH_MAX_ITEMS", "500"))
+
+
+def _sse(event: str, data: dict) -> str:
+    """Serializa un evento Server-Sent Events."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _load_profile():
+    """Snapshot del perfil guardado (cacheado en memoria) o 404."""
+    from .profile_store import get_profile_store
+
+    snapshot = get_profile_store().load()
+    if snapshot is None:
         raise HTTPException(status_code=404, detail="data/profile.json no encontrado")
-    with open(PROFILE_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return snapshot
+
+
+@app.get("/api/profile")
+def get_profile(if_none_match: str | None = Header(None)):
+    """
+    Devuelve el CV parametrizado (solo lectura desde JSON).
+    Responde con ETag; si If-None-Match coincide devuelve 304 sin cuerpo.
+    """
+    snapshot = _load_profile()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match and snapshot.etag in {t.strip() for t in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.raw, media_type="application/json", headers=headers)
 
 
 @app.put("/api/profile")
@@ -78,64 +139,165 @@ def save_profile(profile: dict):
             status_code=400,
             detail="El perfil debe ser un objeto con al menos la clave 'personal'.",
         )
-    PROFILE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(PROFILE_PATH, "w", encoding="utf-8") as f:
-        json.dump(profile, f, ensure_ascii=False, indent=2)
-    return {"ok": True, "message": "Perfil guardado en data/profile.json"}
+    from .profile_store import get_profile_store
+
+    snapshot = get_profile_store().save(profile)
+    return {"ok": True, "message": "Perfil guardado en data/profile.json", "etag": snapshot.etag}
+
+
+async def _store_jd(request: JdSummaryRequest, session_id: str | None) -> tuple[str, str, dict | None]:
+    """
+    Resuelve el texto crudo de la JD, lo guarda en el store y devuelve
+    (jd_id, raw_text, posting); posting es el JobPosting JSON-LD de la página, si lo hay.
+    """
+    from .jd_store import get_jd_store
+
+    raw_text, posting = await _resolve_jd_raw_text(request)
+    source_url = None if request.jd_text and request.jd_text.strip() else request.job_url.strip()
+    jd_id = await asyncio.to_thread(
+        get_jd_store().put, raw_text, session_id, source_url=source_url, posting=posting
+    )
+    return jd_id, raw_text, posting
+
+
+def _stored_match(record: dict, profile: dict) -> dict | None:
+    """Reporte de /api/cv/match guardado para este JD, si se calculó con este mismo perfil."""
+    from .jd_store import profile_key
+
+    match = record.get("match") or {}
+    return match.get("report") if match.get("profile") == profile_key(profile) else None
+
+
+async def _stored_jd(jd_id: str | None, session_id: str | None) -> dict | None:
+    """JD guardado: por jd_id si se envía, si no el último de la sesión."""
+    from .jd_store import get_jd_store
+
+    store = get_jd_store()
+    if jd_id:
+        record = await asyncio.to_thread(store.get, jd_id)
+        if record is None:
+            raise HTTPException(
+                status_code=404,
+                detail="jd_id no encontrado (expiró o nunca se cargó). Volvé a correr el paso 2.",
+            )
+        return record
+    return await asyncio.to_thread(store.last_for_session, session_id)
 
 
 @app.post("/api/jd/summary")
-def jd_summary(request: JdSummaryRequest):
+async def jd_summary(
+    request: JdSummaryRequest,
+    x_session_id: str | None = Header(None, alias="X-Session-Id"),
+):
     """
     Paso 2: resumen de la oferta.
     - Si envías jd_text: se usa ese texto (pegado) y se resume. Ideal cuando el link no carga (SPA/Oracle, etc.).
-    - Si envías job_url: se obtiene el contenido desde la URL y se resume.
-    Guarda el texto crudo para el paso 3 (Generar CV).
+    - Si envías job_url: se obtiene el contenido desde la URL y se resume. Si la página trae
+      un JobPosting JSON-LD, el resumen se arma de sus campos sin llamar al LLM (structured=true).
+    Guarda el texto crudo (y el resumen) para el paso 3 bajo jd_id y como último JD de la sesión.
+    """
+    from .jd_store import get_jd_store
+    from .job_posting import summarize_posting
+    from .services import summarize_jd_async
+
+    jd_id, raw_text, posting = await _store_jd(request, x_session_id)
+    if posting is not None:
+        summary = summarize_posting(posting)
+    else:
+        try:
+            summary = await summarize_jd_async(raw_text)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error al resumir la oferta: {str(e)}",
+            )
+    await asyncio.to_thread(get_jd_store().update, jd_id, summary=summary)
+    return {"jd_summary": summary, "jd_id": jd_id, "structured": posting is not None}
+
+
+@app.post("/api/jd/summary/stream")
+async def jd_summary_stream(
+    request: JdSummaryRequest,
+    x_session_id: str | None = Header(None, alias="X-Session-Id"),
+):
+    """
+    Paso 2 en streaming: igual que /api/jd/summary pero el resumen llega por
+    Server-Sent Events a medida que el modelo lo genera.
+    Eventos: chunk {"text"} por fragmento, done {"jd_summary", "jd_id", "structured"} con el
+    texto completo (que queda guardado para el paso 3), error {"status", "detail"}.
+    Con un JobPosting JSON-LD el resumen sale en un solo chunk, sin LLM.
+    """
+    from .jd_store import get_jd_store
+    from .job_posting import summarize_posting
+    from .services import summarize_jd_stream_async
+
+    jd_id, raw_text, posting = await _store_jd(request, x_session_id)
+
+    async def structured():
+        yield summarize_posting(posting)
+
+    async def events():
+        parts = []
+        chunks = structured() if posting is not None else summarize_jd_stream_async(raw_text)
+        try:
+            async for text in chunks:
+                parts.append(text)
+                yield _sse("chunk", {"text": text})
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Error al resumir la oferta: {str(e)}"})
+            return
+        summary = "".join(parts).strip()
+        await asyncio.to_thread(get_jd_store().update, jd_id, summary=summary)
+        yield _sse("done", {"jd_summary": summary, "jd_id": jd_id, "structured": posting is not None})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _resolve_jd_raw_text(request: JdSummaryRequest) -> tuple[str, dict | None]:
+    """
+    Texto crudo de la JD: jd_text pegado o, si no, el contenido de job_url.
+    Devuelve (raw_text, posting); posting solo existe para URLs con JobPosting JSON-LD.
     """
-    global _last_jd_raw_text
-    from .services import fetch_job_content, summarize_jd
+    from .services import fetch_job_async
 
-    raw_text: str
     if request.jd_text and request.jd_text.strip():
-        raw_text = request.jd_text.strip()
-    elif request.job_url and request.job_url.strip():
+        return request.jd_text.strip(), None
+    if request.job_url and request.job_url.strip():
         try:
-            raw_text = fetch_job_content(request.job_url.strip())
+            return await fetch_job_async(request.job_url.strip())
         except Exception as e:
             raise HTTPException(
                 status_code=422,
                 detail=f"No se pudo obtener la oferta desde la URL: {str(e)}",
             )
-    else:
-        raise HTTPException(
-            status_code=400,
-            detail="Enviá job_url o jd_text (descripción pegada).",
-        )
-
-    _last_jd_raw_text = raw_text
-    try:
-        summary = summarize_jd(raw_text)
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error al resumir la oferta: {str(e)}",
-        )
-    return {"jd_summary": summary}
+    raise HTTPException(
+        status_code=400,
+        detail="Enviá job_url o jd_text (descripción pegada).",
+    )
 
 
 @app.post("/api/cv/match")
-def cv_match(request: MatchRequest):
+async def cv_match(
+    request: MatchRequest,
+    x_session_id: str | None = Header(None, alias="X-Session-Id"),
+):
     """
     Tool 3 — Match Analyzer.
     Evalúa el match entre un perfil y una JD antes de generar el CV.
+    JD: 'jd' explícita, si no el jd_id del paso 2, si no el último JD de la sesión.
+    Si la JD está en el store, el reporte queda guardado junto a ella para el paso 3.
     """
-    global _last_jd_raw_text
-    from .match_analyzer import analyze_match
+    from .jd_store import get_jd_store, jd_hash, profile_key
+    from .match_analyzer import analyze_match_async
 
     jd_text = (request.jd or "").strip()
     if not jd_text:
-        # Si no se envía JD explícita, usamos la última JD cruda obtenida en el paso 2.
-        if not _last_jd_raw_text:
+        record = await _stored_jd(request.jd_id, x_session_id)
+        if not record:
             raise HTTPException(
                 status_code=400,
                 detail=(
@@ -143,56 +305,120 @@ def cv_match(request: MatchRequest):
                     "el resumen de la posición (paso 2)."
                 ),
             )
-        jd_text = _last_jd_raw_text
+        jd_text = record["raw_text"]
 
     try:
-        report = analyze_match(request.profile, jd_text)
+        report = await analyze_match_async(request.profile, jd_text, min_score=request.min_local_score)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error al analizar el match perfil/JD: {str(e)}"
         )
+    match = {"profile": profile_key(request.profile), "report": report}
+    await asyncio.to_thread(get_jd_store().update, jd_hash(jd_text), match=match)
     return report
 
 
+@app.post("/api/cv/match/batch")
+async def cv_match_batch(request: BatchMatchRequest):
+    """
+    Match Analyzer en batch: un perfil contra muchas JDs (texto o URL).
+    Responde NDJSON en streaming: una línea por JD apenas termina su análisis
+    ({"index", "id", "ok", "report" | "error"}) y una línea final {"done": true, ...}.
+    Los errores de un item no abortan el batch.
+    """
+    from .match_analyzer import analyze_match_batch
+
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Enviá al menos un item en 'items'.")
+    if len(request.items) > MATCH_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo {MATCH_BATCH_MAX_ITEMS} items por batch.",
+        )
+
+    items = [item.model_dump() for item in request.items]
+
+    async def ndjson():
+        ok = errors = skipped = 0
+        async for result in analyze_match_batch(
+            request.profile,
+            items,
+            concurrency=request.concurrency,
+            min_score=request.min_local_score,
+        ):
+            if result["ok"]:
+                ok += 1
+                skipped += bool(result["report"].get("llm_skipped"))
+            else:
+                errors += 1
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        yield json.dumps(
+            {"done": True, "total": len(items), "ok": ok, "errors": errors, "llm_skipped": skipped}
+        ) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @app.post("/api/adapt")
-def adapt_cv(request: AdaptRequest):
+async def adapt_cv(
+    request: AdaptRequest,
+    x_session_id: str | None = Header(None, alias="X-Session-Id"),
+    force: bool = False,
+):
     """
     Paso 3 (o todo en uno): genera CV adaptado.
     - Si envías job_url: obtiene JD, genera CV y devuelve también resumen + archivos.
-    - Si no envías job_url: usa el último JD obtenido con POST /api/jd/summary (paso 2).
+    - Si no envías job_url: usa jd_id o el último JD de la sesión (POST /api/jd/summary, paso 2).
+    El resumen del paso 2 y el match (si se calculó con este perfil) se reutilizan del store;
+    si no hay resumen guardado, se pide al LLM en paralelo con la generación del CV.
+    ?force=true saltea el cache de respuestas del LLM (el resumen y el match guardados se reutilizan igual).
     Descarga: GET /api/cv/download/{filename}
     """
-    global _last_jd_raw_text
     if request.language not in ("es", "en"):
         raise HTTPException(status_code=400, detail="language debe ser 'es' o 'en'")
 
-    if not PROFILE_PATH.exists():
-        raise HTTPException(status_code=404, detail="data/profile.json no encontrado")
-
-    with open(PROFILE_PATH, "r", encoding="utf-8") as f:
-        profile = json.load(f)
+    profile = (await asyncio.to_thread(_load_profile)).profile
 
-    from .services import fetch_job_content, summarize_jd
-    from .cv_generator import generate_cv_pdf_and_docx
+    from .jd_store import get_jd_store
+    from .job_posting import summarize_posting
+    from .services import fetch_job_async, summarize_jd_async
+    from .cv_generator import generate_cv_pdf_and_docx_async
 
+    store = get_jd_store()
     if request.job_url:
-        raw_text = fetch_job_content(request.job_url)
-        _last_jd_raw_text = raw_text
+        raw_text, posting = await fetch_job_async(request.job_url)
+        # El mismo texto ya resumido en el paso 2 conserva su summary y su match
+        jd_id = await asyncio.to_thread(
+            store.put, raw_text, x_session_id, source_url=request.job_url, posting=posting
+        )
+        record = await asyncio.to_thread(store.get, jd_id) or {}
     else:
-        raw_text = _last_jd_raw_text
-        if not raw_text:
+        record = await _stored_jd(request.jd_id, x_session_id)
+        if not record:
             raise HTTPException(
                 status_code=400,
                 detail="Primero obtené el resumen de la oferta (paso 2) o enviá job_url.",
             )
-
-    jd_summary = summarize_jd(raw_text)
-    pdf_name, docx_name = generate_cv_pdf_and_docx(
-        profile, raw_text, language=request.language
+        jd_id, raw_text = record["jd_id"], record["raw_text"]
+        posting = record.get("posting")
+
+    jd_summary = record.get("summary")
+    if not jd_summary and posting is not None:
+        jd_summary = summarize_posting(posting)
+    generate = generate_cv_pdf_and_docx_async(
+        profile, raw_text, language=request.language, use_cache=not force
     )
+    if jd_summary:
+        pdf_name, docx_name = await generate
+    else:
+        jd_summary, (pdf_name, docx_name) = await asyncio.gather(
+            summarize_jd_async(raw_text, use_cache=not force), generate
+        )
+        await asyncio.to_thread(store.update, jd_id, summary=jd_summary)
 
     return {
         "jd_summary": jd_summary,
+        "match": _stored_match(record, profile),
         "pdf_filename": pdf_name,
         "docx_filename": docx_name,
     }
@@ -203,42 +429,124 @@ def adapt_cv(request: AdaptRequest):
 ALLOWED_CV_EXTENSIONS = {".pdf", ".docx", ".txt"}
 
 
-@app.post("/api/cv/parse")
-async def cv_parse(file: UploadFile = File(...)):
-    """
-    Tool 1 — CV Parser: subís PDF, DOCX o TXT y recibís el JSON estructurado.
-    Revisalo y guardalo antes de usar en el Generator.
-    """
+def _stamp_metadata(result: dict) -> None:
+    """Asegura metadata.version y metadata.lastUpdated en un perfil recién parseado."""
+    if "metadata" not in result:
+        result["metadata"] = {}
+    result["metadata"]["version"] = "1.0"
+    result["metadata"]["lastUpdated"] = date.today().isoformat()
+
+
+# Uploads de CV: se leen en bloques con tope de tamaño y se extraen desde memoria (sin archivo
+# temporal). Starlette ya guarda la parte del multipart en un SpooledTemporaryFile (en memoria
+# hasta 1 MB); el tope corta antes de copiar un archivo enorme.
+UPLOAD_CHUNK = 64 * 1024
+DEFAULT_MAX_UPLOAD_MB = 10
+
+
+def _max_upload_bytes() -> int:
+    try:
+        return int(float(os.environ.get("CV_MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB)) * 1024 * 1024)
+    except ValueError:
+        return DEFAULT_MAX_UPLOAD_MB * 1024 * 1024
+
+
+async def _read_cv_upload(file: UploadFile) -> bytearray:
+    """Valida la extensión y lee el archivo en bloques. 400 si el formato no va, 413 si supera CV_MAX_UPLOAD_MB."""
     suffix = Path(file.filename or "").suffix.lower()
     if suffix not in ALLOWED_CV_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Formato no soportado. Use: {', '.join(ALLOWED_CV_EXTENSIONS)}",
         )
+    limit = _max_upload_bytes()
+    too_large = HTTPException(
+        status_code=413, detail=f"El archivo supera el máximo de {limit / (1024 * 1024):.3g} MB."
+    )
+    if file.size is not None and file.size > limit:
+        raise too_large
+    contents = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK):
+        contents += chunk
+        if len(contents) > limit:
+            raise too_large
+    return contents
+
+
+async def _extract_cv_upload(contents: bytearray, filename: str | None) -> str:
+    """Texto del CV desde los bytes del upload, en un thread (pdfplumber/python-docx son CPU)."""
+    from starlette.concurrency import run_in_threadpool
+    from .extractors import extract_cv_text
+
+    return await run_in_threadpool(extract_cv_text, contents, filename)
+
+
+async def _cv_upload(file: UploadFile, force: bool) -> tuple[bytearray, str]:
+    """Bytes del upload y su hash (clave del cache de uploads). force=true se cuenta en las stats."""
+    from .upload_cache import get_upload_cache, upload_hash
+
+    contents = await _read_cv_upload(file)
+    cache = get_upload_cache()
+    if force and cache is not None:
+        cache.record_forced()
+    return contents, await asyncio.to_thread(upload_hash, contents)
+
+
+async def _cached_upload(digest: str, stage: str, force: bool):
+    """Resultado cacheado de una etapa del upload; None si no está, si force o si el cache está apagado."""
+    from .upload_cache import get_upload_cache
+
+    cache = get_upload_cache()
+    if cache is None or force:
+        return None
+    return await asyncio.to_thread(cache.get, digest, stage)
+
+
+async def _store_upload(digest: str, stage: str, value) -> None:
+    from .upload_cache import get_upload_cache
+
+    cache = get_upload_cache()
+    if cache is not None:
+        await asyncio.to_thread(cache.set, digest, stage, value)
+
+
+async def _cv_upload_text(contents: bytearray, filename: str | None, digest: str, force: bool) -> str:
+    """Texto del CV subido (cacheado por hash del archivo). 400 si no se pudo extraer texto."""
+    text = await _cached_upload(digest, "text", force)
+    if text is None:
+        text = await _extract_cv_upload(contents, filename)
+        if text.strip():
+            await _store_upload(digest, "text", text)
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="No se pudo extraer texto del archivo.")
+    return text
+
+
+async def _parse_cv_upload(text: str, digest: str, force: bool) -> dict:
+    """Parsea el texto con el LLM, guarda el perfil en el cache de uploads y estampa metadata."""
+    from .cv_parser import parse_cv_to_json_async
+
+    result = await parse_cv_to_json_async(text, use_cache=not force)
+    await _store_upload(digest, "parsed", result)
+    _stamp_metadata(result)
+    return result
+
+
+@app.post("/api/cv/parse")
+async def cv_parse(file: UploadFile = File(...), force: bool = False):
+    """
+    Tool 1 — CV Parser: subís PDF, DOCX o TXT y recibís el JSON estructurado.
+    Revisalo y guardalo antes de usar en el Generator.
+    El mismo archivo (mismo hash) se responde desde el cache de uploads; ?force=true lo rehace.
+    """
     try:
-        contents = await file.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(contents)
-            tmp_path = Path(tmp.name)
-        try:
-            from .extractors import extract_cv_text
-            from .cv_parser import parse_cv_to_json
-
-            text = extract_cv_text(tmp_path)
-            if not text.strip():
-                raise HTTPException(status_code=400, detail="No se pudo extraer texto del archivo.")
-            result = parse_cv_to_json(text)
-            # Asegurar metadata
-            if "metadata" not in result:
-                result["metadata"] = {}
-            result["metadata"]["version"] = "1.0"
-            result["metadata"]["lastUpdated"] = date.today().isoformat()
+        contents, digest = await _cv_upload(file, force)
+        result = await _cached_upload(digest, "parsed", force)
+        if result is not None:
+            _stamp_metadata(result)
             return result
-        finally:
-            try:
-                tmp_path.unlink()
-            except OSError:
-                pass
+        text = await _cv_upload_text(contents, file.filename, digest, force)
+        return await _parse_cv_upload(text, digest, force)
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
@@ -248,7 +556,7 @@ async def cv_parse(file: UploadFile = File(...)):
 # --- Enrich ---
 
 @app.post("/api/cv/enrich")
-def cv_enrich(request: EnrichRequest):
+async def cv_enrich(request: EnrichRequest):
     """
     Enriquece el perfil: completa facts, capabilities, technologies,
     leadershipSignals, relevanceTags por experiencia y constraints/strategy.
@@ -257,8 +565,8 @@ def cv_enrich(request: EnrichRequest):
     if not isinstance(request.profile, dict) or "personal" not in request.profile:
         raise HTTPException(status_code=400, detail="El perfil debe tener al menos 'personal'.")
     try:
-        from .cv_enrich import enrich_profile, normalize_profile
-        enriched = enrich_profile(request.profile)
+        from .cv_enrich import enrich_profile_async, normalize_profile
+        enriched = await enrich_profile_async(request.profile)
         normalize_profile(enriched)
         return {"profile": enriched}
     except RuntimeError as e:
@@ -266,64 +574,112 @@ def cv_enrich(request: EnrichRequest):
 
 
 @app.post("/api/cv/parse-and-enrich")
-async def cv_parse_and_enrich(file: UploadFile = File(...)):
+async def cv_parse_and_enrich(file: UploadFile = File(...), force: bool = False):
     """
     Subís el CV (PDF/DOCX/TXT): se parsea y se enriquece en un solo paso.
     Devuelve el perfil listo para revisar y guardar.
+    El mismo archivo (mismo hash) se responde desde el cache de uploads; ?force=true lo rehace.
     """
-    suffix = Path(file.filename or "").suffix.lower()
-    if suffix not in ALLOWED_CV_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Formato no soportado. Use: {', '.join(ALLOWED_CV_EXTENSIONS)}",
-        )
     try:
-        contents = await file.read()
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(contents)
-            tmp_path = Path(tmp.name)
-        try:
-            from .extractors import extract_cv_text
-            from .cv_parser import parse_cv_to_json
-            from .cv_enrich import enrich_profile, normalize_profile
-
-            text = extract_cv_text(tmp_path)
-            if not text.strip():
-                raise HTTPException(status_code=400, detail="No se pudo extraer texto del archivo.")
-            result = parse_cv_to_json(text)
-            if "metadata" not in result:
-                result["metadata"] = {}
-            result["metadata"]["version"] = "1.0"
-            result["metadata"]["lastUpdated"] = date.today().isoformat()
-            result = enrich_profile(result)
+        from .cv_enrich import enrich_profile_async, normalize_profile
+
+        contents, digest = await _cv_upload(file, force)
+        result = await _cached_upload(digest, "enriched", force)
+        if result is None:
+            result = await _cached_upload(digest, "parsed", force)
+            if result is None:
+                text = await _cv_upload_text(contents, file.filename, digest, force)
+                result = await _parse_cv_upload(text, digest, force)
+            result = await enrich_profile_async(result, use_cache=not force)
             normalize_profile(result)
-            return result
-        finally:
-            try:
-                tmp_path.unlink()
-            except OSError:
-                pass
+            await _store_upload(digest, "enriched", result)
+        _stamp_metadata(result)
+        return result
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/api/cv/parse-and-enrich/stream")
+async def cv_parse_and_enrich_stream(file: UploadFile = File(...), force: bool = False):
+    """
+    Igual que /api/cv/parse-and-enrich pero con progreso por Server-Sent Events.
+    Eventos (data en JSON, todos con elapsed_ms desde el inicio):
+    - extracted: {"chars"}
+    - parsed: {"profile", "cached"} perfil parseado, todavía sin enriquecer
+    - experience: {"index", "ok", "experience"} cada experiencia apenas se enriquece
+    - strategy: {"ok", "strategy"}
+    - done: {"profile", "cached"} perfil final, listo para revisar y guardar
+    - error: {"status", "detail"} (termina el stream)
+    Si el archivo ya se había enriquecido (cache de uploads) se emiten solo parsed y done con
+    cached=true; ?force=true lo rehace.
+    """
+    contents, digest = await _cv_upload(file, force)
+    filename = file.filename
+
+    async def events():
+        from .cv_enrich import iter_enrich_profile
+
+        start = time.perf_counter()
+
+        def elapsed() -> dict:
+            return {"elapsed_ms": round(1000 * (time.perf_counter() - start))}
+
+        try:
+            enriched = await _cached_upload(digest, "enriched", force)
+            if enriched is not None:
+                _stamp_metadata(enriched)
+                yield _sse("parsed", {"profile": enriched, "cached": True, **elapsed()})
+                yield _sse("done", {"profile": enriched, "cached": True, **elapsed()})
+                return
+
+            result = await _cached_upload(digest, "parsed", force)
+            cached = result is not None
+            if result is None:
+                text = await _cv_upload_text(contents, filename, digest, force)
+                yield _sse("extracted", {"chars": len(text), **elapsed()})
+                result = await _parse_cv_upload(text, digest, force)
+            else:
+                _stamp_metadata(result)
+            yield _sse("parsed", {"profile": result, "cached": cached, **elapsed()})
+
+            async for event, payload in iter_enrich_profile(result, use_cache=not force):
+                if event == "done":
+                    await _store_upload(digest, "enriched", payload)
+                    yield _sse("done", {"profile": payload, "cached": False, **elapsed()})
+                else:
+                    yield _sse(event, {**payload, **elapsed()})
+        except HTTPException as e:
+            yield _sse("error", {"status": e.status_code, "detail": e.detail})
+        except RuntimeError as e:
+            yield _sse("error", {"status": 503, "detail": str(e)})
+        except ValueError as e:
+            yield _sse("error", {"status": 400, "detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # --- Tool 2: CV Generator ---
 
 @app.post("/api/cv/generate")
-def cv_generate(request: GenerateCVRequest):
+async def cv_generate(request: GenerateCVRequest, force: bool = False):
     """
     Tool 2 — CV Generator: enviás perfil (JSON) + texto de la JD + idioma (es|en).
     Recibís nombres de PDF y DOCX. Descargalos desde GET /api/cv/download/{filename}.
+    ?force=true saltea el cache de respuestas del LLM.
     """
     if request.language not in ("es", "en"):
         raise HTTPException(status_code=400, detail="language debe ser 'es' o 'en'")
     try:
-        from .cv_generator import generate_cv_pdf_and_docx
+        from .cv_generator import generate_cv_pdf_and_docx_async
 
-        pdf_name, docx_name = generate_cv_pdf_and_docx(
-            request.profile, request.jd_text, language=request.language
+        pdf_name, docx_name = await generate_cv_pdf_and_docx_async(
+            request.profile, request.jd_text, language=request.language, use_cache=not force
         )
         return {
             "pdf_filename": pdf_name,
@@ -333,6 +689,110 @@ def cv_generate(request: GenerateCVRequest):
         raise HTTPException(status_code=503, detail=str(e))
 
 
+@app.get("/api/cv/converter/stats")
+def cv_converter_stats():
+    """Métricas del pool de conversión DOCX → PDF (backend docx2pdf): cola, workers y tiempos."""
+    from .convert_pool import converter_pool_metrics
+
+    metrics = converter_pool_metrics()
+    if metrics is None:
+        return {"enabled": False}
+    return {"enabled": True, **metrics}
+
+
+# --- Cache de respuestas del LLM ---
+
+@app.get("/api/llm-cache/stats")
+def llm_cache_stats():
+    """Contadores de hit/miss y tamaño del cache de respuestas del LLM."""
+    from .llm_cache import get_cache
+
+    cache = get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.delete("/api/llm-cache")
+def llm_cache_clear():
+    """Vacía el cache de respuestas del LLM (memoria y disco)."""
+    from .llm_cache import get_cache
+
+    cache = get_cache()
+    if cache is not None:
+        cache.clear()
+    return {"ok": True}
+
+
+@app.get("/api/structured-output/stats")
+def structured_output_stats():
+    """Respuestas JSON del LLM: válidas, arregladas localmente, reparadas por fragmento o sintaxis."""
+    from .structured_output import repair_stats
+
+    return repair_stats()
+
+
+@app.get("/api/prompt-compaction/stats")
+def prompt_compaction_stats():
+    """Tokens de los payloads enviados al LLM por tarea, frente a la serialización anterior."""
+    from .prompt_compaction import compaction_stats
+
+    return compaction_stats()
+
+
+@app.get("/api/llm-router/stats")
+def llm_router_stats():
+    """Proveedor y modelo de cada tarea, y por ruta: llamadas, errores, latencia y tokens."""
+    from .llm_router import router_stats
+
+    try:
+        return router_stats()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/api/llm-router/stats")
+def llm_router_stats_reset():
+    """Reinicia las métricas por ruta."""
+    from .llm_router import reset_router_stats
+
+    reset_router_stats()
+    return {"ok": True}
+
+
+@app.get("/api/page-cache/stats")
+def page_cache_stats():
+    """Hits (frescos y revalidados con 304), misses y tamaño del cache de páginas de ofertas."""
+    from .http_fetch import get_page_cache
+
+    cache = get_page_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.get("/api/upload-cache/stats")
+def upload_cache_stats():
+    """Hits/misses por etapa (text, parsed, enriched), uploads forzados y archivos en el cache de uploads."""
+    from .upload_cache import get_upload_cache
+
+    cache = get_upload_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@app.delete("/api/upload-cache")
+def upload_cache_clear():
+    """Vacía el cache de uploads de CV."""
+    from .upload_cache import get_upload_cache
+
+    cache = get_upload_cache()
+    if cache is not None:
+        cache.clear()
+    return {"ok": True}
+
+
 @app.get("/api/cv/download/{filename}")
 def cv_download(filename: str, inline: bool = False):
     """Sirve un archivo generado (PDF o DOCX) desde generated_cvs.
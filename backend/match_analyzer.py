@@ -1,8 +1,21 @@
-import json
+import asyncio
 import os
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List
 
-from openai import OpenAI
+from .llm_cache import acached_completion
+from .llm_clients import close_async_client
+from .llm_router import get_async_task_client, get_route, task_available
+from .prematch import build_profile_index, min_local_score, score_jd
+from .profile_context import profile_messages
+from .prompt_compaction import jd_excerpt
+from .structured_output import Validator, aparse_structured, json_response_format
+
+DEFAULT_BATCH_CONCURRENCY = 4
+
+MATCH_VALIDATOR = Validator.from_template(
+    {"score": 0, "seniority_detected": "", "reasons_for": [""], "reasons_against": [""], "recommendation": ""},
+    {"seniority_detected": ("match", "overqualified", "underqualified")},
+)
 
 
 MATCH_SYSTEM_PROMPT = """
@@ -128,13 +141,21 @@ Reglas para el output:
 """
 
 
-def analyze_match(profile: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+def _match_request(
+    profile: Dict[str, Any],
+    jd_text: str,
+    min_score: float | None,
+    index: Dict[str, Any] | None,
+) -> tuple[Dict[str, Any] | None, Dict[str, Any] | None, Dict[str, Any]]:
     """
-    Llama a GPT-4o para analizar el match entre perfil y JD.
-    Devuelve un dict con score, threshold, approved, reasons_for, reasons_against, recommendation.
+    Pre-match local y armado del request al LLM. Devuelve (reporte, params, local_fields):
+    reporte ya resuelto sin LLM (sin API key/JD o descartado por el pre-match) o los
+    params de chat.completions para llamar al modelo.
     """
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key or not jd_text.strip():
+    local = score_jd(index or build_profile_index(profile), jd_text)
+    local_fields = {"local_score": local["score"], "local_breakdown": local["breakdown"]}
+
+    if not task_available("match") or not jd_text.strip():
         # Sin API key o sin JD, devolvemos un match neutro/bajo pero válido.
         score = 0
         threshold = 70
@@ -148,21 +169,46 @@ def analyze_match(profile: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
                 "No se pudo evaluar el match porque falta JD o OPENAI_API_KEY."
             ],
             "recommendation": "no_postularse",
-        }
+            **local_fields,
+        }, None, local_fields
 
-    client = OpenAI(api_key=api_key)
-    model = os.environ.get("OPENAI_MODEL", "gpt-4o")
+    cutoff = min_local_score(min_score)
+    if cutoff is not None and local["score"] < cutoff:
+        missing = local["breakdown"]["technologies"].get("missing") or []
+        reasons_against = [
+            f"Descartado por el pre-match local: cobertura de keywords {local['score']}% "
+            f"(corte {cutoff:g}%). No se llamó al LLM."
+        ]
+        if missing:
+            reasons_against.append(
+                "Tecnologías de la JD que no aparecen en el perfil: " + ", ".join(missing[:15])
+            )
+        return {
+            "score": local["score"],
+            "threshold": 70,
+            "approved": False,
+            "seniority_fit": "match",
+            "reasons_for": [],
+            "reasons_against": reasons_against,
+            "recommendation": "no_postularse",
+            "llm_skipped": True,
+            **local_fields,
+        }, None, local_fields
 
-    profile_str = json.dumps(profile, ensure_ascii=False, indent=0)[:25000]
-    jd_chunk = jd_text[:15000].strip()
+    model = get_route("match").model
 
+    jd_chunk = jd_excerpt(jd_text)
+
+    # Perfil base primero (compactado, mismo texto que en el generator) y lo que varía por JD al
+    # final: el proveedor reutiliza el prefijo cacheado entre llamadas para el mismo perfil
+    profile_msg, extras = profile_messages(profile, jd_chunk, "match")
     messages = [
+        profile_msg,
         {"role": "system", "content": MATCH_SYSTEM_PROMPT},
+        *extras,
         {
             "role": "user",
             "content": (
-                "PERFIL (JSON):\n"
-                f"{profile_str}\n\n"
                 "JOB DESCRIPTION (TEXTO PLANO):\n"
                 f"{jd_chunk}\n\n"
                 "Recordatorio: respondé SOLO con el JSON especificado."
@@ -170,21 +216,14 @@ def analyze_match(profile: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
         },
     ]
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        max_tokens=1200,
-        temperature=0,
-    )
-    raw = (response.choices[0].message.content or "").strip()
-    if raw.startswith("```"):
-        # Manejar casos donde el modelo responde con ```json ... ```
-        raw = raw.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    params = {"model": model, "messages": messages, "max_tokens": 1200, "temperature": 0, **json_response_format()}
+    return None, params, local_fields
 
-    data = json.loads(raw)
 
+def _match_report(data: Dict[str, Any], local_fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Reporte final a partir de la respuesta validada del modelo (score, seniority, recomendación)."""
     threshold = 70
-    score_technical = max(0, min(100, int(data.get("score", 0))))
+    score_technical = max(0, min(100, int(data.get("score") or 0)))
     raw_seniority = data.get("seniority_detected")
     seniority_detected = (raw_seniority or "match").strip().lower()
     if seniority_detected not in ("match", "overqualified", "underqualified"):
@@ -232,5 +271,122 @@ def analyze_match(profile: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
         "reasons_for": [str(r) for r in reasons_for],
         "reasons_against": [str(r) for r in reasons_against],
         "recommendation": str(recommendation),
+        "llm_skipped": False,
+        **local_fields,
     }
 
+
+async def analyze_match_async(
+    profile: Dict[str, Any],
+    jd_text: str,
+    use_cache: bool = True,
+    min_score: float | None = None,
+    index: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """
+    Llama al modelo de la ruta "match" para analizar el match entre perfil y JD.
+    Devuelve un dict con score, threshold, approved, reasons_for, reasons_against, recommendation,
+    más local_score/local_breakdown del pre-match local (para calibrar contra el score del LLM).
+    Si el score local queda debajo de min_score (o PREMATCH_MIN_SCORE), no se llama al LLM
+    y el reporte sale con llm_skipped=True.
+    use_cache=False saltea el cache del LLM. index: índice del perfil ya construido (batch).
+    """
+    report, params, local_fields = _match_request(profile, jd_text, min_score, index)
+    if report is not None:
+        return report
+    client = get_async_task_client("match")
+    raw = await acached_completion(client, use_cache=use_cache, **params)
+    data = await aparse_structured(raw, MATCH_VALIDATOR, use_cache=use_cache)
+    return _match_report(data, local_fields)
+
+
+def analyze_match(
+    profile: Dict[str, Any],
+    jd_text: str,
+    use_cache: bool = True,
+    min_score: float | None = None,
+    index: Dict[str, Any] | None = None,
+) -> Dict[str, Any]:
+    """
+    Versión sincrónica de analyze_match_async (CLI y scripts).
+    No usar desde dentro de un event loop: ahí llamar a analyze_match_async.
+    """
+    async def run() -> Dict[str, Any]:
+        try:
+            return await analyze_match_async(profile, jd_text, use_cache, min_score, index)
+        finally:
+            await close_async_client()
+
+    return asyncio.run(run())
+
+
+def _batch_prime() -> bool:
+    return os.environ.get("MATCH_BATCH_PRIME", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def _batch_concurrency(value: int | None = None) -> int:
+    if value is None:
+        try:
+            value = int(os.environ.get("MATCH_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY))
+        except ValueError:
+            value = DEFAULT_BATCH_CONCURRENCY
+    return max(1, value)
+
+
+async def analyze_match_batch(
+    profile: Dict[str, Any],
+    items: List[Dict[str, Any]],
+    concurrency: int | None = None,
+    use_cache: bool = True,
+    min_score: float | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Evalúa un perfil contra muchas JDs con a lo sumo `concurrency` análisis en vuelo
+    (MATCH_BATCH_CONCURRENCY por defecto). Cada item es {"id", "jd_text" | "job_url"}.
+    El índice del pre-match local se construye una sola vez; min_score descarta sin LLM
+    las JDs con score local menor (ver analyze_match).
+    Emite un resultado por item apenas está listo (no en el orden de entrada):
+    {"index", "id", "ok": True, "report"} o {"index", "id", "ok": False, "error"}.
+    Un item que falla no aborta el batch.
+    Todas las llamadas comparten el prefijo del perfil: el primer análisis corre solo y el resto
+    espera a que termine (los fetch de URLs no), así encuentran el prefijo ya cacheado en el
+    proveedor en vez de pagarlo todas a la vez. MATCH_BATCH_PRIME=0 lo desactiva. Fetch y
+    análisis toman el semáforo por separado: un item esperando al primero no ocupa un lugar.
+    """
+    from .services import fetch_job_content_async
+
+    semaphore = asyncio.Semaphore(_batch_concurrency(concurrency))
+    profile_index = build_profile_index(profile)
+    primed = asyncio.Event()
+    if not _batch_prime() or len(items) < 2:
+        primed.set()
+
+    async def run(i: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"index": i, "id": item.get("id")}
+        try:
+            jd_text = (item.get("jd_text") or "").strip()
+            job_url = (item.get("job_url") or "").strip()
+            if not jd_text and job_url:
+                async with semaphore:
+                    jd_text = await fetch_job_content_async(job_url)
+            if not jd_text:
+                raise ValueError("El item no tiene jd_text ni job_url.")
+            if i > 0:
+                await primed.wait()
+            async with semaphore:
+                report = await analyze_match_async(profile, jd_text, use_cache, min_score, profile_index)
+            return {**result, "ok": True, "report": report}
+        except Exception as e:
+            return {**result, "ok": False, "error": str(e) or e.__class__.__name__}
+        finally:
+            if i == 0:
+                primed.set()
+
+    tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Si el cliente corta el stream, no seguimos gastando llamadas al LLM
+        for task in tasks:
+            task.cancel()
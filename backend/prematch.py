@@ -0,0 +1,188 @@
+"""
+Pre-match local y determinístico (sin LLM): cobertura ponderada de keywords de la JD
+contra un índice de skills/tecnologías del perfil.
+
+- Índice del perfil: skills.technical[].name, experience[].technologies[].name y
+  experience[].relevanceTags, normalizados (minúsculas, sin acentos, alias comunes).
+- Términos técnicos de la JD: n-gramas (1 a 3 palabras) que están en el índice del perfil
+  o en TECH_VOCABULARY (para detectar lo que la JD pide y el perfil no tiene).
+- Score 0-100 = suma ponderada de la cobertura por categoría (CATEGORY_WEIGHTS).
+
+Sirve para descartar JDs obviamente lejanas antes de gastar una llamada al LLM
+(PREMATCH_MIN_SCORE) y para calibrar contra el score del LLM.
+"""
+import os
+import re
+import unicodedata
+from typing import Any, Dict
+
+CATEGORY_WEIGHTS = {"technologies": 0.4, "skills": 0.3, "tags": 0.3}
+# Con cuántos tags matcheados la categoría tags se considera cubierta del todo
+TAG_SATURATION = 3
+
+ALIASES = {
+    "react.js": "react",
+    "reactjs": "react",
+    "node.js": "node",
+    "nodejs": "node",
+    "vue.js": "vue",
+    "vuejs": "vue",
+    "next.js": "nextjs",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "amazon web services": "aws",
+    "google cloud platform": "gcp",
+    "google cloud": "gcp",
+    "microsoft azure": "azure",
+    "ms excel": "excel",
+    "power bi": "powerbi",
+    "js": "javascript",
+    "ts": "typescript",
+    "sklearn": "scikit-learn",
+    "ml": "machine learning",
+    "ci/cd": "cicd",
+}
+
+# Términos que la JD puede pedir aunque el perfil no los tenga. Se evitan palabras ambiguas
+# ("r", "go", "rest") que matchearían texto común; si el perfil las tiene, igual cuentan.
+TECH_VOCABULARY = frozenset(
+    ALIASES.get(t, t)
+    for t in (
+        "python", "java", "javascript", "typescript", "rust", "c++", "c#", "scala",
+        "kotlin", "swift", "ruby", "php", "sql", "nosql", "bash",
+        "react", "angular", "vue", "nextjs", "node", "django", "flask", "fastapi", "spring",
+        ".net", "rails", "graphql", "grpc",
+        "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "cassandra", "dynamodb",
+        "snowflake", "bigquery", "redshift", "databricks", "oracle", "sql server",
+        "spark", "hadoop", "kafka", "airflow", "dbt", "flink", "etl", "pandas",
+        "numpy", "scikit-learn", "tensorflow", "pytorch", "keras", "machine learning",
+        "deep learning", "nlp", "llm", "mlops",
+        "aws", "gcp", "azure", "docker", "kubernetes", "terraform", "ansible", "jenkins",
+        "github actions", "gitlab", "cicd", "linux", "git", "microservices", "serverless",
+        "tableau", "powerbi", "looker", "excel", "qlik", "metabase", "superset",
+        "jira", "confluence", "salesforce", "sap", "hubspot",
+        "scrum", "kanban", "agile", "okr", "a/b testing", "data warehouse", "data modeling",
+    )
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#./-]+")
+_MAX_NGRAM = 3
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+    )
+
+
+def _tokens(text: str) -> list[str]:
+    raw = _TOKEN_RE.findall(_strip_accents(text.lower()))
+    # Puntuación de fin de oración pegada al token ("python." / "sql-"); ".net" se conserva
+    return [t for t in (r.rstrip(".-/") for r in raw) if t]
+
+
+def tokenize(text: str) -> list[str]:
+    """Tokens normalizados (minúsculas, sin acentos, alias de una palabra aplicados)."""
+    return [ALIASES.get(t, t) for t in _tokens(text or "")]
+
+
+def normalize_term(term: str) -> str:
+    """Término canónico: minúsculas, sin acentos, espacios colapsados, alias aplicados."""
+    norm = " ".join(_tokens(term or ""))
+    return ALIASES.get(norm, norm)
+
+
+def _ngrams(tokens: list[str]) -> set[str]:
+    grams = set()
+    for n in range(1, _MAX_NGRAM + 1):
+        for i in range(len(tokens) - n + 1):
+            gram = " ".join(tokens[i:i + n])
+            grams.add(ALIASES.get(gram, gram))
+    return grams
+
+
+def build_profile_index(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Índice de términos del perfil por categoría. Se construye una vez por perfil."""
+    skills = {
+        normalize_term(s.get("name", ""))
+        for s in ((profile.get("skills") or {}).get("technical") or [])
+        if isinstance(s, dict)
+    }
+    technologies = set()
+    tags = set()
+    for exp in profile.get("experience") or []:
+        for tech in exp.get("technologies") or []:
+            if isinstance(tech, dict):
+                technologies.add(normalize_term(tech.get("name", "")))
+        for tag in exp.get("relevanceTags") or []:
+            if isinstance(tag, str):
+                tags.add(normalize_term(tag))
+    skills.discard("")
+    technologies.discard("")
+    tags.discard("")
+    return {"skills": skills, "technologies": technologies, "tags": tags}
+
+
+def _tag_matches(tag: str, jd_tokens: set[str]) -> bool:
+    """Un tag matchea si al menos la mitad de sus palabras significativas están en la JD."""
+    words = [w for w in tag.split() if len(w) > 2]
+    if not words:
+        return False
+    return sum(1 for w in words if w in jd_tokens) * 2 >= len(words)
+
+
+def score_jd(index: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+    """
+    Score local 0-100 de la JD contra el índice del perfil, con desglose por categoría:
+    {"score", "breakdown": {categoría: {"coverage", "matched", "missing"?}}}.
+    Una categoría sin señal (la JD no menciona tecnologías, o el perfil no tiene tags)
+    no cuenta y su peso se reparte entre las demás.
+    """
+    tokens = _tokens(jd_text or "")
+    grams = _ngrams(tokens)
+    profile_tech = index["skills"] | index["technologies"]
+    jd_tech = {g for g in grams if g in profile_tech or g in TECH_VOCABULARY}
+
+    breakdown: Dict[str, Dict[str, Any]] = {}
+    for category in ("technologies", "skills"):
+        matched = sorted(jd_tech & index[category])
+        breakdown[category] = {
+            "coverage": round(len(matched) / len(jd_tech), 3) if jd_tech else None,
+            "matched": matched,
+        }
+    breakdown["technologies"]["missing"] = sorted(jd_tech - profile_tech)
+
+    token_set = set(tokens)
+    matched_tags = sorted(t for t in index["tags"] if _tag_matches(t, token_set))
+    breakdown["tags"] = {
+        "coverage": round(min(1.0, len(matched_tags) / TAG_SATURATION), 3) if index["tags"] else None,
+        "matched": matched_tags,
+    }
+
+    weighted = [
+        (CATEGORY_WEIGHTS[c], breakdown[c]["coverage"])
+        for c in CATEGORY_WEIGHTS
+        if breakdown[c]["coverage"] is not None
+    ]
+    total_weight = sum(w for w, _ in weighted)
+    score = round(100 * sum(w * cov for w, cov in weighted) / total_weight) if total_weight else 0
+    return {"score": score, "breakdown": breakdown}
+
+
+def local_match_score(profile: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+    """Atajo: indexa el perfil y puntúa la JD."""
+    return score_jd(build_profile_index(profile), jd_text)
+
+
+def min_local_score(value: float | None = None) -> float | None:
+    """Corte del pre-match (parámetro > PREMATCH_MIN_SCORE). None o 0 = sin corte."""
+    if value is None:
+        raw = os.environ.get("PREMATCH_MIN_SCORE", "").strip()
+        if not raw:
+            return None
+        try:
+            value = float(raw)
+        except ValueError:
+            return None
+    return value if value > 0 else None
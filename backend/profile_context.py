@@ -0,0 +1,293 @@
+"""
+Recorte del perfil por relevancia para una JD (reemplaza json.dumps(profile)[:25000]).
+
+El perfil se parte en dos:
+- núcleo, que siempre viaja: personal, narrative, skills, education, languages,
+  certifications, strategy y, por experiencia, immutable/context/leadershipSignals
+  (el generator necesita todos los roles para respetar fechas y orden).
+- piezas rankeables por experiencia: cada fact, capability y technology, los
+  relevanceTags y cada párrafo de raw.
+Las piezas se puntúan con BM25 contra la JD y se empaquetan de mayor a menor score hasta
+el presupuesto. El resultado es un perfil válido con la misma forma, con las piezas elegidas
+en su orden original. Si el perfil completo entra en el presupuesto se devuelve sin cambios.
+
+profile_payloads() arma el payload del match y del generator en dos partes
+(split_profile_context): un perfil base que no depende de la JD (núcleo y piezas en su orden
+original, roles recientes primero, hasta el presupuesto) y extras con las piezas que no entraron,
+las más relevantes para la JD, hasta un presupuesto aparte. Perfil compactado (prompt_compaction)
+con presupuestos en tokens (PROFILE_CONTEXT_TOKENS, PROFILE_CONTEXT_EXTRA_TOKENS); con
+PROMPT_COMPACTION=0, el JSON anterior con presupuestos en caracteres (PROFILE_CONTEXT_BUDGET,
+PROFILE_CONTEXT_EXTRA_BUDGET).
+
+profile_messages() pone el perfil base en un primer mensaje de sistema con un encabezado fijo,
+antes de las instrucciones de la tarea, y los extras después de ellas: para un mismo perfil, el
+match contra muchas JDs y la generación del CV comparten el mismo prefijo de prompt aunque el
+perfil no entre en el presupuesto, y el proveedor lo cachea (OpenAI lo hace solo desde 1024
+tokens de prefijo idéntico).
+"""
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from .prematch import tokenize
+from .prompt_compaction import (
+    compact_json,
+    compaction_enabled,
+    count_tokens,
+    legacy_json,
+    project_profile,
+    record_compaction,
+    sample_compaction,
+)
+
+DEFAULT_BUDGET_CHARS = 25000
+DEFAULT_BUDGET_TOKENS = 6000
+DEFAULT_EXTRA_CHARS = 6000
+DEFAULT_EXTRA_TOKENS = 1500
+
+PROFILE_PREFIX = (
+    "Perfil del candidato (JSON). Es la única fuente de datos sobre la persona: no uses nada que no "
+    "esté acá. Las instrucciones de la tarea y la job description vienen en los mensajes siguientes.\n\n"
+    "PERFIL (JSON):\n"
+)
+EXTRAS_PREFIX = (
+    "Más detalle del perfil, elegido por relevancia para esta job description: facts, capabilities, "
+    "technologies y párrafos de raw que no entraron en el perfil de arriba, por experiencia "
+    "(identificada por immutable). Mismo formato; completa esas experiencias.\n\n"
+    "PERFIL, DETALLE (JSON):\n"
+)
+
+CORE_KEYS = ("personal", "narrative", "skills", "education", "languages", "certifications", "strategy")
+EXPERIENCE_CORE_KEYS = ("immutable", "context", "leadershipSignals")
+RANKED_LIST_KEYS = ("facts", "capabilities", "technologies")
+
+STOPWORDS = frozenset(
+    "a al and are as at be by con de del el en es for from la las los o of on or para "
+    "por que se the to un una with y you your our we will".split()
+)
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n|\n(?=\s*[-•●*])")
+
+
+def _budget(value: int | None = None) -> int:
+    if value is None:
+        try:
+            value = int(os.environ.get("PROFILE_CONTEXT_BUDGET", DEFAULT_BUDGET_CHARS))
+        except ValueError:
+            value = DEFAULT_BUDGET_CHARS
+    return max(1000, value)
+
+
+def _token_budget() -> int:
+    try:
+        value = int(os.environ.get("PROFILE_CONTEXT_TOKENS", DEFAULT_BUDGET_TOKENS))
+    except ValueError:
+        value = DEFAULT_BUDGET_TOKENS
+    return max(250, value)
+
+
+def _extra_budget(compacted: bool) -> int:
+    name, default = (
+        ("PROFILE_CONTEXT_EXTRA_TOKENS", DEFAULT_EXTRA_TOKENS) if compacted
+        else ("PROFILE_CONTEXT_EXTRA_BUDGET", DEFAULT_EXTRA_CHARS)
+    )
+    try:
+        value = int(os.environ.get(name, default))
+    except ValueError:
+        value = default
+    return max(0, value)
+
+
+def _size(obj: Any) -> int:
+    """Caracteres del JSON como se enviaba antes (indent=0)."""
+    return len(json.dumps(obj, ensure_ascii=False, indent=0))
+
+
+def _tokens(obj: Any) -> int:
+    """Tokens del JSON compacto."""
+    return count_tokens(compact_json(obj))
+
+
+def _piece_text(piece: Any) -> str:
+    if isinstance(piece, str):
+        return piece
+    return json.dumps(piece, ensure_ascii=False)
+
+
+def _raw_paragraphs(raw: str) -> List[str]:
+    parts = [p.strip() for p in _PARAGRAPH_SPLIT.split(raw or "")]
+    return [p for p in parts if p]
+
+
+def _collect_pieces(profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Piezas rankeables: {"exp", "key", "value", "order"}; order conserva el orden original."""
+    pieces = []
+    for i, exp in enumerate(profile.get("experience") or []):
+        for key in RANKED_LIST_KEYS:
+            for value in exp.get(key) or []:
+                pieces.append({"exp": i, "key": key, "value": value})
+        tags = exp.get("relevanceTags") or []
+        if tags:
+            pieces.append({"exp": i, "key": "relevanceTags", "value": tags})
+        for paragraph in _raw_paragraphs(exp.get("raw") or ""):
+            pieces.append({"exp": i, "key": "raw", "value": paragraph})
+    for order, piece in enumerate(pieces):
+        piece["order"] = order
+    return pieces
+
+
+def bm25_scores(docs: List[List[str]], query: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Score BM25 de cada documento (lista de tokens) contra los términos de la query."""
+    if not docs:
+        return []
+    n_docs = len(docs)
+    avg_len = sum(len(d) for d in docs) / n_docs or 1.0
+    doc_freq: Counter = Counter()
+    for doc in docs:
+        doc_freq.update(set(doc))
+    terms = set(query)
+    scores = []
+    for doc in docs:
+        tf = Counter(doc)
+        score = 0.0
+        for term in terms:
+            f = tf.get(term)
+            if not f:
+                continue
+            idf = math.log(1 + (n_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * f * (k1 + 1) / (f + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def _core(profile: Dict[str, Any]) -> Dict[str, Any]:
+    core = {k: profile[k] for k in CORE_KEYS if k in profile}
+    core["experience"] = [
+        {k: exp[k] for k in EXPERIENCE_CORE_KEYS if k in exp}
+        for exp in profile.get("experience") or []
+    ]
+    return core
+
+
+def _ranked(pieces: List[Dict[str, Any]], jd_text: str) -> List[Dict[str, Any]]:
+    """Piezas por score BM25 contra la JD; a igual score, el orden original (roles recientes primero)."""
+    query = [t for t in tokenize(jd_text) if t not in STOPWORDS and len(t) > 1]
+    scores = bm25_scores([tokenize(_piece_text(p["value"])) for p in pieces], query)
+    return [p for _, p in sorted(zip(scores, pieces), key=lambda sp: (-sp[0], sp[1]["order"]))]
+
+
+def _pack(
+    pieces: List[Dict[str, Any]], used: int, budget: int, size: Callable[[Any], int]
+) -> List[Dict[str, Any]]:
+    """Las piezas que entran en budget (ya hay `used` ocupado), en el orden dado."""
+    selected = []
+    for piece in pieces:
+        cost = size(piece["value"]) + size(piece["key"]) + 2
+        if used + cost > budget:
+            continue
+        used += cost
+        selected.append(piece)
+    return selected
+
+
+def _attach(experience: List[Dict[str, Any]], pieces: List[Dict[str, Any]]) -> None:
+    """Agrega las piezas a sus experiencias, en su orden original."""
+    for piece in sorted(pieces, key=lambda p: p["order"]):
+        exp = experience[piece["exp"]]
+        if piece["key"] == "raw":
+            exp["raw"] = f"{exp['raw']}\n\n{piece['value']}" if exp.get("raw") else piece["value"]
+        elif piece["key"] == "relevanceTags":
+            exp["relevanceTags"] = piece["value"]
+        else:
+            exp.setdefault(piece["key"], []).append(piece["value"])
+
+
+def select_profile_context(
+    profile: Dict[str, Any],
+    jd_text: str,
+    budget: int | None = None,
+    size: Callable[[Any], int] | None = None,
+) -> Dict[str, Any]:
+    """
+    Perfil reducido a las piezas más relevantes para la JD, dentro de budget medido con size
+    (por defecto caracteres de JSON y PROFILE_CONTEXT_BUDGET). Nunca corta JSON a la mitad.
+    """
+    if size is None:
+        size, budget = _size, _budget(budget)
+    if size(profile) <= budget:
+        return profile
+
+    result = _core(profile)
+    ranked = _ranked(_collect_pieces(profile), jd_text)
+    _attach(result["experience"], _pack(ranked, size(result), budget, size))
+    return result
+
+
+def split_profile_context(
+    profile: Dict[str, Any],
+    jd_text: str,
+    budget: int,
+    extra_budget: int,
+    size: Callable[[Any], int],
+) -> Tuple[Dict[str, Any], Dict[str, Any] | None]:
+    """
+    (base, extras). base no depende de la JD: núcleo más las piezas en su orden original hasta
+    budget (el perfil entero si entra). extras: las piezas que quedaron afuera más relevantes para
+    la JD, hasta extra_budget, como {"experience": [{"immutable", piezas...}]} con solo los roles
+    que tienen alguna; None si no queda nada.
+    """
+    if size(profile) <= budget:
+        return profile, None
+
+    base = _core(profile)
+    pieces = _collect_pieces(profile)
+    chosen = _pack(pieces, size(base), budget, size)
+    _attach(base["experience"], chosen)
+
+    taken = {p["order"] for p in chosen}
+    rest = [p for p in pieces if p["order"] not in taken]
+    extra = _pack(_ranked(rest, jd_text), 0, extra_budget, size) if rest and extra_budget else []
+    if not extra:
+        return base, None
+    experience = [{"immutable": exp.get("immutable") or {}} for exp in profile.get("experience") or []]
+    _attach(experience, extra)
+    return base, {"experience": [experience[i] for i in sorted({p["exp"] for p in extra})]}
+
+
+def profile_payloads(profile: Dict[str, Any], jd_text: str, task: str) -> Tuple[str, str | None]:
+    """
+    (perfil base, extras o None) serializados para el prompt de task ("match" | "generate"):
+    compactados con presupuestos en tokens (ver split_profile_context). En las llamadas
+    muestreadas (sample_compaction) registra los tokens frente al payload anterior, que solo
+    entonces se arma.
+    """
+    if not compaction_enabled():
+        base, extras = split_profile_context(
+            profile, jd_text, _budget(), _extra_budget(compacted=False), _size
+        )
+        return legacy_json(base), None if extras is None else legacy_json(extras)
+    base, extras = split_profile_context(
+        project_profile(profile), jd_text, _token_budget(), _extra_budget(compacted=True), _tokens
+    )
+    sent = (compact_json(base), None if extras is None else compact_json(extras))
+    if sample_compaction(task):
+        record_compaction(
+            task, legacy_json(select_profile_context(profile, jd_text)), "".join(filter(None, sent))
+        )
+    return sent
+
+
+def profile_messages(
+    profile: Dict[str, Any], jd_text: str, task: str
+) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+    """
+    Mensajes del perfil para match/generate: (primer mensaje, encabezado fijo + perfil base, el
+    prefijo cacheable; mensajes a poner después de las instrucciones de la tarea, con los extras
+    elegidos por la JD, o lista vacía).
+    """
+    base, extras = profile_payloads(profile, jd_text, task)
+    first = {"role": "system", "content": PROFILE_PREFIX + base}
+    return first, [] if extras is None else [{"role": "system", "content": EXTRAS_PREFIX + extras}]
@@ -0,0 +1,99 @@
+"""
+Acceso único a data/profile.json: lectura cacheada y escritura atómica.
+
+- El perfil parseado queda en memoria y solo se relee si cambia el archivo (mtime_ns/tamaño),
+  por ejemplo si se edita a mano o lo guarda otro worker.
+- La escritura va a un archivo temporal en el mismo directorio + os.replace: un lector nunca
+  ve un JSON a medio escribir. El temporal toma los permisos del archivo actual (0644 si no
+  existe): mkstemp lo crea 0600 y el rename dejaría el perfil legible solo por el dueño.
+- El ETag es el hash del contenido; GET /api/profile lo usa para responder 304 a If-None-Match.
+"""
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, NamedTuple
+
+PROFILE_PATH = Path(__file__).resolve().parent.parent / "data" / "profile.json"
+DEFAULT_FILE_MODE = 0o644
+
+
+class ProfileSnapshot(NamedTuple):
+    profile: Dict[str, Any]  # compartido entre requests: no mutar
+    raw: bytes  # contenido del archivo, se devuelve tal cual en GET
+    etag: str
+
+
+def _etag(raw: bytes) -> str:
+    return '"' + hashlib.sha256(raw).hexdigest()[:32] + '"'
+
+
+class ProfileStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._snapshot: ProfileSnapshot | None = None
+        self._version: tuple[int, int] | None = None
+
+    def _stat_version(self) -> tuple[int, int] | None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self) -> ProfileSnapshot | None:
+        """Perfil actual (None si no existe el archivo). Solo relee si el archivo cambió."""
+        version = self._stat_version()
+        with self._lock:
+            if version is None:
+                self._snapshot = self._version = None
+                return None
+            if self._snapshot is not None and version == self._version:
+                return self._snapshot
+            raw = self.path.read_bytes()
+            self._snapshot = ProfileSnapshot(json.loads(raw), raw, _etag(raw))
+            self._version = version
+            return self._snapshot
+
+    def _file_mode(self) -> int:
+        try:
+            return stat.S_IMODE(self.path.stat().st_mode)
+        except FileNotFoundError:
+            return DEFAULT_FILE_MODE
+
+    def save(self, profile: Dict[str, Any]) -> ProfileSnapshot:
+        """Escribe el perfil de forma atómica (temporal + rename) y actualiza el cache."""
+        raw = json.dumps(profile, ensure_ascii=False, indent=2).encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".profile-", suffix=".json.tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(raw)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(tmp, self._file_mode())
+                os.replace(tmp, self.path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._snapshot = ProfileSnapshot(json.loads(raw), raw, _etag(raw))
+            self._version = self._stat_version()
+            return self._snapshot
+
+
+_store: ProfileStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """Store del proceso para data/profile.json."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProfileStore(PROFILE_PATH)
+        return _store
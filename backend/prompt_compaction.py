@@ -0,0 +1,192 @@
+"""
+Compactación de payloads JSON para los prompts y conteo local de tokens.
+
+json.dumps(perfil, indent=0) igual emite un salto de línea por campo, conserva cada "", [] y
+null, y manda `raw` junto a los facts que ya se extrajeron de él. Antes de enviarse, el perfil:
+- se proyecta por tarea (sin metadata ni constraints, que el modelo no usa);
+- pierde los valores vacíos;
+- no lleva `raw` en las experiencias que ya tienen facts o capabilities;
+- se serializa sin espacios ni saltos de línea, con las claves del schema (los prompts
+  describen los campos por esos nombres).
+Los presupuestos se miden en tokens con tiktoken si está instalado (TOKENIZER_ENCODING) o, si
+no, con una aproximación local por palabras y signos. PROMPT_COMPACTION=0 vuelve al payload
+anterior. compaction_stats() acumula, por tarea, los tokens enviados frente a los de antes;
+el payload anterior solo se arma y se tokeniza en 1 de cada PROMPT_COMPACTION_SAMPLE llamadas
+(la primera siempre), para que las métricas no sumen trabajo a cada request.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+JD_MAX_TOKENS = 4000
+JD_MAX_CHARS = 15000  # recorte anterior, con PROMPT_COMPACTION=0
+DEFAULT_STATS_SAMPLE = 20
+# Claves del perfil que no aportan al match ni a la generación
+DROP_KEYS = ("metadata", "constraints")
+ENRICHED_KEYS = ("facts", "capabilities")
+
+# Aproximación sin tiktoken: palabras de a 4 letras, dígitos de a 3, cada signo y cada salto de
+# línea un token; el espacio antes de una palabra va con ella, como en los vocabularios BPE
+_APPROX_TOKEN = re.compile(r"[^\W\d_]{1,4}|\d{1,3}|[^\w\s]|\n")
+
+
+def compaction_enabled() -> bool:
+    return os.environ.get("PROMPT_COMPACTION", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+@lru_cache(maxsize=4)
+def _encoding(name: str):
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception:  # sin el paquete o sin poder bajar el vocabulario
+        return None
+
+
+def _tokenizer():
+    return _encoding(os.environ.get("TOKENIZER_ENCODING", DEFAULT_ENCODING))
+
+
+def tokenizer_name() -> str:
+    encoding = _tokenizer()
+    return f"tiktoken:{encoding.name}" if encoding is not None else "approx"
+
+
+def count_tokens(text: str) -> int:
+    """Tokens de text según el tokenizer local."""
+    encoding = _tokenizer()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(1 for _ in _APPROX_TOKEN.finditer(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Prefijo de text con a lo sumo max_tokens tokens (reemplaza text[:N caracteres])."""
+    encoding = _tokenizer()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    for used, m in enumerate(_APPROX_TOKEN.finditer(text)):
+        if used == max_tokens:
+            return text[: m.start()]
+    return text
+
+
+def jd_excerpt(jd_text: str) -> str:
+    """JD recortada a JD_MAX_TOKENS tokens para el match y el generator."""
+    if not compaction_enabled():
+        return jd_text[:JD_MAX_CHARS].strip()
+    return truncate_tokens(jd_text, JD_MAX_TOKENS).strip()
+
+
+def _empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def prune_empty(value: Any) -> Any:
+    """Copia sin "", null, [] ni {} (recursivo). False y 0 se conservan: son datos."""
+    if isinstance(value, dict):
+        pruned = {k: prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if not _empty(v)}
+    if isinstance(value, list):
+        pruned = [prune_empty(v) for v in value]
+        return [v for v in pruned if not _empty(v)]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def project_profile(profile: Dict[str, Any], drop_keys: Iterable[str] = DROP_KEYS) -> Dict[str, Any]:
+    """Perfil para el prompt: sin drop_keys, sin vacíos y sin raw donde ya hay facts/capabilities."""
+    projected = {k: v for k, v in profile.items() if k not in drop_keys}
+    experience = []
+    for exp in projected.get("experience") or []:
+        if any(not _empty(prune_empty(exp.get(key))) for key in ENRICHED_KEYS):
+            exp = {k: v for k, v in exp.items() if k != "raw"}
+        experience.append(exp)
+    if "experience" in projected:
+        projected["experience"] = experience
+    return prune_empty(projected)
+
+
+def compact_json(value: Any) -> str:
+    """
+    JSON canónico sin espacios ni saltos de línea: claves ordenadas, así el mismo dato produce
+    siempre el mismo texto (prefijos cacheables).
+    """
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+def legacy_json(value: Any) -> str:
+    """Serialización anterior (indent=0), la referencia para medir el ahorro."""
+    return json.dumps(value, ensure_ascii=False, indent=0)
+
+
+def payload_json(task: str, value: Any) -> str:
+    """value compactado para el prompt de task, registrando el ahorro (PROMPT_COMPACTION=0: como antes)."""
+    if not compaction_enabled():
+        return legacy_json(value)
+    sent = compact_json(prune_empty(value))
+    if sample_compaction(task):
+        record_compaction(task, legacy_json(value), sent)
+    return sent
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+
+
+def _sample_every() -> int:
+    try:
+        return max(1, int(os.environ.get("PROMPT_COMPACTION_SAMPLE", DEFAULT_STATS_SAMPLE)))
+    except ValueError:
+        return DEFAULT_STATS_SAMPLE
+
+
+def _task_stats(task: str) -> dict:
+    return _stats.setdefault(task, {"calls": 0, "sampled": 0, "baseline_tokens": 0, "sent_tokens": 0})
+
+
+def sample_compaction(task: str) -> bool:
+    """Cuenta una llamada de task; True si le toca medirse contra el payload anterior."""
+    with _stats_lock:
+        s = _task_stats(task)
+        s["calls"] += 1
+        return (s["calls"] - 1) % _sample_every() == 0
+
+
+def record_compaction(task: str, baseline: str, sent: str) -> None:
+    """Registra los tokens de un payload enviado frente a los que se hubieran enviado antes."""
+    baseline_tokens, sent_tokens = count_tokens(baseline), count_tokens(sent)
+    logger.debug("Compactación %s: %d → %d tokens", task, baseline_tokens, sent_tokens)
+    with _stats_lock:
+        s = _task_stats(task)
+        s["sampled"] += 1
+        s["baseline_tokens"] += baseline_tokens
+        s["sent_tokens"] += sent_tokens
+
+
+def compaction_stats() -> dict:
+    """
+    Por tarea: llamadas, llamadas medidas (sampled) y, sobre esas, tokens antes/después, ahorro
+    total y porcentaje.
+    """
+    with _stats_lock:
+        tasks = {
+            task: {
+                **s,
+                "saved_tokens": s["baseline_tokens"] - s["sent_tokens"],
+                "saved_pct": round(100 * (1 - s["sent_tokens"] / s["baseline_tokens"]), 1)
+                if s["baseline_tokens"] else None,
+            }
+            for task, s in _stats.items()
+        }
+    return {"enabled": compaction_enabled(), "tokenizer": tokenizer_name(), "tasks": tasks}
@@ -2,48 +2,122 @@
 Lógica de negocio: obtener JD desde URL y resumir con LLM.
 El CV adaptado se genera en cv_generator (PDF/DOCX).
 """
-import re
-import os
+import asyncio
+from typing import Any, AsyncIterator, Dict, Tuple
 
-import httpx
+from .html_extract import extract_main_text
+from .http_fetch import close_http_client, fetch_page
+from .job_posting import extract_job_posting, posting_to_text
+from .llm_cache import acached_completion, astream_completion
+from .llm_clients import close_async_client
+
+SUMMARY_SYSTEM_PROMPT = "Resumís job descriptions en español: rol, requisitos must-have, nice-to-have y responsabilidades principales. Respuesta concisa en prosa o bullets."
+
+
+def _parse_job_page(html: str) -> Tuple[str, Dict[str, Any] | None]:
+    posting = extract_job_posting(html)
+    if posting is not None:
+        return posting_to_text(posting), posting
+    return extract_main_text(html), None
+
+
+async def fetch_job_async(url: str, timeout: float = 30.0) -> Tuple[str, Dict[str, Any] | None]:
+    """
+    Obtiene la job description con el cliente HTTP compartido (keep-alive, cache de páginas
+    con revalidación y reintentos; ver http_fetch). Devuelve (texto crudo, posting):
+    - si la página trae un JobPosting JSON-LD, el texto sale de sus campos y posting es la
+      JD estructurada (ver job_posting; permite resumir sin LLM),
+    - si no, el contenido principal del HTML (ver html_extract) y posting None.
+    """
+    html = await fetch_page(url, timeout=timeout)
+    # El parseo es CPU: fuera del event loop para no frenar otros requests
+    return await asyncio.to_thread(_parse_job_page, html)
+
+
+async def fetch_job_content_async(url: str, timeout: float = 30.0) -> str:
+    """Texto crudo de la job description (ver fetch_job_async)."""
+    raw_text, _ = await fetch_job_async(url, timeout)
+    return raw_text
 
 
 def fetch_job_content(url: str, timeout: float = 30.0) -> str:
-    """Obtiene el contenido de la página de la job description."""
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
-    with httpx.Client(follow_redirects=True, timeout=timeout) as client:
-        r = client.get(url, headers=headers)
-        r.raise_for_status()
-        html = r.text
-    # Extracción burda de texto: quitar scripts/styles y tags, quedarnos con texto
-    text = re.sub(r"<script[^>]*>[\s\S]*?</script>", "", html, flags=re.I)
-    text = re.sub(r"<style[^>]*>[\s\S]*?</style>", "", text, flags=re.I)
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text[:50000]  # tope para no pasarnos de contexto
-
-
-def summarize_jd(raw_text: str) -> str:
-    """Resume la job description. Con OPENAI_API_KEY usa LLM; si no, primer bloque de texto."""
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key or not raw_text.strip():
-        return raw_text[:2000].strip() or "No se pudo obtener contenido de la URL."
+    """
+    Versión sincrónica de fetch_job_content_async (CLI y scripts).
+    No usar desde dentro de un event loop: ahí llamar a fetch_job_content_async.
+    """
+
+    async def run() -> str:
+        try:
+            return await fetch_job_content_async(url, timeout)
+        finally:
+            await close_http_client()
+
+    return asyncio.run(run())
 
-    from openai import OpenAI
-    client = OpenAI(api_key=api_key)
-    model = os.environ.get("OPENAI_SUMMARY_MODEL", "gpt-4o")
+
+def _summary_params(raw_text: str) -> dict:
+    from .llm_router import get_route
+
+    model = get_route("summarize").model
     chunk = raw_text[:12000]  # límite razonable para el prompt
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {
-                "role": "system",
-                "content": "Resumís job descriptions en español: rol, requisitos must-have, nice-to-have y responsabilidades principales. Respuesta concisa en prosa o bullets.",
-            },
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
             {"role": "user", "content": f"Resumí esta oferta:\n\n{chunk}"},
         ],
-        max_tokens=800,
-    )
-    return (response.choices[0].message.content or "").strip()
+        "max_tokens": 800,
+    }
+
+
+def _summary_fallback(raw_text: str) -> str | None:
+    """Sin API key o sin texto no se llama al LLM: primer bloque del texto."""
+    from .llm_router import task_available
+
+    if not task_available("summarize") or not raw_text.strip():
+        return raw_text[:2000].strip() or "No se pudo obtener contenido de la URL."
+    return None
+
+
+async def summarize_jd_async(raw_text: str, use_cache: bool = True) -> str:
+    """
+    Resume la job description. Con OPENAI_API_KEY usa LLM; si no, primer bloque de texto.
+    use_cache=False saltea el cache del LLM.
+    """
+    fallback = _summary_fallback(raw_text)
+    if fallback is not None:
+        return fallback
+
+    from .llm_router import get_async_task_client
+    client = get_async_task_client("summarize")
+    return await acached_completion(client, use_cache=use_cache, **_summary_params(raw_text))
+
+
+def summarize_jd(raw_text: str, use_cache: bool = True) -> str:
+    """
+    Versión sincrónica de summarize_jd_async (CLI y scripts).
+    No usar desde dentro de un event loop: ahí llamar a summarize_jd_async.
+    """
+    async def run() -> str:
+        try:
+            return await summarize_jd_async(raw_text, use_cache=use_cache)
+        finally:
+            await close_async_client()
+
+    return asyncio.run(run())
+
+
+async def summarize_jd_stream_async(raw_text: str, use_cache: bool = True) -> AsyncIterator[str]:
+    """
+    Igual que summarize_jd_async pero emite el resumen en fragmentos a medida que el modelo
+    los genera (para mostrar el primer token en menos de un segundo).
+    """
+    fallback = _summary_fallback(raw_text)
+    if fallback is not None:
+        yield fallback
+        return
+
+    from .llm_router import get_async_task_client
+    client = get_async_task_client("summarize")
+    async for text in astream_completion(client, use_cache=use_cache, **_summary_params(raw_text)):
+        yield text
@@ -0,0 +1,443 @@
+"""
+Salidas estructuradas del LLM: JSON mode, validación contra un template y reparación dirigida.
+
+Antes cada módulo sacaba los ``` y llamaba a json.loads: una llave mal puesta tiraba la llamada
+entera (segundos de modelo) y había que repetirla. Ahora la respuesta pasa por tres escalones:
+1. Parseo tolerante local: fences, texto alrededor del JSON, comas colgantes y cierres
+   faltantes (respuesta cortada). Si igual no parsea, se le pide al modelo barato (la ruta
+   "repair" de llm_router) que corrija la sintaxis, sin repetir la generación.
+2. Validación contra un template compilado (data/cv_schema_v1.json para el perfil; templates
+   propios para match y generator): tipos, enums y formatos de fecha. Los arreglos obvios
+   (string → lista, "3" → 3, mayúsculas en un enum) se hacen localmente.
+3. Solo los fragmentos que siguen inválidos se le re-piden al modelo barato, en una llamada,
+   y se parchean en su lugar. Lo que no se pudo reparar queda vacío (null, "", [] o {}).
+Las llamadas de generación piden response_format=json_object (LLM_JSON_MODE=0 lo desactiva).
+"""
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .llm_router import get_async_task_client, get_route
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "data" / "cv_schema_v1.json"
+
+# Enums del perfil que el template de ejemplo no puede expresar (path con [] por ítem de lista)
+CV_ENUMS = {
+    "experience[].facts[].myRole": ("owner", "contributor", "support"),
+    "experience[].technologies[].depth": ("architecture", "implementation", "basic"),
+    "skills.technical[].level": ("básico", "intermedio", "avanzado"),
+    "strategy.seniority": ("mid", "senior", "staff", ""),
+    "strategy.workMode": ("remoto", "híbrido", "presencial", ""),
+}
+DATE_FORMATS = {
+    "YYYY-MM-DD": re.compile(r"^\d{4}-\d{2}-\d{2}$"),
+    "YYYY-MM": re.compile(r"^(\d{4}(-\d{2})?|present)$", re.I),
+    "YYYY": re.compile(r"^\d{4}$"),
+}
+MAX_REPAIR_FRAGMENTS = 20
+
+REPAIR_SYNTAX_PROMPT = """Corregís JSON mal formado. Recibís un texto que debería ser un único objeto JSON y el error del parser.
+Devolvé ÚNICAMENTE el mismo JSON corregido (comillas, comas, llaves, escapes), sin cambiar, agregar ni quitar contenido. Sin markdown, sin explicaciones."""
+
+REPAIR_FRAGMENTS_PROMPT = """Corregís fragmentos de un JSON que no cumplen su schema. Recibís una lista de fragmentos con "path", "value" (valor actual), "errors" y "expected" (forma esperada, con valores de ejemplo y los valores permitidos de cada enum).
+Devolvé ÚNICAMENTE un JSON {"fragments": [{"path": ..., "value": ...}]} con el valor corregido de cada fragmento, en el mismo orden.
+Usá solo la información del valor actual: no inventes datos. Si un campo no se puede corregir, usá "", [], 0 o null."""
+
+_stats_lock = threading.Lock()
+_stats = {"ok": 0, "local_fixes": 0, "syntax_repairs": 0, "fragment_repairs": 0, "defaulted": 0, "failed": 0}
+
+
+def _count(counter: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[counter] += n
+
+
+def repair_stats() -> dict:
+    """Respuestas válidas de entrada, arregladas localmente, reparadas por el modelo o vaciadas."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def json_response_format() -> dict:
+    """Kwargs de JSON mode para chat.completions (vacío si LLM_JSON_MODE=0)."""
+    if os.environ.get("LLM_JSON_MODE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return {}
+    return {"response_format": {"type": "json_object"}}
+
+
+# --- Parseo tolerante ---
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _close_truncated(text: str) -> str:
+    """Cierra strings, objetos y listas abiertos (respuesta cortada por max_tokens)."""
+    stack, in_string, escaped = [], False, False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    closed = text + ('"' if in_string else "")
+    closed = re.sub(r",\s*$", "", closed.rstrip())
+    return closed + "".join(reversed(stack))
+
+
+def loads_lenient(raw: str) -> Any:
+    """json.loads con los arreglos locales de sintaxis. ValueError si no hay forma de parsearlo."""
+    text = (raw or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start > 0:
+        text = text[start:]
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        error = e
+    end = max(text.rfind("}"), text.rfind("]"))
+    candidates = [text[: end + 1]] if end > 0 else []
+    candidates.append(_close_truncated(text))
+    for candidate in candidates:
+        for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+            try:
+                return json.loads(attempt)
+            except ValueError:
+                continue
+    raise error
+
+
+# --- Validación ---
+
+JsonPath = Tuple[Any, ...]
+
+
+def format_path(path: JsonPath) -> str:
+    out = ""
+    for part in path:
+        out += f"[{part}]" if isinstance(part, int) else (f".{part}" if out else str(part))
+    return out or "$"
+
+
+class _Node:
+    """Nodo compilado del template: object, array, string, number, bool o any."""
+
+    __slots__ = ("kind", "fields", "item", "enum", "pattern", "example")
+
+    def __init__(self, kind: str, example: Any = None):
+        self.kind = kind
+        self.fields: Dict[str, "_Node"] = {}
+        self.item: "_Node | None" = None
+        self.enum: tuple | None = None
+        self.pattern: re.Pattern | None = None
+        self.example = example
+
+    def empty(self) -> Any:
+        return {"object": {}, "array": []}.get(self.kind)
+
+    def expected(self) -> Any:
+        """Forma esperada para el prompt de reparación."""
+        if self.kind == "object":
+            return {key: node.expected() for key, node in self.fields.items()}
+        if self.kind == "array":
+            return [self.item.expected()] if self.item is not None else []
+        if self.enum is not None:
+            return " | ".join(repr(v) for v in self.enum if v != "") + " | null"
+        return self.example
+
+
+def _compile(template: Any, enums: Dict[str, tuple], path: str) -> _Node:
+    if isinstance(template, dict):
+        node = _Node("object")
+        for key, value in template.items():
+            node.fields[key] = _compile(value, enums, f"{path}.{key}" if path else key)
+    elif isinstance(template, list):
+        node = _Node("array")
+        if template:
+            node.item = _compile(template[0], enums, f"{path}[]")
+    elif isinstance(template, bool):
+        node = _Node("bool", template)
+    elif isinstance(template, (int, float)):
+        node = _Node("number", template)
+    elif isinstance(template, str):
+        node = _Node("string", template)
+        node.pattern = DATE_FORMATS.get(template)
+    else:
+        node = _Node("any")
+    node.enum = enums.get(path)
+    return node
+
+
+def _coerce(node: _Node, value: Any) -> Tuple[Any, bool]:
+    """Arreglos locales obvios. Devuelve (valor, cambió)."""
+    if value is None or node.kind == "any":
+        return value, False
+    if node.kind == "array" and not isinstance(value, list):
+        if isinstance(value, (str, int, float)) and (node.item is None or node.item.kind != "object"):
+            return ([value] if value != "" else []), True
+    if node.kind == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value), True
+    if node.kind == "number" and isinstance(value, str):
+        try:
+            number = float(value.strip())
+            return (int(number) if number.is_integer() else number), True
+        except ValueError:
+            if value.strip() == "":
+                return None, True
+    if node.kind == "bool" and isinstance(value, str) and value.strip().lower() in ("true", "false", ""):
+        return value.strip().lower() == "true", True
+    if node.enum is not None and isinstance(value, str) and value not in node.enum:
+        for option in node.enum:
+            if option.lower() == value.strip().lower():
+                return option, True
+    return value, False
+
+
+def _type_ok(node: _Node, value: Any) -> bool:
+    if value is None or node.kind == "any":
+        return True
+    if node.kind == "object":
+        return isinstance(value, dict)
+    if node.kind == "array":
+        return isinstance(value, list)
+    if node.kind == "bool":
+        return isinstance(value, bool)
+    if node.kind == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    return isinstance(value, str)
+
+
+class Validator:
+    """Template compilado. validate() corrige localmente lo obvio y devuelve los errores que quedan."""
+
+    def __init__(self, root: _Node):
+        self.root = root
+
+    @classmethod
+    def from_template(cls, template: Any, enums: Dict[str, tuple] | None = None) -> "Validator":
+        return cls(_compile(template, enums or {}, ""))
+
+    def select(self, *keys: str) -> "Validator":
+        """Validador de un objeto con solo esas claves del nivel superior."""
+        node = _Node("object")
+        node.fields = {key: self.root.fields[key] for key in keys}
+        return Validator(node)
+
+    def item(self, key: str) -> "Validator":
+        """Validador de los ítems de la lista `key` (p. ej. una experiencia del perfil)."""
+        return Validator(self.root.fields[key].item)
+
+    def node_at(self, path: JsonPath) -> _Node:
+        node = self.root
+        for part in path:
+            node = node.item if isinstance(part, int) else node.fields[part]
+        return node
+
+    def validate(self, data: Any) -> Tuple[List[Tuple[JsonPath, str]], int]:
+        """(errores [(path, mensaje)], cantidad de arreglos locales). Muta data con los arreglos."""
+        errors: List[Tuple[JsonPath, str]] = []
+        fixes = 0
+
+        def walk(node: _Node, value: Any, path: JsonPath) -> Any:
+            nonlocal fixes
+            value, changed = _coerce(node, value)
+            fixes += changed
+            if not _type_ok(node, value):
+                errors.append((path, f"se esperaba {node.kind}, llegó {type(value).__name__}"))
+                return value
+            if value is None:
+                return value
+            if node.kind == "object":
+                for key, child in node.fields.items():
+                    if key in value:
+                        value[key] = walk(child, value[key], path + (key,))
+            elif node.kind == "array" and node.item is not None:
+                for i, element in enumerate(value):
+                    value[i] = walk(node.item, element, path + (i,))
+            elif node.enum is not None and value not in node.enum:
+                errors.append((path, f"valor fuera del enum {list(node.enum)}"))
+            elif node.pattern is not None and value and not node.pattern.match(value):
+                errors.append((path, f"formato esperado {node.example}"))
+            return value
+
+        if not isinstance(data, dict) and self.root.kind == "object":
+            return [((), "se esperaba un objeto JSON")], 0
+        walk(self.root, data, ())
+        return errors, fixes
+
+
+@lru_cache(maxsize=1)
+def cv_schema() -> dict:
+    """data/cv_schema_v1.json, leído en el primer uso (no al importar). No mutar."""
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def cv_validator() -> Validator:
+    """Validador del perfil, compilado una vez desde data/cv_schema_v1.json."""
+    return Validator.from_template(cv_schema(), CV_ENUMS)
+
+
+# --- Reparación dirigida ---
+
+
+def _get(data: Any, path: JsonPath) -> Any:
+    for part in path:
+        data = data[part]
+    return data
+
+
+def _set(data: Any, path: JsonPath, value: Any) -> Any:
+    if not path:
+        return value
+    _get(data, path[:-1])[path[-1]] = value
+    return data
+
+
+def _fragments(errors: List[Tuple[JsonPath, str]], validator: Validator) -> Dict[JsonPath, List[str]]:
+    """
+    Fragmentos a re-pedir: un escalar inválido se repara junto con su objeto padre (contexto
+    mínimo; en el nivel superior, solo el campo), el resto en su propio path. Se descartan
+    los fragmentos dentro de otro fragmento.
+    """
+    grouped: Dict[JsonPath, List[str]] = {}
+    for path, message in errors:
+        fragment = path
+        scalar = validator.node_at(path).kind not in ("object", "array")
+        if len(path) > 1 and scalar and not isinstance(path[-1], int):
+            fragment = path[:-1]
+        grouped.setdefault(fragment, []).append(f"{format_path(path)}: {message}")
+    paths = sorted(grouped, key=len)
+    kept = [p for i, p in enumerate(paths) if not any(p[: len(q)] == q for q in paths[:i])]
+    return {p: grouped[p] for p in kept[:MAX_REPAIR_FRAGMENTS]}
+
+
+def _repair_syntax_params(raw: str, error: ValueError) -> dict:
+    return dict(
+        model=get_route("repair").model,
+        messages=[
+            {"role": "system", "content": REPAIR_SYNTAX_PROMPT},
+            {"role": "user", "content": f"Error: {error}\n\nJSON:\n{raw}"},
+        ],
+        max_tokens=16000,
+        temperature=0,
+        **json_response_format(),
+    )
+
+
+def _repair_fragments_params(data: Any, fragments: Dict[JsonPath, List[str]], validator: Validator) -> dict:
+    payload = [
+        {
+            "path": format_path(path),
+            "value": _get(data, path),
+            "errors": messages,
+            "expected": validator.node_at(path).expected(),
+        }
+        for path, messages in fragments.items()
+    ]
+    return dict(
+        model=get_route("repair").model,
+        messages=[
+            {"role": "system", "content": REPAIR_FRAGMENTS_PROMPT},
+            {"role": "user", "content": json.dumps({"fragments": payload}, ensure_ascii=False)},
+        ],
+        max_tokens=4000,
+        temperature=0,
+        **json_response_format(),
+    )
+
+
+def _apply_fragments(data: Any, fragments: Dict[JsonPath, List[str]], raw_fix: str | None) -> Any:
+    """Parchea los fragmentos reparados sobre data (por path; si el modelo no lo repite, por posición)."""
+    try:
+        fixed = loads_lenient(raw_fix or "").get("fragments") or []
+    except (ValueError, AttributeError):
+        fixed = []
+    fixed = [item for item in fixed if isinstance(item, dict) and "value" in item]
+    by_path = {item.get("path"): item["value"] for item in fixed}
+    for i, path in enumerate(fragments):
+        key = format_path(path)
+        if key in by_path:
+            data = _set(data, path, by_path[key])
+        elif i < len(fixed) and "path" not in fixed[i]:
+            data = _set(data, path, fixed[i]["value"])
+    return data
+
+
+def _blank_invalid(data: Any, validator: Validator) -> Any:
+    """Último recurso: los valores que siguen inválidos quedan vacíos."""
+    errors, _ = validator.validate(data)
+    for path, _message in errors:
+        if not path:
+            continue
+        node = validator.node_at(path)
+        data = _set(data, path, node.empty())
+    _count("defaulted", len(errors))
+    return data
+
+
+def _has_root_error(errors: List[Tuple[JsonPath, str]]) -> bool:
+    return any(not path for path, _ in errors)
+
+
+def _first_pass(raw: str, validator: Validator) -> Tuple[Any, ValueError | None, Dict[JsonPath, List[str]]]:
+    """(data, error de sintaxis o None, fragmentos a reparar) sin llamar al modelo."""
+    try:
+        data = loads_lenient(raw)
+    except ValueError as e:
+        return None, e, {}
+    errors, fixes = validator.validate(data)
+    if _has_root_error(errors):
+        return None, ValueError(errors[0][1]), {}
+    if fixes:
+        _count("local_fixes")
+    elif not errors:
+        _count("ok")
+    return data, None, _fragments(errors, validator)
+
+
+def _second_pass(raw_fixed: str, validator: Validator) -> Tuple[Any, Dict[JsonPath, List[str]]]:
+    """Después de la reparación de sintaxis: si sigue sin ser un objeto JSON, ValueError."""
+    try:
+        data = loads_lenient(raw_fixed)
+    except ValueError:
+        _count("failed")
+        raise
+    errors, _ = validator.validate(data)
+    if _has_root_error(errors):
+        _count("failed")
+        raise ValueError("La respuesta del modelo no es un objeto JSON.")
+    return data, _fragments(errors, validator)
+
+
+async def aparse_structured(raw: str, validator: Validator, use_cache: bool = True) -> Any:
+    """Respuesta del modelo → dict validado, reparando con llamadas chicas al modelo de "repair"."""
+    from .llm_cache import acached_completion
+
+    data, syntax_error, fragments = _first_pass(raw, validator)
+    if syntax_error is not None:
+        _count("syntax_repairs")
+        fixed = await acached_completion(
+            get_async_task_client("repair"), use_cache=use_cache, **_repair_syntax_params(raw, syntax_error)
+        )
+        data, fragments = _second_pass(fixed, validator)
+    if fragments:
+        _count("fragment_repairs")
+        params = _repair_fragments_params(data, fragments, validator)
+        fix = await acached_completion(get_async_task_client("repair"), use_cache=use_cache, **params)
+        data = _blank_invalid(_apply_fragments(data, fragments, fix), validator)
+    return data
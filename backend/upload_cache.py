@@ -0,0 +1,158 @@
+"""
+Cache de resultados de uploads de CV, por hash de los bytes del archivo.
+
+Subir de nuevo el mismo PDF (el flujo normal: editar el perfil generado y volver a subirlo)
+devuelve el texto extraído, el perfil parseado y el perfil enriquecido sin volver a extraer
+ni llamar al LLM. Tres etapas por archivo:
+- "text": salida de extract_cv_text.
+- "parsed": salida de parse_cv_to_json (sin metadata.lastUpdated, que se estampa al servir).
+- "enriched": perfil parseado + enriquecido + normalizado.
+Las etapas que dependen del LLM se guardan por modelo (rutas parse y enrich de llm_router):
+cambiar de modelo o de proveedor no sirve resultados del anterior.
+
+SQLite en backend/.cache/upload_cache.sqlite3 (UPLOAD_CACHE_PATH), acotado por
+UPLOAD_CACHE_ENTRIES archivos con desalojo LRU. UPLOAD_CACHE=0 lo desactiva.
+Como en llm_cache, un hit no escribe en SQLite: el último acceso del archivo queda pendiente en
+memoria y se graba en el próximo set(), antes de desalojar.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_UPLOAD_CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "upload_cache.sqlite3"
+DEFAULT_UPLOAD_ENTRIES = 200
+STAGES = ("text", "parsed", "enriched")
+LLM_STAGES = ("parsed", "enriched")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def upload_hash(contents: bytes | bytearray) -> str:
+    """SHA-256 de los bytes subidos."""
+    return hashlib.sha256(contents).hexdigest()
+
+
+def _stage_key(stage: str) -> str:
+    if stage not in STAGES:
+        raise ValueError(f"Etapa desconocida: {stage}")
+    if stage not in LLM_STAGES:
+        return stage
+    from .llm_router import get_route
+
+    labels = [get_route("parse").label]
+    if stage == "enriched" and get_route("enrich").label not in labels:
+        labels.append(get_route("enrich").label)
+    return f"{stage}:{'+'.join(labels)}"
+
+
+class UploadCache:
+    """Resultados por (hash del archivo, etapa); LRU por archivo y contadores por etapa."""
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_UPLOAD_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._touched: dict[str, float] = {}  # accessed pendiente de grabar, por archivo
+        self._counters = {f"{stage}_{kind}": 0 for stage in STAGES for kind in ("hits", "misses")}
+        self._counters.update({"forced": 0, "stores": 0})
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                " hash TEXT NOT NULL, stage TEXT NOT NULL, value TEXT NOT NULL,"
+                " accessed REAL NOT NULL, PRIMARY KEY (hash, stage))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, digest: str, stage: str) -> Any | None:
+        """Resultado guardado de la etapa para ese archivo, o None."""
+        key = _stage_key(stage)
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT value FROM uploads WHERE hash = ? AND stage = ?", (digest, key)
+            ).fetchone()
+            if row is None:
+                self._counters[f"{stage}_misses"] += 1
+                return None
+            # La recencia es por archivo: usar cualquier etapa lo mantiene en el cache
+            self._touched[digest] = time.time()
+            self._counters[f"{stage}_hits"] += 1
+        return json.loads(row[0])
+
+    def set(self, digest: str, stage: str, value: Any) -> None:
+        key = _stage_key(stage)
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            db = self._db()
+            now = time.time()
+            self._touched.pop(digest, None)
+            if self._touched:
+                db.executemany(
+                    "UPDATE uploads SET accessed = ? WHERE hash = ?",
+                    [(accessed, h) for h, accessed in self._touched.items()],
+                )
+                self._touched.clear()
+            db.execute(
+                "INSERT OR REPLACE INTO uploads (hash, stage, value, accessed) VALUES (?, ?, ?, ?)",
+                (digest, key, payload, now),
+            )
+            db.execute("UPDATE uploads SET accessed = ? WHERE hash = ?", (now, digest))
+            db.execute(
+                "DELETE FROM uploads WHERE hash IN ("
+                " SELECT hash FROM uploads GROUP BY hash ORDER BY MAX(accessed) DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+            self._counters["stores"] += 1
+
+    def record_forced(self) -> None:
+        with self._lock:
+            self._counters["forced"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            db = self._db()
+            db.execute("DELETE FROM uploads")
+            db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            files = self._db().execute("SELECT COUNT(DISTINCT hash) FROM uploads").fetchone()[0]
+            return {**self._counters, "files": files, "max_entries": self.max_entries}
+
+
+_upload_cache: UploadCache | None = None
+_upload_cache_lock = threading.Lock()
+
+
+def get_upload_cache() -> UploadCache | None:
+    """Cache de uploads del proceso. None si UPLOAD_CACHE=0."""
+    global _upload_cache
+    if os.environ.get("UPLOAD_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _upload_cache_lock:
+        if _upload_cache is None:
+            path = os.environ.get("UPLOAD_CACHE_PATH", "").strip()
+            _upload_cache = UploadCache(
+                Path(path) if path else DEFAULT_UPLOAD_CACHE_PATH,
+                max_entries=_env_int("UPLOAD_CACHE_ENTRIES", DEFAULT_UPLOAD_ENTRIES),
+            )
+        return _upload_cache
@@ -25,7 +25,15 @@ def main():
         default=None,
         help="Ruta de salida (por defecto: perfil_enriched.json en el mismo directorio que el input)",
     )
-    parser.add_argument("--model", default="gpt-4o", help="Modelo OpenAI (default: gpt-4o)")
+    parser.add_argument(
+        "--model", default=None, help="Modelo (default: el de la ruta enrich, LLM_ROUTE_ENRICH u OPENAI_MODEL)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Experiencias enriquecidas en paralelo (default: ENRICH_CONCURRENCY o 4)",
+    )
     args = parser.parse_args()
 
     input_path = args.input_json.resolve()
@@ -43,7 +51,7 @@ def main():
         profile = json.load(f)
 
     try:
-        profile = enrich_profile(profile, model=args.model)
+        profile = enrich_profile(profile, model=args.model, concurrency=args.concurrency)
     except RuntimeError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,10 +1,21 @@
 import { useState, useEffect } from 'react'
 import ProfileResultView from './ProfileResultView'
 import ProfileSummary from './ProfileSummary'
+import { readEventStream } from './sse'
 import './App.css'
 
 const API = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
+// Una sesión por pestaña: el backend guarda el último JD de cada sesión (header X-Session-Id)
+const SESSION_ID = (() => {
+  const existing = sessionStorage.getItem('cvago-session-id')
+  if (existing) return existing
+  const id = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`
+  sessionStorage.setItem('cvago-session-id', id)
+  return id
+})()
+const JSON_HEADERS = { 'Content-Type': 'application/json', 'X-Session-Id': SESSION_ID }
+
 const STEPS = [
   { id: 1, label: 'Mi CV' },
   { id: 2, label: 'Posición' },
@@ -84,6 +95,7 @@ export default function App() {
   const [currentStep, setCurrentStep] = useState(1)
   const [profile, setProfile] = useState(null)
   const [jdSummary, setJdSummary] = useState('')
+  const [jdId, setJdId] = useState(null)
   const [pdfFilename, setPdfFilename] = useState(null)
   const [docxFilename, setDocxFilename] = useState(null)
   const [generateLoading, setGenerateLoading] = useState(false)
@@ -95,6 +107,7 @@ export default function App() {
 
   const resetAnalysisState = () => {
     setJdSummary('')
+    setJdId(null)
     setMatchResult(null)
     setCanGenerateCv(false)
   }
@@ -102,6 +115,7 @@ export default function App() {
 
   const [parseFile, setParseFile] = useState(null)
   const [parseAndEnrichLoading, setParseAndEnrichLoading] = useState(false)
+  const [parsePhase, setParsePhase] = useState('')
   const [parseError, setParseError] = useState(null)
   const [parsedJson, setParsedJson] = useState(null)
   const [saveLoading, setSaveLoading] = useState(false)
@@ -122,6 +136,7 @@ export default function App() {
     if (!jdPastedText.trim()) return
     setError(null)
     setJdSummary('')
+    setJdId(null)
     setMatchResult(null)
     setCanGenerateCv(false)
     setAnalysisLoading(true)
@@ -131,25 +146,37 @@ export default function App() {
     try {
       const controller = new AbortController()
       const timeoutId = setTimeout(() => controller.abort(), 60000)
-      const res = await fetch(`${API}/api/jd/summary`, {
+      const res = await fetch(`${API}/api/jd/summary/stream`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: JSON_HEADERS,
         body: JSON.stringify({ jd_text: jdPastedText.trim() }),
         signal: controller.signal,
       })
-      clearTimeout(timeoutId)
-      let data
-      try {
-        data = await res.json()
-      } catch (_) {
-        throw new Error('La respuesta del servidor no es válida. ¿El backend está corriendo?')
-      }
       if (!res.ok) {
+        clearTimeout(timeoutId)
+        let data
+        try {
+          data = await res.json()
+        } catch (_) {
+          throw new Error('La respuesta del servidor no es válida. ¿El backend está corriendo?')
+        }
         const msg = Array.isArray(data.detail) ? data.detail.map(d => d.msg || d).join(', ') : (data.detail || 'Error al obtener el resumen')
         throw new Error(msg)
       }
-      const summary = data.jd_summary != null ? String(data.jd_summary) : ''
-      setJdSummary(summary)
+      // El resumen se va mostrando a medida que llegan los tokens
+      let streamError = null
+      let storedJdId = null
+      await readEventStream(res, (event, data) => {
+        if (event === 'chunk') setJdSummary((prev) => prev + data.text)
+        else if (event === 'done') {
+          setJdSummary(data.jd_summary != null ? String(data.jd_summary) : '')
+          storedJdId = data.jd_id ?? null
+          setJdId(storedJdId)
+        }
+        else if (event === 'error') streamError = data.detail || 'Error al obtener el resumen'
+      })
+      clearTimeout(timeoutId)
+      if (streamError) throw new Error(streamError)
 
       // Phase 2: Match analysis (only if profile exists)
       if (profile) {
@@ -157,8 +184,9 @@ export default function App() {
         try {
           const matchRes = await fetch(`${API}/api/cv/match`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ profile, jd: jdPastedText.trim() }),
+            headers: JSON_HEADERS,
+            // El JD ya quedó guardado en el paso anterior: se referencia por jd_id
+            body: JSON.stringify(storedJdId ? { profile, jd_id: storedJdId } : { profile, jd: jdPastedText.trim() }),
           })
           const matchData = await matchRes.json()
           if (!matchRes.ok) throw new Error(matchData.detail || 'Error al analizar el match')
@@ -219,8 +247,8 @@ export default function App() {
     try {
       const res = await fetch(`${API}/api/adapt`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ language }),
+        headers: JSON_HEADERS,
+        body: JSON.stringify({ language, jd_id: jdId }),
       })
       const data = await res.json()
       if (!res.ok) throw new Error(data.detail || 'Error al generar el CV')
@@ -246,20 +274,52 @@ export default function App() {
     setParsedJson(null)
     setSaveSuccess(false)
     setParseAndEnrichLoading(true)
+    setParsePhase('Extrayendo texto…')
     try {
       const formData = new FormData()
       formData.append('file', file)
-      const res = await fetch(`${API}/api/cv/parse-and-enrich`, {
+      const res = await fetch(`${API}/api/cv/parse-and-enrich/stream`, {
         method: 'POST',
         body: formData,
       })
-      const data = await res.json()
-      if (!res.ok) throw new Error(typeof data.detail === 'string' ? data.detail : JSON.stringify(data.detail) || 'Error al parsear y enriquecer')
-      setParsedJson(data)
+      if (!res.ok) {
+        const data = await res.json()
+        throw new Error(typeof data.detail === 'string' ? data.detail : JSON.stringify(data.detail) || 'Error al parsear y enriquecer')
+      }
+      // Progreso por etapas: el perfil se muestra apenas se parsea y se completa a medida que
+      // se enriquece cada experiencia.
+      let total = 0
+      let enriched = 0
+      let streamError = null
+      await readEventStream(res, (event, data) => {
+        if (event === 'extracted') {
+          setParsePhase('Parseando CV…')
+        } else if (event === 'parsed') {
+          total = (data.profile.experience || []).length
+          setParsedJson(data.profile)
+          setParsePhase(total ? `Enriqueciendo experiencias (0/${total})…` : 'Completando estrategia…')
+        } else if (event === 'experience') {
+          enriched += 1
+          setParsedJson((prev) => {
+            if (!prev) return prev
+            const experience = [...(prev.experience || [])]
+            experience[data.index] = data.experience
+            return { ...prev, experience }
+          })
+          setParsePhase(enriched < total ? `Enriqueciendo experiencias (${enriched}/${total})…` : 'Completando estrategia…')
+        } else if (event === 'done') {
+          setParsedJson(data.profile)
+        } else if (event === 'error') {
+          streamError = data.detail || 'Error al parsear y enriquecer'
+        }
+      })
+      if (streamError) throw new Error(streamError)
     } catch (err) {
+      setParsedJson(null)
       setParseError(err.message)
     } finally {
       setParseAndEnrichLoading(false)
+      setParsePhase('')
     }
   }
 
@@ -339,7 +399,7 @@ export default function App() {
                 </label>
                 {parseAndEnrichLoading && (
                   <div className="flex items-center gap-2 text-sm text-blue-600 animate-pulse-soft shrink-0">
-                    <Spinner /> Parseando…
+                    <Spinner /> {parsePhase || 'Parseando…'}
                   </div>
                 )}
               </div>
@@ -358,7 +418,7 @@ export default function App() {
                     <h2 className="text-xl font-semibold text-gray-900">Resultado del parsing</h2>
                     <p className="text-sm text-gray-400 mt-0.5">Revisá y editá antes de guardar.</p>
                   </div>
-                  <button type="button" className="btn-scale px-5 py-2.5 rounded-xl bg-green-600 text-white text-sm font-medium hover:bg-green-700 disabled:opacity-50 disabled:cursor-not-allowed border-0 cursor-pointer" onClick={handleSaveProfile} disabled={saveLoading}>
+                  <button type="button" className="btn-scale px-5 py-2.5 rounded-xl bg-green-600 text-white text-sm font-medium hover:bg-green-700 disabled:opacity-50 disabled:cursor-not-allowed border-0 cursor-pointer" onClick={handleSaveProfile} disabled={saveLoading || parseAndEnrichLoading}>
                     {saveLoading ? 'Guardando…' : '✓ Guardar como perfil'}
                   </button>
                 </div>
@@ -0,0 +1,24 @@
+// Lee una respuesta Server-Sent Events de un fetch (EventSource no soporta POST).
+// Llama a onEvent(event, data) por cada evento, con data ya parseada como JSON.
+export async function readEventStream(res, onEvent) {
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let sep
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, sep)
+      buffer = buffer.slice(sep + 2)
+      let event = 'message'
+      const dataLines = []
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).replace(/^ /, ''))
+      }
+      if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')))
+    }
+  }
+}
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Load test del backend (CLI): levanta la API con uvicorn (en otro proceso) contra un servidor
+local que imita la API de OpenAI con una latencia fija, dispara N requests concurrentes a un
+endpoint y reporta throughput y latencias. No usa la API real ni gasta tokens.
+
+    python loadtest.py --endpoint match --requests 200 --concurrency 200 --llm-latency 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+MATCH_REPLY = {
+    "score": 80,
+    "seniority_detected": "match",
+    "reasons_for": ["Python y SQL en producción"],
+    "reasons_against": [],
+    "recommendation": "postularse",
+}
+CV_REPLY = {
+    "headline": "Data Engineer con foco en pipelines batch y streaming.",
+    "experience": [{
+        "company": "ACME", "officialTitle": "Data Engineer", "start": "2020-01", "end": "present",
+        "location": "", "description": "Pipelines en Airflow y SQL.",
+    }],
+    "education": [],
+    "skills_technical": ["Python", "SQL", "Airflow"],
+    "skills_soft": [],
+    "languages": ["Español (nativo)"],
+}
+PROFILE = {
+    "personal": {"firstName": "Ana"},
+    "skills": {"technical": [{"name": "Python"}, {"name": "SQL"}]},
+    "experience": [{"immutable": {"company": "ACME"}, "technologies": [{"name": "Airflow"}]}],
+}
+
+
+def _fake_openai_app(latency: float):
+    """
+    App ASGI mínima que responde chat.completions después de `latency` segundos (sin bloquear),
+    según el prompt de sistema: match, generación de CV o resumen. GET /models responde al instante.
+    """
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        if scope["method"] == "GET" and scope["path"].endswith("/models"):
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": b'{"object": "list", "data": []}'})
+            return
+        request = json.loads(body or b"{}")
+        await asyncio.sleep(latency)
+        system = "\n".join(
+            m.get("content") or "" for m in request.get("messages") or [] if m.get("role") == "system"
+        )
+        if "seniority_detected" in system:
+            content = json.dumps(MATCH_REPLY)
+        elif "Generás CVs" in system:
+            content = json.dumps(CV_REPLY)
+        else:
+            content = "Resumen de prueba."
+        reply = json.dumps({
+            "id": "chatcmpl-load",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        }).encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": reply})
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 30.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit("uvicorn terminó antes de arrancar")
+        try:
+            httpx.get(f"{base_url}/api/llm-cache/stats", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise SystemExit("uvicorn no respondió a tiempo")
+
+
+def _process_cpu_s(pid: int) -> float | None:
+    """CPU (user+sys) consumida por un proceso, desde /proc (Linux). None si no está disponible."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _request(endpoint: str, i: int) -> tuple[str, dict]:
+    jd = f"Oferta {i}: Data Engineer con Python, SQL y Airflow."
+    if endpoint == "match":
+        return "/api/cv/match", {"profile": PROFILE, "jd": jd}
+    return "/api/jd/summary", {"jd_text": jd}
+
+
+async def _run(base_url: str, endpoint: str, total: int, concurrency: int) -> dict:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+
+        async def one(i: int) -> None:
+            nonlocal errors
+            path, payload = _request(endpoint, i)
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    r = await client.post(path, json=payload)
+                    r.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_s": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_s": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None,
+        "max_s": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test de la API contra un LLM simulado.")
+    parser.add_argument("--endpoint", choices=("match", "summary"), default="match")
+    parser.add_argument("--requests", type=int, default=200, help="Requests totales (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests en vuelo (default: 200)")
+    parser.add_argument(
+        "--llm-latency", type=float, default=2.0, help="Latencia simulada del LLM en segundos (default: 2)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn (default: 1)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    fake_port = _free_port()
+    fake = uvicorn.Server(uvicorn.Config(
+        _fake_openai_app(args.llm_latency), port=fake_port, log_level="warning", backlog=4096
+    ))
+    threading.Thread(target=fake.run, daemon=True).start()
+    while not fake.started:
+        time.sleep(0.05)
+
+    # Todas las llamadas al LLM van al servidor simulado, sin cache
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "loadtest",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "LLM_CACHE": "0",
+        "PREMATCH_MIN_SCORE": "",
+    }
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "backend.main:app",
+            "--port", str(port), "--workers", str(args.workers), "--log-level", "warning",
+            "--backlog", "4096",
+        ],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base_url, server)
+        cpu_before = _process_cpu_s(server.pid)
+        result = asyncio.run(_run(base_url, args.endpoint, args.requests, args.concurrency))
+        cpu_after = _process_cpu_s(server.pid)
+        # CPU del proceso de la API por request: con --workers 1 marca el techo de throughput
+        # (1 / cpu) independientemente de la latencia del LLM
+        if cpu_before is not None and cpu_after is not None and args.workers == 1:
+            result["api_cpu_ms_per_request"] = round(1000 * (cpu_after - cpu_before) / args.requests, 2)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        fake.should_exit = True
+    result = {"endpoint": args.endpoint, "llm_latency_s": args.llm_latency, "workers": args.workers, **result}
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
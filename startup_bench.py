@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque (CLI): tiempo de import de backend.main en un proceso nuevo y latencia
+del primer request frente al segundo, con y sin warm-up (LLM_WARMUP). Usa el LLM simulado de
+loadtest.py, así que no gasta tokens.
+
+    python startup_bench.py --runs 3 --llm-latency 0.2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from loadtest import PROFILE, _fake_openai_app, _free_port, _wait_ready
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import backend.main; "
+    "print(time.perf_counter() - start)"
+)
+JD = "Data Engineer con Python, SQL y Airflow."
+
+
+def _import_time_s(runs: int) -> float:
+    """Mediana del tiempo de `import backend.main` en un intérprete nuevo (sin caches de módulos)."""
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True
+        )
+        times.append(float(out.stdout.strip()))
+    return round(statistics.median(times), 3)
+
+
+def _first_requests(env: dict, warm_up: bool) -> dict:
+    """Arranca la API, mide hasta que responde y la latencia de dos /api/cv/generate seguidos."""
+    import httpx
+
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**env, "LLM_WARMUP": "1" if warm_up else "0"},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base_url, server)
+        result = {"startup_s": round(time.perf_counter() - start, 3)}
+        for label in ("first_request_s", "second_request_s"):
+            t = time.perf_counter()
+            r = httpx.post(
+                f"{base_url}/api/cv/generate", json={"profile": PROFILE, "jd_text": JD}, timeout=120
+            )
+            r.raise_for_status()
+            result[label] = round(time.perf_counter() - t, 3)
+            for name in r.json().values():
+                # Los CVs de prueba no se guardan
+                path = os.path.join(os.path.dirname(__file__), "backend", "generated_cvs", name)
+                if os.path.exists(path):
+                    os.remove(path)
+        return result
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de import y latencia del primer request.")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones por medición (default: 3)")
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.2, help="Latencia simulada del LLM en segundos (default: 0.2)"
+    )
+    args = parser.parse_args()
+
+    import uvicorn
+
+    fake_port = _free_port()
+    fake = uvicorn.Server(uvicorn.Config(_fake_openai_app(args.llm_latency), port=fake_port, log_level="warning"))
+    threading.Thread(target=fake.run, daemon=True).start()
+    while not fake.started:
+        time.sleep(0.05)
+
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "startup-bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "LLM_CACHE": "0",
+        "CV_PDF_BACKEND": "native",
+    }
+    result = {"llm_latency_s": args.llm_latency, "import_backend_main_s": _import_time_s(args.runs)}
+    try:
+        for warm_up in (False, True):
+            runs = [_first_requests(env, warm_up) for _ in range(args.runs)]
+            result["warm_up" if warm_up else "cold"] = {
+                key: round(statistics.median(r[key] for r in runs), 3) for key in runs[0]
+            }
+    finally:
+        fake.should_exit = True
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
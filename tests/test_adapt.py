@@ -0,0 +1,100 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import cv_generator, jd_store, match_analyzer, profile_store, services
+from backend.jd_store import MemoryJDStore
+from backend.main import app
+from backend.profile_store import ProfileStore
+
+PROFILE = {"personal": {"firstName": "Ana"}, "experience": [{"raw": "Pipelines en Airflow."}]}
+JD = "Buscamos data engineer con Airflow y dbt."
+SESSION = {"X-Session-Id": "s1"}
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    """API con stores aislados y LLM/render simulados; devuelve las llamadas por tarea."""
+    calls = {"summarize": 0, "match": 0, "generate": 0, "use_cache": []}
+    store = ProfileStore(tmp_path / "profile.json")
+    store.save(PROFILE)
+    monkeypatch.setattr(profile_store, "_store", store)
+    monkeypatch.setattr(jd_store, "_store", MemoryJDStore())
+
+    async def summarize(raw_text, use_cache=True):
+        calls["summarize"] += 1
+        calls["use_cache"].append(use_cache)
+        return "Resumen de la JD"
+
+    async def match(profile, jd_text, min_score=None):
+        calls["match"] += 1
+        return {"score": 80}
+
+    async def generate(profile, jd_text, language="es", use_cache=True):
+        calls["generate"] += 1
+        calls["use_cache"].append(use_cache)
+        return "cv.pdf", "cv.docx"
+
+    monkeypatch.setattr(services, "summarize_jd_async", summarize)
+    monkeypatch.setattr(match_analyzer, "analyze_match_async", match)
+    monkeypatch.setattr(cv_generator, "generate_cv_pdf_and_docx_async", generate)
+    return calls
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_adapt_reuses_stored_summary_and_match(client, calls):
+    jd_id = client.post("/api/jd/summary", json={"jd_text": JD}, headers=SESSION).json()["jd_id"]
+    client.post("/api/cv/match", json={"profile": PROFILE, "jd_id": jd_id}, headers=SESSION)
+
+    response = client.post("/api/adapt", json={}, headers=SESSION)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["jd_summary"] == "Resumen de la JD"
+    assert body["match"] == {"score": 80}
+    assert (calls["summarize"], calls["match"], calls["generate"]) == (1, 1, 1)
+
+
+def test_match_for_another_profile_is_not_reused(client, calls):
+    client.post("/api/jd/summary", json={"jd_text": JD}, headers=SESSION)
+    client.post("/api/cv/match", json={"profile": {"personal": {"firstName": "Otra"}}, "jd": JD})
+
+    body = client.post("/api/adapt", json={}, headers=SESSION).json()
+
+    assert body["match"] is None
+    assert calls["summarize"] == 1
+
+
+def test_adapt_summarizes_when_nothing_is_stored(client, calls, monkeypatch):
+    async def fetch(url):
+        return JD, None
+
+    monkeypatch.setattr(services, "fetch_job_async", fetch)
+    body = client.post("/api/adapt", json={"job_url": "https://example.com/jd"}, headers=SESSION).json()
+
+    assert body["jd_summary"] == "Resumen de la JD"
+    assert (calls["summarize"], calls["match"], calls["generate"]) == (1, 0, 1)
+    # El resumen queda guardado: la segunda vez no se pide de nuevo
+    client.post("/api/adapt", json={}, headers=SESSION)
+    assert (calls["summarize"], calls["match"], calls["generate"]) == (1, 0, 2)
+
+
+def test_adapt_without_jd_is_rejected(client, calls):
+    response = client.post("/api/adapt", json={}, headers={"X-Session-Id": "nueva"})
+    assert response.status_code == 400
+
+
+def test_force_bypasses_the_llm_cache(client, calls, monkeypatch):
+    async def fetch(url):
+        return JD, None
+
+    monkeypatch.setattr(services, "fetch_job_async", fetch)
+    client.post("/api/adapt", json={"job_url": "https://example.com/jd"}, headers=SESSION)
+    client.post("/api/adapt?force=true", json={}, headers=SESSION)
+    client.post("/api/cv/generate?force=true", json={"profile": PROFILE, "jd_text": JD})
+
+    # summarize + generate del primer adapt; después solo generate (el resumen está guardado)
+    assert calls["use_cache"] == [True, True, False, False]
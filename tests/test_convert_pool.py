@@ -0,0 +1,170 @@
+import textwrap
+import threading
+import time
+
+import pytest
+
+from backend import convert_pool
+from backend.convert_pool import ConverterPool
+
+# Worker con el protocolo de convert_worker.py que "convierte" copiando el archivo.
+# src "hang" no responde nunca; src "crash" termina el proceso.
+FAKE_WORKER = textwrap.dedent("""
+    import json, shutil, sys, time
+
+    def reply(**payload):
+        print(json.dumps(payload), flush=True)
+
+    reply(ok=True, ready=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        if job["op"] == "ping":
+            reply(ok=True)
+        elif job["src"].endswith("hang"):
+            time.sleep(60)
+        elif job["src"].endswith("crash"):
+            sys.exit(1)
+        elif job["src"].endswith("fail"):
+            reply(ok=False, error="archivo dañado")
+        else:
+            shutil.copyfile(job["src"], job["dst"])
+            reply(ok=True)
+""")
+
+
+@pytest.fixture
+def make_pool(tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    monkeypatch.setattr(convert_pool, "WORKER_SCRIPT", script)
+    pools = []
+
+    def make(**kwargs):
+        pools.append(ConverterPool(**kwargs))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def _docx(tmp_path, name="cv.docx"):
+    path = tmp_path / name
+    path.write_bytes(b"docx")
+    return path
+
+
+def test_converts_and_reports_metrics(make_pool, tmp_path):
+    pool = make_pool(size=1)
+    for i in range(3):
+        pool.convert(_docx(tmp_path), tmp_path / f"cv{i}.pdf")
+
+    assert (tmp_path / "cv2.pdf").read_bytes() == b"docx"
+    metrics = pool.metrics()
+    assert (metrics["jobs"], metrics["failures"], metrics["recycled"]) == (3, 0, 0)
+    assert metrics["avg_ms"] is not None
+
+
+def test_workers_are_recycled_after_max_jobs(make_pool, tmp_path):
+    pool = make_pool(size=1, max_jobs_per_worker=2)
+    for i in range(5):
+        pool.convert(_docx(tmp_path), tmp_path / f"cv{i}.pdf")
+
+    assert pool.metrics()["recycled"] == 2
+
+
+def test_failed_conversion_keeps_the_worker(make_pool, tmp_path):
+    pool = make_pool(size=1)
+    with pytest.raises(RuntimeError, match="archivo dañado"):
+        pool.convert(_docx(tmp_path, "cv.fail"), tmp_path / "cv.pdf")
+
+    pool.convert(_docx(tmp_path), tmp_path / "cv.pdf")
+    assert pool.metrics()["recycled"] == 0
+
+
+@pytest.mark.parametrize("src, counter", [("cv.hang", "timeouts"), ("cv.crash", "failures")])
+def test_stuck_or_dead_worker_is_replaced(make_pool, tmp_path, src, counter):
+    pool = make_pool(size=1, job_timeout=0.5)
+    with pytest.raises(RuntimeError):
+        pool.convert(_docx(tmp_path, src), tmp_path / "cv.pdf")
+
+    pool.convert(_docx(tmp_path), tmp_path / "cv.pdf")
+    metrics = pool.metrics()
+    assert (metrics[counter], metrics["recycled"], metrics["jobs"]) == (1, 1, 1)
+
+
+def test_full_queue_rejects(make_pool, tmp_path):
+    pool = make_pool(size=1, queue_size=0, job_timeout=1)
+    hang = _docx(tmp_path, "cv.hang")
+    busy = threading.Thread(
+        target=lambda: pytest.raises(RuntimeError, pool.convert, hang, tmp_path / "x.pdf")
+    )
+    busy.start()
+    try:
+        while pool.metrics()["busy"] == 0:
+            time.sleep(0.01)
+        with pytest.raises(RuntimeError, match="llena"):
+            pool.convert(_docx(tmp_path), tmp_path / "cv.pdf")
+        assert pool.metrics()["rejected"] == 1
+    finally:
+        busy.join()
+
+
+def _count_pings(monkeypatch):
+    pings = []
+    healthy = convert_pool._Worker.healthy
+    monkeypatch.setattr(convert_pool._Worker, "healthy", lambda self: pings.append(1) or healthy(self))
+    return pings
+
+
+def test_recently_used_worker_is_not_pinged(make_pool, tmp_path, monkeypatch):
+    pool = make_pool(size=1)
+    pings = _count_pings(monkeypatch)
+    for i in range(3):
+        pool.convert(_docx(tmp_path), tmp_path / f"cv{i}.pdf")
+
+    assert pings == []
+
+
+def test_idle_or_failed_worker_is_pinged_before_the_next_job(make_pool, tmp_path, monkeypatch):
+    pool = make_pool(size=1)
+    pings = _count_pings(monkeypatch)
+    with pytest.raises(RuntimeError):
+        pool.convert(_docx(tmp_path, "cv.fail"), tmp_path / "cv.pdf")
+    pool.convert(_docx(tmp_path), tmp_path / "cv.pdf")
+    assert len(pings) == 1
+
+    monkeypatch.setattr(convert_pool, "IDLE_CHECK_SECONDS", 0)
+    pool.convert(_docx(tmp_path), tmp_path / "cv.pdf")
+    assert len(pings) == 2
+
+
+def _break_spawns(tmp_path, monkeypatch):
+    broken = tmp_path / "broken_worker.py"
+    broken.write_text("import sys; sys.exit(1)\n", encoding="utf-8")
+    monkeypatch.setattr(convert_pool, "WORKER_SCRIPT", broken)
+
+
+def test_failed_respawn_shrinks_the_pool(make_pool, tmp_path, monkeypatch):
+    pool = make_pool(size=1, job_timeout=0.5)
+    _break_spawns(tmp_path, monkeypatch)
+
+    with pytest.raises(RuntimeError, match="se cayó"):
+        pool.convert(_docx(tmp_path, "cv.crash"), tmp_path / "cv.pdf")
+
+    metrics = pool.metrics()
+    assert (metrics["workers"], metrics["spawn_failures"], metrics["recycled"]) == (0, 1, 0)
+    assert pool._idle.empty()
+    with pytest.raises(RuntimeError, match="No hay workers"):
+        pool.convert(_docx(tmp_path), tmp_path / "cv.pdf")
+
+
+def test_failed_recycle_keeps_the_working_worker(make_pool, tmp_path, monkeypatch):
+    pool = make_pool(size=1, max_jobs_per_worker=1)
+    _break_spawns(tmp_path, monkeypatch)
+
+    pool.convert(_docx(tmp_path), tmp_path / "cv1.pdf")
+    pool.convert(_docx(tmp_path), tmp_path / "cv2.pdf")
+
+    metrics = pool.metrics()
+    assert (metrics["workers"], metrics["jobs"], metrics["recycled"]) == (1, 2, 0)
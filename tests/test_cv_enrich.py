@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+
+from backend import cv_enrich
+from backend.cv_enrich import enrich_profile_async, experience_hash, iter_enrich_profile, strategy_hash
+
+ENRICHED = {
+    "facts": [{"what": "Migró el warehouse", "metric": None, "scope": "equipo", "myRole": "owner"}],
+    "capabilities": [{"name": "Orquestación", "evidence": ["Airflow"]}],
+    "technologies": [
+        {
+            "name": "Airflow",
+            "yearsInThisRole": 2,
+            "usedInProduction": True,
+            "depth": "implementation",
+            "contexts": [],
+        }
+    ],
+    "leadershipSignals": {
+        "mentored": 0, "ledProjects": True, "hiringInvolvement": False, "crossFunctional": False
+    },
+    "relevanceTags": ["data"],
+}
+STRATEGY = {
+    "constraints": {},
+    "strategy": {
+        "targetRoles": ["Data Engineer"],
+        "avoidRoles": [],
+        "seniority": "senior",
+        "workMode": "remoto",
+        "industries": [],
+    },
+}
+
+
+def _profile() -> dict:
+    return {
+        "personal": {"firstName": "Ana"},
+        "experience": [
+            {"immutable": {"company": "ACME"}, "raw": "Pipelines en Airflow."},
+            {"immutable": {"company": "Globex"}, "raw": "Reportes en SQL."},
+        ],
+    }
+
+
+@pytest.fixture
+def enrich_llm(monkeypatch):
+    """Modelo de enrich simulado: registra qué experiencia (raw) se pidió y si hubo strategy."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    state = {"calls": [], "fail": set(), "in_flight": 0, "max_in_flight": 0}
+
+    async def fake_completion(client, *, use_cache=True, **params):
+        system = params["messages"][0]["content"]
+        if system == cv_enrich.CONSTRAINTS_STRATEGY_SYSTEM:
+            state["calls"].append("strategy")
+            return json.dumps(STRATEGY)
+        raw = json.loads(params["messages"][1]["content"])["raw"]
+        state["calls"].append(raw)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        if raw in state["fail"]:
+            raise RuntimeError("timeout")
+        return json.dumps(ENRICHED)
+
+    monkeypatch.setattr(cv_enrich, "acached_completion", fake_completion)
+    return state
+
+
+def _enrich(profile: dict, **kwargs) -> dict:
+    return asyncio.run(enrich_profile_async(profile, **kwargs))
+
+
+def test_experience_hash_tracks_only_the_enrichment_input():
+    exp = {"immutable": {"company": "ACME"}, "context": {}, "raw": "Pipelines."}
+    base = experience_hash(exp)
+
+    assert experience_hash({**exp, "facts": [{"what": "x"}]}) == base
+    assert experience_hash({**exp, "raw": "Pipelines y dashboards."}) != base
+    assert experience_hash({**exp, "immutable": {"company": "Globex"}}) != base
+
+
+def test_strategy_hash_ignores_the_sections_it_fills():
+    profile = _profile()
+    base = strategy_hash(profile)
+
+    assert strategy_hash({**profile, "strategy": {"seniority": "senior"}, "constraints": {"x": 1}}) == base
+    assert strategy_hash({**profile, "skills": {"technical": [{"name": "Go"}]}}) != base
+
+
+def test_first_enrichment_records_hashes(enrich_llm):
+    result = _enrich(_profile())
+
+    assert sorted(enrich_llm["calls"]) == ["Pipelines en Airflow.", "Reportes en SQL.", "strategy"]
+    assert result["experience"][0]["relevanceTags"] == ["data"]
+    enrichment = result["metadata"]["enrichment"]
+    assert enrichment["experience"] == [experience_hash(e) for e in result["experience"]]
+    assert enrichment["strategy"] == strategy_hash(result)
+
+
+def test_unchanged_profile_makes_no_calls(enrich_llm):
+    first = _enrich(_profile())
+    enrich_llm["calls"].clear()
+
+    second = _enrich(first)
+
+    assert enrich_llm["calls"] == []
+    assert second["experience"] == first["experience"]
+
+
+def test_only_edited_experience_is_re_enriched(enrich_llm):
+    first = _enrich(_profile())
+    first["experience"][1]["raw"] = "Reportes en SQL y dashboards en Looker."
+    enrich_llm["calls"].clear()
+
+    events = asyncio.run(_events(first))
+
+    assert enrich_llm["calls"] == ["Reportes en SQL y dashboards en Looker.", "strategy"]
+    skipped = [p["index"] for e, p in events if e == "experience" and p["skipped"]]
+    assert skipped == [0]
+
+
+def test_failed_experience_is_retried_next_time(enrich_llm):
+    enrich_llm["fail"].add("Reportes en SQL.")
+    first = _enrich(_profile())
+    assert len(first["metadata"]["enrichment"]["experience"]) == 1
+
+    enrich_llm["fail"].clear()
+    enrich_llm["calls"].clear()
+    _enrich(first)
+
+    assert enrich_llm["calls"] == ["Reportes en SQL."]
+
+
+async def _events(profile: dict) -> list:
+    return [event async for event in iter_enrich_profile(profile)]
+
+
+def _many(n: int) -> dict:
+    profile = _profile()
+    profile["experience"] = [{"immutable": {"company": f"E{i}"}, "raw": f"Rol {i}."} for i in range(n)]
+    return profile
+
+
+def test_experiences_run_concurrently_up_to_the_limit(enrich_llm):
+    result = _enrich(_many(6), concurrency=2)
+
+    assert enrich_llm["max_in_flight"] == 2
+    # El resultado conserva el orden de las experiencias aunque terminen en otro orden
+    assert [e["immutable"]["company"] for e in result["experience"]] == [f"E{i}" for i in range(6)]
+    assert all(e["relevanceTags"] == ["data"] for e in result["experience"])
+
+
+def test_concurrency_from_env(enrich_llm, monkeypatch):
+    monkeypatch.setenv("ENRICH_CONCURRENCY", "3")
+    _enrich(_many(6))
+
+    assert enrich_llm["max_in_flight"] == 3
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from backend.cv_parser import parse_cv_to_json_async
+from backend.cv_sections import split_roles, split_sections
+from backend.structured_output import cv_schema
+
+CV_TEXT = """Ana Pérez
+ana@example.com
+
+PERFIL
+Data engineer con foco en plataformas de datos.
+
+EXPERIENCIA
+Data Engineer
+ACME
+03/2021 - Presente
+- Pipelines en Airflow y dbt.
+
+Analista de Datos
+Globex
+2018 - 2021
+- Reportes en SQL.
+
+EDUCACIÓN
+Ingeniería en Sistemas, UBA
+
+IDIOMAS
+Inglés avanzado
+"""
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setenv("LLM_CACHE", "0")
+
+
+def test_split_sections_finds_roles_and_sections():
+    sections = split_sections(CV_TEXT)
+
+    assert "Ana Pérez" in sections["header"]
+    assert "plataformas de datos" in sections["summary"]
+    roles = [block.split("\n")[0] for block in sections["experience"]]
+    assert roles == ["Data Engineer", "Analista de Datos"]
+    assert "UBA" in sections["education"]
+    assert "Inglés" in sections["languages"]
+
+
+def test_split_roles_keeps_text_literal():
+    experience = CV_TEXT.split("EXPERIENCIA\n")[1].split("\nEDUCACIÓN")[0]
+
+    assert "\n".join(split_roles(experience)).split() == experience.split()
+
+
+def test_parsed_constraints_are_a_copy_of_the_schema(stub_llm):
+    schema_constraints = repr(cv_schema()["constraints"])
+
+    first = asyncio.run(parse_cv_to_json_async(CV_TEXT))
+    assert len(first["experience"]) == 2
+    assert first["constraints"] == cv_schema()["constraints"]
+    first["constraints"].clear()
+
+    second = asyncio.run(parse_cv_to_json_async(CV_TEXT))
+    assert second["constraints"] and second["constraints"] is not first["constraints"]
+    assert repr(cv_schema()["constraints"]) == schema_constraints
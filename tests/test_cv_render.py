@@ -0,0 +1,69 @@
+import asyncio
+
+import pdfplumber
+import pytest
+from docx import Document
+
+from backend import cv_generator
+from backend.cv_generator import _pdf_backend, generate_cv_pdf_and_docx_async, render_cv_files
+
+PROFILE = {"personal": {"firstName": "Ana", "lastName": "Pérez", "email": "ana@example.com"}}
+CONTENT = {
+    "headline": "Data engineer en R&D <core>",
+    "experience": [
+        {"company": "ACME", "officialTitle": "Lead", "start": "2022-03", "end": "present",
+         "description": "Lideró la migración."},
+        {"company": "ACME", "officialTitle": "Engineer", "start": "2020-01", "end": "2022-02"},
+    ],
+    "education": [{"degree": "Ingeniería", "institution": "UBA", "year": "2019"}],
+    "skills_technical": ["Python", "dbt"],
+    "skills_soft": [],
+    "languages": "Inglés C1",
+}
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv_generator, "OUTPUT_DIR", tmp_path)
+    monkeypatch.delenv("CV_PDF_BACKEND", raising=False)
+    return tmp_path
+
+
+def _pdf_text(path) -> str:
+    with pdfplumber.open(path) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def test_native_render_writes_both_files(output_dir):
+    pdf_name, docx_name = render_cv_files(CONTENT, PROFILE, "es", "cv_test", "native")
+
+    assert (pdf_name, docx_name) == ("cv_test.pdf", "cv_test.docx")
+    text = _pdf_text(output_dir / pdf_name)
+    assert "Ana Pérez" in text
+    assert "R&D <core>" in text
+    assert "ACME – 2020 - Present" in text
+    assert "Lead | Marzo 2022 – Presente:" in text
+    assert "Técnicas: Python, dbt" in text
+
+    docx_text = "\n".join(p.text for p in Document(output_dir / docx_name).paragraphs)
+    assert "R&D <core>" in docx_text
+
+
+def test_pdf_backend_selection(monkeypatch):
+    monkeypatch.delenv("CV_PDF_BACKEND", raising=False)
+    assert _pdf_backend(None) == "native"
+    monkeypatch.setenv("CV_PDF_BACKEND", "DOCX2PDF")
+    assert _pdf_backend(None) == "docx2pdf"
+    with pytest.raises(RuntimeError):
+        _pdf_backend("latex")
+
+
+def test_generate_with_stub_llm(output_dir, monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setenv("LLM_CACHE", "0")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    pdf_name, docx_name = asyncio.run(generate_cv_pdf_and_docx_async(PROFILE, "JD", base_name="cv_stub"))
+
+    assert (output_dir / pdf_name).stat().st_size > 0
+    assert (output_dir / docx_name).stat().st_size > 0
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.extractors import extract_cv_text
+from backend.main import app
+
+
+def _docx_bytes(*paragraphs: str) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _pdf_bytes(text: str) -> bytes:
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    pdf = canvas.Canvas(buf)
+    pdf.drawString(72, 720, text)
+    pdf.save()
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview, io.BytesIO])
+def test_extracts_from_memory(wrap):
+    assert extract_cv_text(wrap("Ana Pérez\n".encode("utf-8")), "cv.txt") == "Ana Pérez"
+    assert extract_cv_text(wrap(_docx_bytes("Ana Pérez", "", "Data Engineer")), "CV.DOCX") == (
+        "Ana Pérez\n\nData Engineer"
+    )
+    pdf = _pdf_bytes("Ana Perez - Data Engineer")
+    assert extract_cv_text(wrap(pdf), "cv.pdf") == "Ana Perez - Data Engineer"
+
+
+def test_extracts_from_path(tmp_path):
+    path = tmp_path / "cv.txt"
+    path.write_bytes(b"Ana \xff Perez")
+
+    assert extract_cv_text(path) == "Ana � Perez"
+    assert extract_cv_text(str(path)) == "Ana � Perez"
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        extract_cv_text(b"...", "cv.rtf")
+
+
+def test_upload_rejects_bad_extension_and_oversized_files(monkeypatch):
+    monkeypatch.setenv("CV_MAX_UPLOAD_MB", "0.001")
+    client = TestClient(app)
+
+    response = client.post("/api/cv/parse", files={"file": ("cv.rtf", b"texto")})
+    assert response.status_code == 400
+
+    response = client.post("/api/cv/parse", files={"file": ("cv.txt", b"x" * 2048)})
+    assert response.status_code == 413
@@ -0,0 +1,61 @@
+from backend.html_extract import extract_main_text, html_to_text
+
+PARAGRAPH = (
+    "En este rol vas a diseñar pipelines de datos, mantener el data warehouse, trabajar con "
+    "producto, analytics y finanzas, y definir estándares de calidad, testing y observabilidad."
+)
+
+PAGE = f"""
+<html><head><title>Oferta</title><style>.x{{color:red}}</style></head>
+<body>
+  <div id="cookie-banner">Usamos cookies para mejorar tu experiencia. Aceptar todas.</div>
+  <nav><a href="/">Inicio</a><a href="/jobs">Empleos</a></nav>
+  <h1>Senior Data Engineer</h1>
+  <div class="job-description">
+    <p>{PARAGRAPH}</p>
+    <p>{PARAGRAPH}</p>
+    <ul><li>Python, SQL y Airflow en producción, con experiencia en dbt</li>
+        <li>Experiencia con Spark, Kafka o herramientas de streaming</li></ul>
+  </div>
+  <div class="related-jobs"><p>Otras ofertas: Analista, Backend, QA, Data Scientist.</p></div>
+  <footer>© 2026 Empresa. Todos los derechos reservados.</footer>
+  <script>window.tracking = true;</script>
+</body></html>
+"""
+
+
+def test_main_content_keeps_the_job_and_drops_boilerplate():
+    text = extract_main_text(PAGE)
+
+    assert text.startswith("Senior Data Engineer\n")
+    assert PARAGRAPH in text
+    assert "Python, SQL y Airflow en producción, con experiencia en dbt" in text
+    for boilerplate in ("cookies", "Inicio", "Otras ofertas", "derechos reservados", "tracking", "color:red"):
+        assert boilerplate not in text
+
+
+def test_blocks_become_lines_and_spaces_collapse():
+    text = extract_main_text(PAGE)
+
+    assert f"{PARAGRAPH}\n{PARAGRAPH}" in text
+    assert "  " not in text
+
+
+def test_page_without_clear_container_returns_all_text():
+    html = "<body><p>Buscamos Data Engineer.</p><p>Remoto.</p><nav>Menú</nav></body>"
+
+    assert extract_main_text(html) == "Buscamos Data Engineer.\nRemoto."
+
+
+def test_max_chars_caps_the_output():
+    assert len(extract_main_text(PAGE, max_chars=50)) == 50
+
+
+def test_html_to_text_drops_nothing_readable():
+    html = (
+        '<div class="banner"><p>Intro de la empresa.</p></div><h3>Requisitos</h3>'
+        "<ul><li>Python</li><li>SQL</li></ul><footer>Beneficios: remoto.</footer>"
+        "<script>var x = 1;</script>"
+    )
+
+    assert html_to_text(html) == "Intro de la empresa.\nRequisitos\nPython\nSQL\nBeneficios: remoto."
@@ -0,0 +1,136 @@
+import asyncio
+
+import httpx
+import pytest
+
+from backend import http_fetch
+from backend.http_fetch import PageCache, fetch_page, freshness
+
+URL = "https://jobs.example.com/oferta/1"
+
+
+class Origin:
+    """Servidor de prueba: responde con la lista de respuestas y registra los requests."""
+
+    def __init__(self, *responses: httpx.Response):
+        self.responses = list(responses)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def page_cache(tmp_path, monkeypatch):
+    cache = PageCache(tmp_path / "pages.sqlite3", max_age=600)
+    monkeypatch.setenv("PAGE_CACHE", "1")
+    monkeypatch.setattr(http_fetch, "_page_cache", cache)
+    monkeypatch.setattr(http_fetch, "BACKOFF_BASE", 0.0)
+    monkeypatch.setenv("HTTP_FETCH_RETRIES", "2")
+    return cache
+
+
+def _fetch(origin: Origin, monkeypatch) -> str:
+    async def run() -> str:
+        state = http_fetch._LoopClient()
+        await state.client.aclose()
+        state.client = httpx.AsyncClient(transport=httpx.MockTransport(origin))
+        monkeypatch.setattr(http_fetch, "_loop_client", lambda: state)
+        try:
+            return await fetch_page(URL)
+        finally:
+            await state.client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_freshness_follows_cache_control():
+    assert freshness(httpx.Headers({}), 600) == 600
+    assert freshness(httpx.Headers({"Cache-Control": "public, max-age=30"}), 600) == 30
+    assert freshness(httpx.Headers({"Cache-Control": "no-cache"}), 600) == 0
+    assert freshness(httpx.Headers({"Cache-Control": "private, no-store"}), 600) is None
+
+
+def test_fresh_page_is_served_without_network(page_cache, monkeypatch):
+    origin = Origin(httpx.Response(200, text="<p>oferta</p>"))
+
+    assert _fetch(origin, monkeypatch) == "<p>oferta</p>"
+    assert _fetch(origin, monkeypatch) == "<p>oferta</p>"
+    assert len(origin.requests) == 1
+    assert page_cache.stats()["fresh_hits"] == 1
+
+
+def test_stale_page_is_revalidated_with_304(page_cache, monkeypatch):
+    origin = Origin(
+        httpx.Response(200, text="<p>oferta</p>", headers={"ETag": '"v1"', "Cache-Control": "no-cache"}),
+        httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "no-cache"}),
+    )
+
+    _fetch(origin, monkeypatch)
+    assert _fetch(origin, monkeypatch) == "<p>oferta</p>"
+    assert origin.requests[1].headers["If-None-Match"] == '"v1"'
+    assert page_cache.stats()["revalidated"] == 1
+
+
+def test_short_max_age_expires(page_cache, monkeypatch):
+    origin = Origin(
+        httpx.Response(200, text="v1", headers={"Cache-Control": "max-age=0"}),
+        httpx.Response(200, text="v2"),
+    )
+
+    assert _fetch(origin, monkeypatch) == "v1"
+    assert _fetch(origin, monkeypatch) == "v2"
+    assert len(origin.requests) == 2
+
+
+def test_no_store_is_not_cached(page_cache, monkeypatch):
+    origin = Origin(
+        httpx.Response(200, text="v1", headers={"Cache-Control": "no-store"}),
+        httpx.Response(200, text="v2", headers={"Cache-Control": "no-store"}),
+    )
+
+    _fetch(origin, monkeypatch)
+    assert _fetch(origin, monkeypatch) == "v2"
+    assert "If-None-Match" not in origin.requests[1].headers
+    assert page_cache.get(URL) is None
+
+
+def test_retries_server_errors(page_cache, monkeypatch):
+    origin = Origin(httpx.Response(503), httpx.Response(502), httpx.Response(200, text="ok"))
+
+    assert _fetch(origin, monkeypatch) == "ok"
+    assert len(origin.requests) == 3
+
+
+def test_does_not_retry_client_errors(page_cache, monkeypatch):
+    origin = Origin(httpx.Response(404), httpx.Response(200, text="no debería pedirse"))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _fetch(origin, monkeypatch)
+    assert len(origin.requests) == 1
+
+
+def test_gives_up_after_retries(page_cache, monkeypatch):
+    origin = Origin(*(httpx.Response(500) for _ in range(3)))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _fetch(origin, monkeypatch)
+    assert len(origin.requests) == 3
+
+
+def test_old_cache_without_max_age_column(tmp_path):
+    import sqlite3
+    import time
+
+    path = tmp_path / "pages.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE pages (url TEXT PRIMARY KEY, body TEXT NOT NULL, etag TEXT, last_modified TEXT,"
+        " fetched REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO pages VALUES (?, 'viejo', NULL, NULL, ?)", (URL, time.time()))
+    conn.commit()
+    conn.close()
+
+    assert PageCache(path, max_age=600).get(URL)["fresh"]
@@ -0,0 +1,120 @@
+import pytest
+
+from backend.jd_store import MemoryJDStore, SQLiteJDStore, jd_hash, profile_key
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(max_entries: int = 200):
+        if request.param == "memory":
+            return MemoryJDStore(max_entries)
+        return SQLiteJDStore(tmp_path / "jd_store.sqlite3", max_entries)
+
+    return make
+
+
+def test_jd_id_is_the_text_hash(make_store):
+    store = make_store()
+
+    jd_id = store.put("Data Engineer con Python", "s1", source_url="https://jobs/1")
+
+    assert jd_id == jd_hash("Data Engineer con Python")
+    record = store.get(jd_id)
+    assert record["raw_text"] == "Data Engineer con Python"
+    assert record["source_url"] == "https://jobs/1"
+
+
+def test_put_same_text_keeps_artifacts(make_store):
+    store = make_store()
+    jd_id = store.put("texto", "s1")
+    store.update(jd_id, summary="resumen", match={"profile": "p", "report": {"score": 80}})
+
+    assert store.put("texto", "s2") == jd_id
+    record = store.get(jd_id)
+    assert record["summary"] == "resumen"
+    assert record["match"]["report"]["score"] == 80
+
+
+def test_sessions_do_not_overwrite_each_other(make_store):
+    store = make_store()
+    store.put("oferta A", "pestaña-1")
+    store.put("oferta B", "pestaña-2")
+
+    assert store.last_for_session("pestaña-1")["raw_text"] == "oferta A"
+    assert store.last_for_session("pestaña-2")["raw_text"] == "oferta B"
+    assert store.last_for_session("otra") is None
+    store.put("oferta C")
+    assert store.last_for_session(None)["raw_text"] == "oferta C"
+
+
+def test_update_unknown_id_is_a_no_op(make_store):
+    store = make_store()
+
+    store.update("no-existe", summary="x")
+
+    assert store.get("no-existe") is None
+
+
+def test_least_recently_used_jd_is_evicted(make_store):
+    store = make_store(max_entries=2)
+    first = store.put("uno")
+    second = store.put("dos")
+    store.get(first)  # uno pasa a ser el más reciente
+    store.put("tres")
+
+    assert store.get(second) is None
+    assert store.get(first) is not None
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = tmp_path / "jd_store.sqlite3"
+    jd_id = SQLiteJDStore(path).put("oferta", "s1")
+
+    other = SQLiteJDStore(path)
+    assert other.get(jd_id)["raw_text"] == "oferta"
+    assert other.last_for_session("s1")["jd_id"] == jd_id
+
+
+def test_profile_key_ignores_key_order():
+    a = {"personal": {"firstName": "Ana", "lastName": "P"}, "experience": []}
+    b = {"experience": [], "personal": {"lastName": "P", "firstName": "Ana"}}
+
+    assert profile_key(a) == profile_key(b)
+    assert profile_key(a) != profile_key({**a, "experience": [{"raw": "x"}]})
+
+
+def test_put_without_url_keeps_the_stored_source(make_store):
+    store = make_store()
+    jd_id = store.put("oferta", "s1", source_url="https://jobs/1", posting={"title": "Data Engineer"})
+
+    store.put("oferta", "s2", source_url=None, posting=None)
+
+    record = store.get(jd_id)
+    assert record["source_url"] == "https://jobs/1"
+    assert record["posting"] == {"title": "Data Engineer"}
+
+
+def test_sqlite_updates_from_two_connections_keep_both_fields(tmp_path):
+    path = tmp_path / "jd_store.sqlite3"
+    a, b = SQLiteJDStore(path), SQLiteJDStore(path)
+    jd_id = a.put("oferta")
+
+    a.update(jd_id, summary="resumen")
+    b.update(jd_id, match={"profile": "p"})
+
+    record = a.get(jd_id)
+    assert record["summary"] == "resumen"
+    assert record["match"] == {"profile": "p"}
+    assert not a._conn.in_transaction and not b._conn.in_transaction
+
+
+def test_sqlite_failed_write_rolls_back(tmp_path):
+    store = SQLiteJDStore(tmp_path / "jd_store.sqlite3")
+    jd_id = store.put("oferta")
+
+    with pytest.raises(TypeError):
+        store.update(jd_id, summary=object())  # no serializable
+
+    assert not store._conn.in_transaction
+    store.update(jd_id, summary="ok")
+    assert store.get(jd_id)["summary"] == "ok"
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import jd_store, llm_cache, services
+from backend.jd_store import MemoryJDStore
+from backend.llm_cache import LLMCache
+from backend.main import app
+
+JD = "Buscamos data engineer. " * 20
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setenv("LLM_CACHE", "1")
+    monkeypatch.setattr(llm_cache, "_cache", LLMCache(path=None))
+    monkeypatch.setattr(jd_store, "_store", MemoryJDStore())
+    return TestClient(app)
+
+
+def _events(response) -> list[tuple[str, dict]]:
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_summary_arrives_in_chunks_and_is_stored(client):
+    events = _events(client.post("/api/jd/summary/stream", json={"jd_text": JD}))
+
+    chunks = [data["text"] for name, data in events if name == "chunk"]
+    assert len(chunks) > 1
+    name, done = events[-1]
+    assert name == "done"
+    assert done["jd_summary"] == "".join(chunks).strip() == JD.strip()[:600].strip()
+    assert done["structured"] is False
+    assert jd_store.get_jd_store().get(done["jd_id"])["summary"] == done["jd_summary"]
+
+
+def test_sampled_summaries_are_not_replayed_from_the_cache(client):
+    # El resumen va sin temperature (1 del proveedor): cada pedido es una muestra nueva
+    streamed = _events(client.post("/api/jd/summary/stream", json={"jd_text": JD}))[-1][1]["jd_summary"]
+
+    again = _events(client.post("/api/jd/summary/stream", json={"jd_text": JD}))
+    assert len([name for name, _ in again if name == "chunk"]) > 1
+    assert client.post("/api/jd/summary", json={"jd_text": JD}).json()["jd_summary"] == streamed
+    stats = llm_cache.get_cache().stats()
+    assert (stats["memory_hits"], stats["stores"], stats["sampled"]) == (0, 0, 3)
+
+
+def test_job_posting_is_summarized_without_llm(client, monkeypatch):
+    posting = {"title": "Data Engineer", "hiringOrganization": {"name": "ACME"}, "description": JD}
+
+    async def fetch(url):
+        return JD, posting
+
+    monkeypatch.setattr(services, "fetch_job_async", fetch)
+    events = _events(client.post("/api/jd/summary/stream", json={"job_url": "https://example.com/jd"}))
+
+    assert [name for name, _ in events] == ["chunk", "done"]
+    assert events[-1][1]["structured"] is True
+    assert "Data Engineer" in events[-1][1]["jd_summary"]
+    assert llm_cache.get_cache().stats()["misses"] == 0
+
+
+def test_without_key_the_first_block_is_used(client, monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+
+    events = _events(client.post("/api/jd/summary/stream", json={"jd_text": JD}))
+
+    assert [name for name, _ in events] == ["chunk", "done"]
+    assert events[-1][1]["jd_summary"] == JD.strip()
@@ -0,0 +1,71 @@
+import json
+
+from backend.job_posting import extract_job_posting, posting_to_text
+
+DESCRIPTION = (
+    "<p>Somos una fintech que procesa pagos en toda la región y buscamos sumar una persona "
+    "al equipo de datos.</p>"
+    "<h3>Requirements</h3>"
+    "<ul><li>5+ años con Python y SQL</li><li>Experiencia con Airflow o Dagster</li></ul>"
+    "<h3>Responsabilidades</h3>"
+    "<ul><li>Diseñar pipelines batch y streaming</li><li>Mantener el data warehouse</li></ul>"
+    "<p>Benefits: trabajo remoto, prepaga y presupuesto anual de capacitación.</p>"
+)
+
+
+def _page(posting: dict) -> str:
+    return (
+        "<html><head><script type=\"application/ld+json\">"
+        + json.dumps(posting)
+        + "</script></head><body><nav>Menú</nav></body></html>"
+    )
+
+
+def _posting(description: str) -> dict:
+    return {
+        "@context": "https://schema.org",
+        "@type": "JobPosting",
+        "title": "Data Engineer",
+        "hiringOrganization": {"@type": "Organization", "name": "ACME Pagos"},
+        "description": description,
+        "employmentType": "FULL_TIME",
+        "jobLocationType": "TELECOMMUTE",
+    }
+
+
+def test_description_keeps_every_section():
+    posting = extract_job_posting(_page(_posting(DESCRIPTION)))
+
+    lines = posting["description"].split("\n")
+    assert lines == [
+        "Somos una fintech que procesa pagos en toda la región y buscamos sumar una persona "
+        "al equipo de datos.",
+        "Requirements",
+        "5+ años con Python y SQL",
+        "Experiencia con Airflow o Dagster",
+        "Responsabilidades",
+        "Diseñar pipelines batch y streaming",
+        "Mantener el data warehouse",
+        "Benefits: trabajo remoto, prepaga y presupuesto anual de capacitación.",
+    ]
+
+
+def test_escaped_html_description_is_converted():
+    escaped = DESCRIPTION.replace("<", "&lt;").replace(">", "&gt;")
+    posting = extract_job_posting(_page(_posting(escaped)))
+
+    assert "Requirements" in posting["description"]
+    assert "<" not in posting["description"]
+
+
+def test_posting_to_text_has_header_and_description():
+    text = posting_to_text(extract_job_posting(_page(_posting(DESCRIPTION))))
+
+    assert text.startswith(
+        "Data Engineer\nEmpresa: ACME Pagos\nUbicación: Remoto\nModalidad: Tiempo completo"
+    )
+    assert "Benefits: trabajo remoto" in text
+
+
+def test_short_description_is_not_used():
+    assert extract_job_posting(_page(_posting("<p>Muy corta.</p>"))) is None
@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend import llm_cache
+from backend.llm_cache import LLMCache, _client_key, acached_completion, cache_key
+
+
+class FakeCompletions:
+    def __init__(self, reply: str = "respuesta"):
+        self.reply = reply
+        self.calls = 0
+
+    async def create(self, **params):
+        self.calls += 1
+        message = SimpleNamespace(content=f" {self.reply} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeClient:
+    def __init__(self, namespace: str = ""):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+        self.cache_namespace = namespace
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = LLMCache(path=None)
+    monkeypatch.setenv("LLM_CACHE", "1")
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    return cache
+
+
+def test_cache_key_ignores_dict_order_and_tracks_params():
+    a = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hola"}], "temperature": 0}
+    b = {"temperature": 0, "messages": [{"content": "hola", "role": "user"}], "model": "gpt-4o"}
+
+    assert cache_key(a) == cache_key(b)
+    assert cache_key(a) != cache_key({**a, "model": "gpt-4o-mini"})
+    assert cache_key(a) != cache_key({**a, "temperature": 0.2})
+
+
+def test_client_key_separates_providers():
+    params = {"model": "llama3", "messages": []}
+
+    assert _client_key(FakeClient(), params) == cache_key(params)
+    assert _client_key(FakeClient("local"), params) != _client_key(FakeClient("stub"), params)
+
+
+def test_acached_completion_hits_and_bypass(memory_cache):
+    client = FakeClient()
+    params = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hola"}], "temperature": 0}
+
+    assert asyncio.run(acached_completion(client, **params)) == "respuesta"
+    assert asyncio.run(acached_completion(client, **params)) == "respuesta"
+    assert client.chat.completions.calls == 1
+
+    asyncio.run(acached_completion(client, use_cache=False, **params))
+    assert client.chat.completions.calls == 2
+    stats = memory_cache.stats()
+    assert (stats["misses"], stats["memory_hits"], stats["bypass"], stats["sampled"]) == (1, 1, 1, 0)
+
+
+def test_acached_completion_does_not_share_entries_across_providers(memory_cache):
+    params = {"model": "m", "messages": [], "temperature": 0}
+    openai, local = FakeClient(), FakeClient("local")
+
+    asyncio.run(acached_completion(openai, **params))
+    asyncio.run(acached_completion(local, **params))
+
+    assert (openai.chat.completions.calls, local.chat.completions.calls) == (1, 1)
+
+
+@pytest.mark.parametrize("params, cached", [
+    ({"temperature": 0}, True),
+    ({"temperature": 0.1}, True),
+    ({"temperature": 0.2}, False),
+    ({}, False),
+])
+def test_only_deterministic_calls_are_cached(memory_cache, params, cached):
+    client = FakeClient()
+    params = {"model": "gpt-4o", "messages": [], **params}
+
+    asyncio.run(acached_completion(client, **params))
+    asyncio.run(acached_completion(client, **params))
+
+    assert client.chat.completions.calls == (1 if cached else 2)
+    assert memory_cache.stats()["sampled"] == (0 if cached else 2)
+
+
+def test_sampled_calls_can_opt_in(memory_cache):
+    client = FakeClient()
+    params = {"model": "gpt-4o", "messages": [], "temperature": 0.7}
+
+    asyncio.run(acached_completion(client, cache_sampled=True, **params))
+    asyncio.run(acached_completion(client, cache_sampled=True, **params))
+
+    assert client.chat.completions.calls == 1
+
+
+def test_disk_hit_does_not_write(tmp_path):
+    path = tmp_path / "llm_cache.sqlite3"
+    LLMCache(path).set("a", "valor")
+
+    cache = LLMCache(path)  # memoria vacía: el hit sale de disco
+    assert cache.get("a") == "valor"
+    db = cache._db()
+    assert db.total_changes == 0
+    assert not db.in_transaction
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_pending_access_is_written_before_eviction(tmp_path):
+    path = tmp_path / "llm_cache.sqlite3"
+    writer = LLMCache(path, disk_entries=2)
+    writer.set("a", "1")
+    writer.set("b", "2")
+
+    cache = LLMCache(path, memory_entries=0, disk_entries=2)
+    assert cache.get("a") == "1"  # a pasa a ser la más reciente
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = LLMCache(tmp_path / "llm_cache.sqlite3", ttl=10)
+    cache.set("a", "viejo")
+    later = llm_cache.time.time() + 60
+    monkeypatch.setattr(llm_cache.time, "time", lambda: later)
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_memory_is_capped_by_bytes():
+    cache = LLMCache(path=None, memory_bytes=10)
+    cache.set("a", "12345")
+    cache.set("b", "ñññ")  # 6 bytes en UTF-8: desaloja a "a"
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "ñññ"
+    assert cache.stats()["memory_bytes"] == 6
+
+
+def test_disk_is_capped_by_bytes(tmp_path):
+    cache = LLMCache(tmp_path / "llm_cache.sqlite3", memory_entries=0, disk_bytes=10)
+    cache.set("a", "1234")
+    cache.set("b", "5678")
+    assert cache.stats()["disk_bytes"] == 8
+
+    cache.set("c", "90")  # 10 bytes: entra justo
+    cache.set("d", "x")  # desaloja la menos usada
+    stats = cache.stats()
+    assert (stats["disk_size"], stats["disk_bytes"]) == (3, 7)
+    assert cache.get("a") is None
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from backend import llm_clients
+from backend.llm_clients import close_async_client, close_clients, get_async_client, get_sync_client
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("LLM_LOCAL_BASE_URL", raising=False)
+    monkeypatch.setattr(llm_clients, "_sync_clients", {})
+
+
+def test_missing_key_raises(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY")
+    with pytest.raises(RuntimeError):
+        get_sync_client()
+    # "local" no necesita key
+    assert str(get_sync_client("local").base_url).startswith(llm_clients.DEFAULT_LOCAL_BASE_URL)
+
+
+def test_sync_client_is_shared_until_options_change(monkeypatch):
+    client = get_sync_client()
+    assert get_sync_client() is client
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-otra")
+    rotated = get_sync_client()
+    assert rotated is not client
+    assert rotated.api_key == "sk-otra"
+
+
+def test_async_client_is_per_event_loop():
+    async def twice():
+        try:
+            first = get_async_client()
+            assert get_async_client() is first
+            return first
+        finally:
+            await close_async_client()
+
+    a = asyncio.run(twice())
+    b = asyncio.run(twice())
+
+    assert a is not b
+    assert a.is_closed() and b.is_closed()
+
+
+def test_closed_client_is_replaced():
+    async def run():
+        client = get_async_client()
+        await client.close()
+        replacement = get_async_client()
+        await close_clients()
+        return client, replacement
+
+    client, replacement = asyncio.run(run())
+    assert replacement is not client
+    assert replacement.is_closed()
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from backend import llm_router
+from backend.llm_router import (
+    Route,
+    _record,
+    get_async_task_client,
+    get_route,
+    get_task_client,
+    reset_router_stats,
+    router_stats,
+    task_available,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for task in llm_router.TASKS:
+        monkeypatch.delenv(f"LLM_ROUTE_{task.upper()}", raising=False)
+    for name in ("LLM_PROVIDER", "OPENAI_API_KEY", "OPENAI_MODEL", "OPENAI_SUMMARY_MODEL"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.delenv("LLM_STUB_REPLIES", raising=False)
+    reset_router_stats()
+    yield
+    reset_router_stats()
+
+
+def test_default_routes_keep_the_openai_models(monkeypatch):
+    monkeypatch.setenv("OPENAI_MODEL", "gpt-4o-mini")
+
+    assert get_route("parse") == Route("parse", "openai", "gpt-4o-mini")
+    assert get_route("repair") == Route("repair", "openai", "gpt-4o-mini")
+    assert get_route("summarize").model == "gpt-4o"
+    assert get_route("parse").label == "gpt-4o-mini"
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("local:llama3.1:8b", ("local", "llama3.1:8b")),
+    ("local", ("local", "llama3.1")),
+    ("stub:", ("stub", "stub")),
+    ("llama3.1:8b", ("openai", "llama3.1:8b")),
+    ("gpt-4.1", ("openai", "gpt-4.1")),
+])
+def test_route_spec(monkeypatch, spec, expected):
+    monkeypatch.setenv("LLM_ROUTE_SUMMARIZE", spec)
+    route = get_route("summarize")
+    assert (route.provider, route.model) == expected
+
+
+def test_unknown_task_or_provider_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        get_route("translate")
+    monkeypatch.setenv("LLM_PROVIDER", "anthropic")
+    with pytest.raises(ValueError):
+        get_route("parse")
+
+
+def test_task_available_needs_a_key_only_for_openai(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTE_SUMMARIZE", "local:llama3.1")
+
+    assert not task_available("match")
+    assert task_available("summarize")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    assert task_available("match")
+
+
+def test_stub_replies(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    client = get_task_client("match")
+    reply = client.chat.completions.create(messages=[{"role": "user", "content": "JD"}])
+
+    assert client.cache_namespace == "stub"
+    assert json.loads(reply.choices[0].message.content)["score"] == 50
+
+    summary = get_task_client("summarize").chat.completions.create(
+        messages=[{"role": "user", "content": "Resumí esta JD:\n\nBuscamos data engineer."}]
+    )
+    assert summary.choices[0].message.content == "Buscamos data engineer."
+
+    overrides = tmp_path / "replies.json"
+    overrides.write_text(json.dumps({"match": {"score": 90}}), encoding="utf-8")
+    monkeypatch.setenv("LLM_STUB_REPLIES", str(overrides))
+    reply = client.chat.completions.create(messages=[{"role": "user", "content": "JD"}])
+    assert json.loads(reply.choices[0].message.content) == {"score": 90}
+
+
+def test_stub_stream_is_measured_once(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+
+    async def run():
+        client = get_async_task_client("generate")
+        messages = [{"role": "user", "content": "x"}]
+        stream = await client.chat.completions.create(stream=True, messages=messages)
+        return "".join([c.choices[0].delta.content async for c in stream if c.choices])
+
+    text = asyncio.run(run())
+
+    assert json.loads(text)["experience"] == []
+    metrics = router_stats()["metrics"]["generate"]["stub:stub"]
+    assert metrics["calls"] == 1
+    assert metrics["completion_tokens"] == len(text) // 4
+
+
+def test_metrics_count_errors_and_cached_prefix_tokens():
+    route = Route("match", "openai", "gpt-4o")
+    usage = SimpleNamespace(
+        prompt_tokens=2000, completion_tokens=100, prompt_tokens_details=SimpleNamespace(cached_tokens=1500)
+    )
+    _record(route, 1.0, usage)
+    _record(route, 3.0, SimpleNamespace(prompt_tokens=2000, completion_tokens=100))
+    _record(route, 0.5, error=True)
+
+    m = router_stats()["metrics"]["match"]["gpt-4o"]
+    assert (m["calls"], m["errors"], m["max_s"], m["avg_s"]) == (3, 1, 3.0, 1.5)
+    assert (m["cached_tokens"], m["cache_hit_calls"], m["cached_pct"]) == (1500, 1, 37.5)
+
+    reset_router_stats()
+    assert router_stats()["metrics"] == {}
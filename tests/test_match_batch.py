@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import match_analyzer, services
+from backend.main import app
+from backend.match_analyzer import analyze_match_batch
+
+PROFILE = {"experience": [{"technologies": [{"name": "Python"}]}]}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """analyze_match_async y el fetch simulados: registran el orden de los eventos."""
+    state = {"events": [], "release_first": None, "indexes": []}
+
+    async def analyze(profile, jd_text, use_cache, min_score, index):
+        state["indexes"].append(index)
+        state["events"].append(("start", jd_text))
+        if jd_text == "jd-0":
+            await state["release_first"].wait()
+        state["events"].append(("end", jd_text))
+        return {"score": 80, "jd": jd_text}
+
+    async def fetch(url):
+        state["events"].append(("fetch", url))
+        return url.replace("https://jobs/", "jd-")
+
+    monkeypatch.setattr(match_analyzer, "analyze_match_async", analyze)
+    monkeypatch.setattr(services, "fetch_job_content_async", fetch)
+    monkeypatch.setenv("MATCH_BATCH_PRIME", "1")
+    return state
+
+
+def _run_batch(state, items, concurrency):
+    async def run():
+        state["release_first"] = asyncio.Event()
+        results = []
+
+        async def consume():
+            async for result in analyze_match_batch(PROFILE, items, concurrency=concurrency):
+                results.append(result)
+
+        consumer = asyncio.create_task(consume())
+        for _ in range(20):  # deja correr todo lo que no depende del primer análisis
+            await asyncio.sleep(0)
+        snapshot = list(state["events"])
+        state["release_first"].set()
+        await consumer
+        return snapshot, results
+
+    return asyncio.run(run())
+
+
+def test_waiting_items_do_not_hold_slots(fake_llm):
+    items = [{"id": "a", "jd_text": "jd-0"}] + [{"job_url": f"https://jobs/{i}"} for i in range(1, 5)]
+
+    before_release, results = _run_batch(fake_llm, items, concurrency=2)
+
+    fetched = [e for e in before_release if e[0] == "fetch"]
+    assert len(fetched) == 4
+    assert [e for e in before_release if e[0] == "start"] == [("start", "jd-0")]
+    assert sorted(r["report"]["jd"] for r in results) == ["jd-0", "jd-1", "jd-2", "jd-3", "jd-4"]
+
+
+def test_batch_passes_the_profile_index(fake_llm):
+    items = [{"jd_text": "jd-0"}, {"jd_text": "jd-1"}]
+
+    _run_batch(fake_llm, items, concurrency=4)
+
+    assert all(isinstance(index, dict) for index in fake_llm["indexes"])
+
+
+def test_item_errors_do_not_abort_the_batch(fake_llm):
+    items = [{"jd_text": "jd-0"}, {"id": "vacío"}]
+
+    _, results = _run_batch(fake_llm, items, concurrency=2)
+
+    by_index = {r["index"]: r for r in results}
+    assert by_index[0]["ok"] and not by_index[1]["ok"]
+    assert "jd_text" in by_index[1]["error"]
+
+
+def test_endpoint_streams_ndjson(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setenv("LLM_CACHE", "0")
+    items = [
+        {"id": "python", "jd_text": "Backend con Python."},
+        {"id": "ventas", "jd_text": "Ventas con Salesforce y HubSpot."},
+        {"id": "vacío"},
+    ]
+
+    response = TestClient(app).post(
+        "/api/cv/match/batch", json={"profile": PROFILE, "items": items, "min_local_score": 30}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_id = {line["id"]: line for line in lines[:-1]}
+    assert by_id["python"]["report"]["score"] == 50
+    assert by_id["ventas"]["report"]["llm_skipped"] is True
+    assert not by_id["vacío"]["ok"]
+    assert lines[-1] == {"done": True, "total": 3, "ok": 2, "errors": 1, "llm_skipped": 1}
+
+
+def test_endpoint_rejects_an_empty_batch():
+    response = TestClient(app).post("/api/cv/match/batch", json={"profile": PROFILE, "items": []})
+    assert response.status_code == 400
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import upload_cache
+from backend.main import app
+from backend.upload_cache import UploadCache
+
+from test_cv_parser import CV_TEXT
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setenv("LLM_CACHE", "0")
+    monkeypatch.delenv("UPLOAD_CACHE", raising=False)
+    monkeypatch.setattr(upload_cache, "_upload_cache", UploadCache(tmp_path / "uploads.sqlite3"))
+    return TestClient(app)
+
+
+def _events(response) -> list[tuple[str, dict]]:
+    """Eventos SSE de la respuesta como (evento, data)."""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _upload(client, query: str = ""):
+    files = {"file": ("cv.txt", CV_TEXT.encode("utf-8"))}
+    return client.post(f"/api/cv/parse-and-enrich/stream{query}", files=files)
+
+
+def test_stream_reports_each_stage(client):
+    response = _upload(client)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response)
+    names = [name for name, _ in events]
+    assert names == ["extracted", "parsed", "experience", "experience", "strategy", "done"]
+    assert sorted(data["index"] for name, data in events if name == "experience") == [0, 1]
+    assert all("elapsed_ms" in data for _, data in events)
+    done = events[-1][1]
+    assert done["cached"] is False
+    assert len(done["profile"]["metadata"]["enrichment"]["experience"]) == 2
+
+
+def test_stream_matches_the_one_shot_endpoint(client):
+    streamed = _events(_upload(client))[-1][1]["profile"]
+    files = {"file": ("cv.txt", CV_TEXT.encode("utf-8"))}
+    one_shot = client.post("/api/cv/parse-and-enrich", files=files).json()
+
+    assert one_shot == streamed
+
+
+def test_cached_upload_skips_straight_to_done(client):
+    _upload(client)
+
+    events = _events(_upload(client))
+    assert [(name, data["cached"]) for name, data in events] == [("parsed", True), ("done", True)]
+
+    forced = _events(_upload(client, "?force=true"))
+    assert forced[0][0] == "extracted"
+    assert forced[-1][1]["cached"] is False
+
+
+def test_errors_arrive_as_events(client, monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+
+    events = _events(_upload(client))
+
+    assert events[-1][0] == "error"
+    assert events[-1][1]["status"] == 503
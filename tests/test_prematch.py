@@ -0,0 +1,67 @@
+import pytest
+
+from backend.prematch import build_profile_index, local_match_score, min_local_score, normalize_term, score_jd
+
+PROFILE = {
+    "skills": {"technical": [{"name": "Python"}, {"name": "PostgreSQL"}]},
+    "experience": [
+        {
+            "technologies": [{"name": "React.js"}, {"name": "Kubernetes"}],
+            "relevanceTags": ["ingeniería de datos", "liderazgo técnico"],
+        }
+    ],
+}
+
+
+def test_normalize_term_applies_accents_and_aliases():
+    assert normalize_term("  React.JS ") == "react"
+    assert normalize_term("Amazon Web Services") == "aws"
+    assert normalize_term("Ingeniería") == "ingenieria"
+
+
+def test_profile_index_by_category():
+    index = build_profile_index(PROFILE)
+
+    assert index["skills"] == {"python", "postgresql"}
+    assert index["technologies"] == {"react", "kubernetes"}
+    assert index["tags"] == {"ingenieria de datos", "liderazgo tecnico"}
+
+
+def test_score_reports_matched_and_missing_terms():
+    jd = "Buscamos ingeniero con Python, Postgres, k8s y Terraform para ingeniería de datos."
+    result = score_jd(build_profile_index(PROFILE), jd)
+    breakdown = result["breakdown"]
+
+    assert breakdown["skills"]["matched"] == ["postgresql", "python"]
+    assert breakdown["technologies"]["matched"] == ["kubernetes"]
+    assert breakdown["technologies"]["missing"] == ["terraform"]
+    assert breakdown["tags"]["matched"] == ["ingenieria de datos"]
+    assert 0 < result["score"] < 100
+
+
+def test_unrelated_jd_scores_lower():
+    close = local_match_score(PROFILE, "Python y PostgreSQL en Kubernetes, con React en el frontend.")
+    far = local_match_score(PROFILE, "Vendedor de seguros con experiencia en Salesforce y HubSpot.")
+
+    assert close["score"] > far["score"]
+    assert far["breakdown"]["technologies"]["missing"] == ["hubspot", "salesforce"]
+
+
+def test_category_without_signal_does_not_count():
+    # Sin tecnologías en la JD, solo cuentan los tags
+    result = local_match_score(PROFILE, "Rol de liderazgo técnico en ingeniería de datos.")
+
+    assert result["breakdown"]["technologies"]["coverage"] is None
+    assert result["score"] == round(100 * 2 / 3)
+
+
+@pytest.mark.parametrize("env, value, expected", [
+    ("", None, None),
+    ("40", None, 40.0),
+    ("abc", None, None),
+    ("40", 0, None),
+    ("", 25, 25),
+])
+def test_min_local_score(monkeypatch, env, value, expected):
+    monkeypatch.setenv("PREMATCH_MIN_SCORE", env)
+    assert min_local_score(value) == expected
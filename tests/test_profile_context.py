@@ -0,0 +1,137 @@
+import json
+
+from backend.profile_context import (
+    EXTRAS_PREFIX,
+    PROFILE_PREFIX,
+    _size,
+    bm25_scores,
+    profile_messages,
+    select_profile_context,
+    split_profile_context,
+)
+
+
+def _profile(filler: int = 0) -> dict:
+    return {
+        "personal": {"firstName": "Ana"},
+        "narrative": {"headline": "Ingeniera de datos"},
+        "experience": [
+            {
+                "immutable": {"company": "ACME", "startDate": "2021"},
+                "facts": [
+                    {"what": "Migró el warehouse a Snowflake con dbt"},
+                    {"what": "Organizó el torneo de fútbol de la oficina " + "x" * filler},
+                ],
+                "relevanceTags": ["datos"],
+                "raw": "Pipelines en Airflow.\n\nCatering de eventos internos " + "y" * filler,
+            },
+            {
+                "immutable": {"company": "Globex", "startDate": "2018"},
+                "facts": [{"what": "Atención al cliente telefónica " + "z" * filler}],
+                "raw": "Reportes en Excel.",
+            },
+        ],
+    }
+
+
+def test_bm25_prefers_documents_with_query_terms():
+    docs = [["python", "airflow"], ["excel", "ventas"], ["python", "python", "snowflake"]]
+    scores = bm25_scores(docs, ["python", "snowflake"])
+
+    assert scores[1] == 0
+    assert scores[2] > scores[0] > 0
+    assert bm25_scores([], ["python"]) == []
+
+
+def test_profile_within_budget_is_returned_as_is():
+    profile = _profile()
+    assert select_profile_context(profile, "Data engineer con Snowflake", budget=100000) is profile
+
+
+def test_over_budget_keeps_core_and_most_relevant_pieces():
+    profile = _profile(filler=1200)
+    budget = 1200
+    result = select_profile_context(profile, "Data engineer: Snowflake, dbt y Airflow", budget=budget)
+
+    assert _size(result) <= budget
+    # Núcleo de todos los roles, en orden
+    assert [e["immutable"]["company"] for e in result["experience"]] == ["ACME", "Globex"]
+    assert result["personal"] == profile["personal"]
+    acme = result["experience"][0]
+    assert acme["facts"] == [{"what": "Migró el warehouse a Snowflake con dbt"}]
+    assert acme["raw"] == "Pipelines en Airflow."
+    assert "facts" not in result["experience"][1]
+
+
+def test_selected_pieces_keep_original_order():
+    profile = _profile()
+    profile["experience"][0]["facts"] = [{"what": f"Hecho {i} con dbt"} for i in range(5)]
+    result = select_profile_context(profile, "dbt", budget=1000, size=lambda o: len(json.dumps(o)) // 4)
+
+    whats = [f["what"] for f in result["experience"][0]["facts"]]
+    assert whats == sorted(whats)
+
+
+def test_profile_prefix_is_stable_across_jds(monkeypatch):
+    monkeypatch.setenv("PROMPT_COMPACTION", "1")
+    profile = _profile()
+    a, a_extras = profile_messages(profile, "Data engineer con Snowflake", "match")
+    b, b_extras = profile_messages(profile, "Analista de ventas con Excel", "match")
+
+    assert a["role"] == "system"
+    assert a["content"].startswith(PROFILE_PREFIX)
+    assert a == b
+    assert a_extras == b_extras == []
+
+
+def _large_profile() -> dict:
+    profile = _profile()
+    profile["experience"] = [
+        {
+            "immutable": {"company": f"Empresa {i}"},
+            "facts": [{"what": f"Hecho {i}.{j} " + "detalle " * 30} for j in range(4)],
+        }
+        for i in range(8)
+    ]
+    snowflake = "Migró el warehouse a Snowflake con dbt. " + "detalle " * 30
+    profile["experience"][6]["facts"][2]["what"] = snowflake
+    return profile
+
+
+def test_large_profile_keeps_the_prefix_and_moves_jd_picks_after(monkeypatch):
+    monkeypatch.setenv("PROMPT_COMPACTION", "1")
+    monkeypatch.setenv("PROFILE_CONTEXT_TOKENS", "1500")
+    monkeypatch.setenv("PROFILE_CONTEXT_EXTRA_TOKENS", "100")
+    profile = _large_profile()
+
+    a, a_extras = profile_messages(profile, "Data engineer con Snowflake y dbt", "match")
+    b, b_extras = profile_messages(profile, "Analista de ventas con Excel", "match")
+
+    assert a == b
+    assert "Snowflake" not in a["content"]
+    assert a_extras[0]["content"].startswith(EXTRAS_PREFIX)
+    assert "Snowflake" in a_extras[0]["content"]
+    assert a_extras != b_extras
+
+
+def test_split_base_does_not_depend_on_the_jd():
+    profile = _large_profile()
+    size = _size
+
+    base_a, extras_a = split_profile_context(profile, "Snowflake dbt", 3000, 600, size)
+    base_b, extras_b = split_profile_context(profile, "Excel ventas", 3000, 600, size)
+
+    assert base_a == base_b
+    assert size(base_a) <= 3000
+    assert [e["immutable"]["company"] for e in base_a["experience"]] == [f"Empresa {i}" for i in range(8)]
+    picked = {e["immutable"]["company"]: e.get("facts", []) for e in extras_a["experience"]}
+    assert picked["Empresa 6"][0]["what"].startswith("Migró el warehouse a Snowflake")
+    assert "Migró el warehouse" not in json.dumps(extras_b, ensure_ascii=False)
+    # Nada se repite entre base y extras
+    assert "Migró el warehouse" not in json.dumps(base_a, ensure_ascii=False)
+
+
+def test_split_without_extra_budget_sends_only_the_base():
+    base, extras = split_profile_context(_large_profile(), "Snowflake", 3000, 0, _size)
+    assert extras is None
+    assert split_profile_context(_profile(), "Snowflake", 100000, 600, _size) == (_profile(), None)
@@ -0,0 +1,67 @@
+import json
+import os
+import stat
+import sys
+
+import pytest
+
+from backend.profile_store import ProfileStore
+
+posix_only = pytest.mark.skipif(sys.platform == "win32", reason="permisos POSIX")
+
+
+def _mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_load_missing_file_returns_none(tmp_path):
+    assert ProfileStore(tmp_path / "profile.json").load() is None
+
+
+def test_save_then_load_uses_cached_snapshot(tmp_path):
+    store = ProfileStore(tmp_path / "profile.json")
+    saved = store.save({"personal": {"firstName": "Ana"}})
+
+    loaded = store.load()
+    assert loaded is saved
+    assert loaded.profile == {"personal": {"firstName": "Ana"}}
+    assert loaded.etag.startswith('"') and loaded.etag.endswith('"')
+
+
+def test_external_edit_is_picked_up(tmp_path):
+    path = tmp_path / "profile.json"
+    store = ProfileStore(path)
+    before = store.save({"personal": {"firstName": "Ana"}})
+
+    path.write_text(json.dumps({"personal": {"firstName": "Beatriz"}, "extra": True}), encoding="utf-8")
+
+    after = store.load()
+    assert after.profile["personal"]["firstName"] == "Beatriz"
+    assert after.etag != before.etag
+
+
+def test_save_leaves_no_temp_files(tmp_path):
+    store = ProfileStore(tmp_path / "profile.json")
+    store.save({"a": 1})
+    store.save({"a": 2})
+
+    assert [p.name for p in tmp_path.iterdir()] == ["profile.json"]
+
+
+@posix_only
+def test_new_profile_is_world_readable(tmp_path):
+    path = tmp_path / "profile.json"
+    ProfileStore(path).save({"a": 1})
+
+    assert _mode(path) == 0o644
+
+
+@posix_only
+def test_save_keeps_existing_mode(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o640)
+
+    ProfileStore(path).save({"a": 1})
+
+    assert _mode(path) == 0o640
@@ -0,0 +1,74 @@
+import json
+
+from backend.prompt_compaction import (
+    compact_json,
+    count_tokens,
+    payload_json,
+    project_profile,
+    prune_empty,
+    truncate_tokens,
+)
+
+
+def test_prune_empty_keeps_false_and_zero():
+    value = {"a": "", "b": None, "c": [], "d": {}, "e": False, "f": 0, "g": [{"h": " "}], "i": " x "}
+
+    assert prune_empty(value) == {"e": False, "f": 0, "i": "x"}
+
+
+def test_project_profile_drops_metadata_and_enriched_raw():
+    profile = {
+        "personal": {"firstName": "Ana"},
+        "metadata": {"version": "1.0"},
+        "constraints": {"maxPages": 2},
+        "experience": [
+            {"raw": "texto original", "facts": [{"text": "Lideró la migración"}]},
+            {"raw": "sin enriquecer", "facts": []},
+        ],
+    }
+
+    assert project_profile(profile) == {
+        "personal": {"firstName": "Ana"},
+        "experience": [{"facts": [{"text": "Lideró la migración"}]}, {"raw": "sin enriquecer"}],
+    }
+
+
+def test_compact_json_keeps_schema_keys_and_is_canonical():
+    tech = {"yearsInThisRole": 2, "usedInProduction": True, "name": "Python"}
+    skills = {"yearsTotal": 6, "yearsInThisRole": 2}
+
+    sent = compact_json({"tech": tech, "skills": skills})
+
+    assert json.loads(sent) == {"tech": tech, "skills": skills}
+    assert sent == compact_json({"skills": dict(reversed(skills.items())), "tech": tech})
+    assert " " not in sent and "\n" not in sent
+
+
+def test_payload_json_disabled_returns_legacy(monkeypatch):
+    monkeypatch.setenv("PROMPT_COMPACTION", "0")
+
+    assert payload_json("enrich", {"a": ""}) == json.dumps({"a": ""}, indent=0)
+
+
+def test_truncate_tokens_respects_budget():
+    text = "Buscamos una persona con experiencia en Python, SQL y Airflow. " * 20
+
+    cut = truncate_tokens(text, 30)
+
+    assert text.startswith(cut)
+    assert count_tokens(cut) <= 30
+    assert truncate_tokens("corto", 30) == "corto"
+
+
+def test_payload_json_samples_the_baseline(monkeypatch):
+    from backend import prompt_compaction
+
+    monkeypatch.setattr(prompt_compaction, "_stats", {})
+    monkeypatch.setenv("PROMPT_COMPACTION_SAMPLE", "3")
+    for _ in range(7):
+        payload_json("enrich", {"experience": [{"raw": "Python", "facts": []}]})
+
+    stats = prompt_compaction.compaction_stats()["tasks"]["enrich"]
+    assert stats["calls"] == 7
+    assert stats["sampled"] == 3
+    assert stats["sent_tokens"] < stats["baseline_tokens"]
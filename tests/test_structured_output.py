@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+
+from backend import llm_cache
+from backend.structured_output import Validator, aparse_structured, cv_validator, loads_lenient
+
+MATCH = Validator.from_template(
+    {"score": 0, "tags": [""], "approved": False, "level": "", "items": [{"name": "", "since": "YYYY-MM"}]},
+    {"level": ("junior", "senior")},
+)
+
+
+@pytest.fixture
+def repair_llm(monkeypatch):
+    """Modelo de "repair" simulado: devuelve las respuestas en orden y guarda los mensajes."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    calls, replies = [], []
+
+    async def fake_completion(client, *, use_cache=True, **params):
+        calls.append(params["messages"][-1]["content"])
+        return replies.pop(0)
+
+    monkeypatch.setattr(llm_cache, "acached_completion", fake_completion)
+    return calls, replies
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '```json\n{"score": 80}\n```',
+        'Acá va el JSON: {"score": 80} Saludos.',
+        '{"score": 80,}',
+        '{"score": 80, "tags": ["a", "b"',
+    ],
+)
+def test_loads_lenient_fixes_common_syntax(raw):
+    assert loads_lenient(raw)["score"] == 80
+
+
+def test_loads_lenient_raises_when_hopeless():
+    with pytest.raises(ValueError):
+        loads_lenient("no hay JSON acá")
+
+
+def test_validator_fixes_obvious_types_locally():
+    data = {"score": "85", "tags": "python", "approved": "true", "level": "Senior"}
+
+    errors, fixes = MATCH.validate(data)
+
+    assert errors == []
+    assert fixes == 4
+    assert data == {"score": 85, "tags": ["python"], "approved": True, "level": "senior"}
+
+
+def test_validator_reports_paths_it_cannot_fix():
+    data = {"level": "staff", "items": [{"name": "x", "since": "marzo"}], "score": {"a": 1}}
+
+    errors, _ = MATCH.validate(data)
+
+    assert sorted(path for path, _ in errors) == [("items", 0, "since"), ("level",), ("score",)]
+
+
+def test_cv_validator_checks_profile_enums():
+    profile = {"experience": [{"technologies": [{"name": "Python", "depth": "experto"}]}]}
+
+    errors, _ = cv_validator().validate(profile)
+
+    assert [path for path, _ in errors] == [("experience", 0, "technologies", 0, "depth")]
+
+
+def test_valid_response_makes_no_repair_call(repair_llm):
+    calls, _ = repair_llm
+
+    data = asyncio.run(aparse_structured('{"score": 70, "level": "junior"}', MATCH))
+
+    assert data == {"score": 70, "level": "junior"}
+    assert calls == []
+
+
+def test_only_invalid_fragments_are_sent_for_repair(repair_llm):
+    calls, replies = repair_llm
+    replies.append(json.dumps({"fragments": [{"path": "level", "value": "senior"}]}))
+    raw = json.dumps({"score": 90, "tags": ["python"], "level": "Sr. engineer", "items": []})
+
+    data = asyncio.run(aparse_structured(raw, MATCH))
+
+    assert data["level"] == "senior"
+    assert data["score"] == 90
+    sent = json.loads(calls[0])["fragments"]
+    assert [f["path"] for f in sent] == ["level"]
+    assert sent[0]["expected"] == "'junior' | 'senior' | null"
+
+
+def test_unrepaired_fragments_are_blanked(repair_llm):
+    _, replies = repair_llm
+    replies.append(json.dumps({"fragments": [{"path": "level", "value": "principal"}]}))
+
+    data = asyncio.run(aparse_structured('{"score": 50, "level": "principal"}', MATCH))
+
+    assert data == {"score": 50, "level": None}
+
+
+def test_broken_syntax_is_repaired_without_regenerating(repair_llm):
+    calls, replies = repair_llm
+    replies.append('{"score": 60, "level": "junior"}')
+
+    data = asyncio.run(aparse_structured('{"score": 60 "level": "junior"}', MATCH))
+
+    assert data == {"score": 60, "level": "junior"}
+    assert len(calls) == 1 and calls[0].startswith("Error:")
+
+
+def test_non_object_response_fails(repair_llm):
+    _, replies = repair_llm
+    replies.append("tampoco")
+
+    with pytest.raises(ValueError):
+        asyncio.run(aparse_structured("sin JSON", MATCH))
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from backend import match_analyzer, services
+from backend.match_analyzer import analyze_match, analyze_match_async
+from backend.services import summarize_jd, summarize_jd_async
+
+PROFILE = {"skills": {"technical": [{"name": "Python"}]}, "experience": [{"raw": "Pipelines en Python."}]}
+JD = "Buscamos data engineer con Python y Airflow."
+
+
+@pytest.fixture
+def closed(monkeypatch):
+    """Stub LLM; registra los cierres de clientes que hacen los wrappers sync al terminar."""
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "stub")
+    monkeypatch.setenv("LLM_CACHE", "0")
+    closed = []
+
+    async def close():
+        closed.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(services, "close_async_client", close)
+    monkeypatch.setattr(match_analyzer, "close_async_client", close)
+    return closed
+
+
+def test_sync_wrappers_match_the_async_versions(closed):
+    assert summarize_jd(JD) == asyncio.run(summarize_jd_async(JD))
+    assert analyze_match(PROFILE, JD) == asyncio.run(analyze_match_async(PROFILE, JD))
+    # Cada wrapper cierra los clientes de su propio event loop
+    assert len(closed) == 2 and closed[0] is not closed[1]
+
+
+def test_clients_are_closed_when_the_call_fails(closed, monkeypatch):
+    async def boom(*args, **kwargs):
+        raise RuntimeError("proveedor caído")
+
+    monkeypatch.setattr(services, "acached_completion", boom)
+    with pytest.raises(RuntimeError):
+        summarize_jd(JD)
+    assert len(closed) == 1
+
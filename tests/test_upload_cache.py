@@ -0,0 +1,96 @@
+import pytest
+
+from backend.upload_cache import UploadCache, upload_hash
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    for task in ("PARSE", "ENRICH"):
+        monkeypatch.delenv(f"LLM_ROUTE_{task}", raising=False)
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.setenv("OPENAI_MODEL", "gpt-4o")
+    return UploadCache(tmp_path / "uploads.sqlite3", max_entries=2)
+
+
+def test_upload_hash_is_by_content():
+    assert upload_hash(b"%PDF-1.7 cv") == upload_hash(bytearray(b"%PDF-1.7 cv"))
+    assert upload_hash(b"%PDF-1.7 cv") != upload_hash(b"%PDF-1.7 cv editado")
+
+
+def test_stages_round_trip_and_count(cache):
+    digest = upload_hash(b"cv")
+    assert cache.get(digest, "parsed") is None
+
+    cache.set(digest, "text", "Ana Pérez")
+    cache.set(digest, "parsed", {"personal": {"firstName": "Ana"}})
+
+    assert cache.get(digest, "text") == "Ana Pérez"
+    assert cache.get(digest, "parsed") == {"personal": {"firstName": "Ana"}}
+    stats = cache.stats()
+    assert (stats["parsed_misses"], stats["parsed_hits"], stats["text_hits"]) == (1, 1, 1)
+    assert (stats["stores"], stats["files"]) == (2, 1)
+
+
+def test_unknown_stage_is_rejected(cache):
+    with pytest.raises(ValueError):
+        cache.get(upload_hash(b"cv"), "summary")
+
+
+def test_llm_stages_are_keyed_by_model(cache, monkeypatch):
+    digest = upload_hash(b"cv")
+    cache.set(digest, "text", "texto")
+    cache.set(digest, "parsed", {"a": 1})
+    cache.set(digest, "enriched", {"a": 2})
+
+    monkeypatch.setenv("LLM_ROUTE_ENRICH", "local:llama3.1:8b")
+    assert cache.get(digest, "parsed") == {"a": 1}
+    assert cache.get(digest, "enriched") is None
+
+    monkeypatch.setenv("OPENAI_MODEL", "gpt-4o-mini")
+    assert cache.get(digest, "parsed") is None
+    # El texto extraído no depende del modelo
+    assert cache.get(digest, "text") == "texto"
+
+
+def test_lru_evicts_whole_files(cache):
+    a, b, c = (upload_hash(x) for x in (b"a", b"b", b"c"))
+    cache.set(a, "text", "a")
+    cache.set(a, "parsed", {"a": 1})
+    cache.set(b, "text", "b")
+    cache.get(a, "text")
+    cache.set(c, "text", "c")
+
+    assert cache.get(b, "text") is None
+    assert cache.get(a, "parsed") == {"a": 1}
+    assert cache.stats()["files"] == 2
+
+
+def test_persists_across_instances(cache, tmp_path):
+    digest = upload_hash(b"cv")
+    cache.set(digest, "text", "texto")
+
+    assert UploadCache(tmp_path / "uploads.sqlite3").get(digest, "text") == "texto"
+
+
+def test_hit_does_not_write(cache, tmp_path):
+    digest = upload_hash(b"cv")
+    cache.set(digest, "text", "texto")
+
+    reader = UploadCache(tmp_path / "uploads.sqlite3")
+    assert reader.get(digest, "text") == "texto"
+    db = reader._db()
+    assert db.total_changes == 0
+    assert not db.in_transaction
+
+
+def test_pending_access_is_written_before_eviction(cache, tmp_path):
+    a, b, c = (upload_hash(x) for x in (b"a", b"b", b"c"))
+    cache.set(a, "text", "a")
+    cache.set(b, "text", "b")
+
+    reader = UploadCache(tmp_path / "uploads.sqlite3", max_entries=2)
+    assert reader.get(a, "text") == "a"  # a pasa a ser el más reciente
+    reader.set(c, "text", "c")
+
+    assert reader.get(b, "text") is None
+    assert (reader.get(a, "text"), reader.get(c, "text")) == ("a", "c")